@@ -1,10 +1,12 @@
 from django.contrib import admin
 
+from apps.core.admin import ProtectedMediaAdminMixin
+
 from .models import AgentApplication
 
 
 @admin.register(AgentApplication)
-class AgentApplicationAdmin(admin.ModelAdmin):
+class AgentApplicationAdmin(ProtectedMediaAdminMixin, admin.ModelAdmin):
     list_display = (
         "agent_id",
         "full_name",
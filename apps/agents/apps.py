@@ -5,3 +5,6 @@ class AgentsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.agents"
     verbose_name = "Agent Applications"
+
+    def ready(self):
+        from . import signals  # noqa: F401
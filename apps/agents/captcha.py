@@ -0,0 +1,283 @@
+"""
+CAPTCHA verification for public onboarding forms.
+
+Verification runs inside the request thread, so a slow provider ties up a
+worker. ``CaptchaVerifier`` bounds that cost:
+
+- keep-alive HTTPS connections are reused per thread instead of opening a
+  new TLS connection for every submission,
+- connect and read timeouts are separate and short,
+- a circuit breaker stops calling a provider that keeps failing and applies
+  ``AGENT_ONBOARDING_CAPTCHA_FAILURE_POLICY`` ("closed" rejects the
+  submission, "open" lets it through) until the provider recovers,
+- verified tokens are cached briefly, so a client retrying the same
+  submission (e.g. after a validation error) is not re-verified; providers
+  reject a token the second time it is checked.
+"""
+
+import hashlib
+import http.client
+import json
+import logging
+import threading
+import time
+from urllib import parse as urllib_parse
+
+from django.conf import settings
+
+from apps.core.cache import CacheNamespace
+
+logger = logging.getLogger("agents")
+
+PROVIDER_ENDPOINTS = {
+    "recaptcha": "https://www.google.com/recaptcha/api/siteverify",
+    "turnstile": "https://challenges.cloudflare.com/turnstile/v0/siteverify",
+}
+
+FAILURE_POLICY_CLOSED = "closed"
+FAILURE_POLICY_OPEN = "open"
+
+UNAVAILABLE_MESSAGE = "Captcha verification is temporarily unavailable. Please retry."
+REJECTED_MESSAGE = "Captcha verification failed. Please try again."
+CONFIGURATION_MESSAGE = "Captcha configuration error. Please contact support."
+
+verified_tokens = CacheNamespace("captcha-verified")
+
+
+class CaptchaUnavailable(Exception):
+    """The provider could not be reached or returned an unusable response"""
+
+
+class CircuitBreaker:
+    """
+    Per-process circuit breaker.
+
+    Opens after ``failure_threshold`` consecutive failures and stays open for
+    ``reset_timeout`` seconds. After that one caller at a time is let through
+    as a trial (half-open) while the others keep failing fast; the trial
+    either closes the circuit or re-opens it. A trial that never reports
+    back is replaced after another ``reset_timeout``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started = None
+
+    def allow(self, reset_timeout):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < reset_timeout:
+                return False
+            if (
+                self._trial_started is not None
+                and now - self._trial_started < reset_timeout
+            ):
+                # Half-open with a trial call in flight
+                return False
+            self._trial_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def record_failure(self, failure_threshold):
+        """Count a failure; returns True if it opened a closed circuit"""
+        with self._lock:
+            self._failures += 1
+            was_closed = self._opened_at is None
+            if self._trial_started is not None or (self._failures >= failure_threshold):
+                self._opened_at = time.monotonic()
+                self._trial_started = None
+            return was_closed and self._opened_at is not None
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections, one per host per thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _connections(self):
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    def post_form(self, url, fields, connect_timeout, read_timeout):
+        """POST ``fields`` urlencoded to ``url`` and return the decoded JSON"""
+        parts = urllib_parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        body = urllib_parse.urlencode(fields)
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+
+        connections = self._connections()
+        reused = key in connections
+        connection = connections.get(key) or self._connect(parts, connect_timeout)
+        connections[key] = connection
+        try:
+            connection.sock.settimeout(read_timeout)
+            connection.request("POST", path, body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            self.discard(key)
+            if not reused:
+                raise
+            # The server closed an idle keep-alive connection; retry once fresh
+            return self.post_form(url, fields, connect_timeout, read_timeout)
+        except Exception:
+            self.discard(key)
+            raise
+
+        if response.will_close:
+            self.discard(key)
+        if response.status != 200:
+            raise CaptchaUnavailable(f"HTTP {response.status} from {parts.hostname}")
+        return json.loads(payload.decode("utf-8"))
+
+    def _connect(self, parts, connect_timeout):
+        if parts.scheme == "https":
+            connection = http.client.HTTPSConnection(
+                parts.hostname, parts.port, timeout=connect_timeout
+            )
+        else:
+            connection = http.client.HTTPConnection(
+                parts.hostname, parts.port, timeout=connect_timeout
+            )
+        connection.connect()
+        return connection
+
+    def discard(self, key):
+        connection = self._connections().pop(key, None)
+        if connection is not None:
+            connection.close()
+
+    def close(self):
+        for key in list(self._connections()):
+            self.discard(key)
+
+
+class CaptchaVerifier:
+    """Verifies CAPTCHA tokens against the configured provider"""
+
+    def __init__(self):
+        self.pool = ConnectionPool()
+        self.breaker = CircuitBreaker()
+
+    def verify(self, provider, secret, token, remote_ip=None):
+        """
+        Verify ``token``. Returns ``(success, error_message)`` where
+        ``error_message`` is None on success.
+        """
+        endpoint = settings.AGENT_ONBOARDING_CAPTCHA_VERIFY_URL or (
+            PROVIDER_ENDPOINTS.get(provider)
+        )
+        if provider not in PROVIDER_ENDPOINTS or not endpoint:
+            logger.error("Unsupported CAPTCHA provider configured: %s", provider)
+            return False, CONFIGURATION_MESSAGE
+
+        cache_key = self._token_key(provider, token)
+        if verified_tokens.get(cache_key):
+            return True, None
+
+        if not self.breaker.allow(settings.AGENT_ONBOARDING_CAPTCHA_RESET_TIMEOUT):
+            return self._unavailable(provider, "circuit open")
+
+        payload = {"secret": secret, "response": token}
+        if remote_ip:
+            payload["remoteip"] = remote_ip
+
+        try:
+            result = self.pool.post_form(
+                endpoint,
+                payload,
+                connect_timeout=settings.AGENT_ONBOARDING_CAPTCHA_CONNECT_TIMEOUT,
+                read_timeout=settings.AGENT_ONBOARDING_CAPTCHA_READ_TIMEOUT,
+            )
+        except (
+            OSError,
+            ValueError,
+            http.client.HTTPException,
+            CaptchaUnavailable,
+        ) as exc:
+            self._record_failure(provider, exc)
+            return self._unavailable(provider, exc)
+
+        self.breaker.record_success()
+
+        if self._accepted(provider, result):
+            verified_tokens.set(
+                cache_key, True, settings.AGENT_ONBOARDING_CAPTCHA_TOKEN_CACHE_TIMEOUT
+            )
+            return True, None
+        return False, REJECTED_MESSAGE
+
+    def reset(self):
+        """Close pooled connections and close the circuit (tests)"""
+        self.pool.close()
+        self.breaker.reset()
+
+    def _accepted(self, provider, result):
+        if provider == "recaptcha":
+            score = result.get("score", 0)
+            if (
+                result.get("success")
+                and score >= settings.AGENT_ONBOARDING_CAPTCHA_SCORE_THRESHOLD
+            ):
+                return True
+            logger.warning(
+                "reCAPTCHA rejected submission (score=%s, errors=%s)",
+                score,
+                result.get("error-codes"),
+            )
+            return False
+
+        if result.get("success"):
+            return True
+        logger.warning(
+            "Cloudflare Turnstile rejected submission (errors=%s)",
+            result.get("error-codes"),
+        )
+        return False
+
+    def _record_failure(self, provider, exc):
+        logger.error("Captcha verification error (%s): %s", provider, exc)
+        threshold = settings.AGENT_ONBOARDING_CAPTCHA_FAILURE_THRESHOLD
+        if self.breaker.record_failure(threshold):
+            logger.error("Captcha circuit opened for provider %s", provider)
+
+    def _unavailable(self, provider, reason):
+        if settings.AGENT_ONBOARDING_CAPTCHA_FAILURE_POLICY == FAILURE_POLICY_OPEN:
+            logger.warning(
+                "Captcha provider %s unavailable (%s); accepting per fail-open policy",
+                provider,
+                reason,
+            )
+            return True, None
+        return False, UNAVAILABLE_MESSAGE
+
+    @staticmethod
+    def _token_key(provider, token):
+        return hashlib.sha256(f"{provider}:{token}".encode()).hexdigest()
+
+
+captcha_verifier = CaptchaVerifier()
@@ -2,15 +2,29 @@ from django.contrib.auth.hashers import make_password
 
 from rest_framework import serializers
 
+from apps.core.images import validate_image_upload
+from apps.core.serializers import DirectUploadField, ProtectedMediaMixin
+
 from .models import AgentApplication
 
 
-class AgentApplicationSerializer(serializers.ModelSerializer):
+class AgentApplicationSerializer(ProtectedMediaMixin, serializers.ModelSerializer):
     """Serializer used for create/detail operations."""
 
     password = serializers.CharField(write_only=True, min_length=8)
     confirm_password = serializers.CharField(write_only=True)
 
+    # Tokens from direct-to-storage uploads, accepted in place of the files
+    applicant_photo_upload = DirectUploadField(
+        "agent-photo", source="applicant_photo", required=False
+    )
+    nid_document_upload = DirectUploadField(
+        "agent-nid", source="nid_document", required=False
+    )
+    education_certificate_upload = DirectUploadField(
+        "agent-education", source="education_certificate", required=False
+    )
+
     class Meta:
         model = AgentApplication
         fields = [
@@ -40,6 +54,9 @@ class AgentApplicationSerializer(serializers.ModelSerializer):
             "applicant_photo",
             "nid_document",
             "education_certificate",
+            "applicant_photo_upload",
+            "nid_document_upload",
+            "education_certificate_upload",
             "agree_terms",
             "status",
             "submitted_at",
@@ -49,6 +66,10 @@ class AgentApplicationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["status", "submitted_at", "updated_at"]
         extra_kwargs = {
+            # Required in validate(): either the file or its upload token
+            "applicant_photo": {"required": False},
+            "nid_document": {"required": False},
+            "education_certificate": {"required": False},
             "agent_id": {
                 "required": False,
                 "allow_null": True,
@@ -86,6 +107,11 @@ class AgentApplicationSerializer(serializers.ModelSerializer):
             },
         }
 
+    def validate_applicant_photo(self, value):
+        """Check the photo header before it is stored"""
+        validate_image_upload(value)
+        return value
+
     def validate(self, attrs):
         password = attrs.get("password")
         confirm_password = attrs.pop("confirm_password", None)
@@ -101,6 +127,13 @@ class AgentApplicationSerializer(serializers.ModelSerializer):
         sanitized_phone = attrs.get("phone", "")
         attrs["phone"] = sanitized_phone.strip()
 
+        if self.instance is None:
+            for field in ("applicant_photo", "nid_document", "education_certificate"):
+                if not attrs.get(field):
+                    raise serializers.ValidationError(
+                        {field: "This field is required."}
+                    )
+
         if not attrs.get("agree_terms"):
             raise serializers.ValidationError(
                 {"agree_terms": "You must accept the terms and conditions."}
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.core.images import queue_image_processing
+
+from .models import AgentApplication
+
+
+@receiver(post_save, sender=AgentApplication)
+def process_applicant_photo(sender, instance, created, **kwargs):
+    """Normalize a newly uploaded photo in the background"""
+    if created:
+        queue_image_processing(instance, "applicant_photo")
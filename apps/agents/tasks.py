@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from apps.core.tasks import task
+
+from .models import AgentApplication
+
+
+@task
+def notify_agent_application(application_id):
+    """Tell staff about a new agent registration and confirm it to the applicant"""
+    application = AgentApplication.objects.get(pk=application_id)
+
+    if settings.STAFF_NOTIFICATION_EMAILS:
+        send_mail(
+            f"New agent registration - {application.agent_id}",
+            f"""
+A new agent registration is waiting for review.
+
+- Agent ID: {application.agent_id}
+- Name: {application.full_name}
+- Role: {application.get_applicant_role_display()}
+- Phone: {application.phone}
+            """,
+            settings.DEFAULT_FROM_EMAIL,
+            settings.STAFF_NOTIFICATION_EMAILS,
+        )
+
+    send_mail(
+        f"Agent Registration Received - {application.agent_id}",
+        f"""
+Dear {application.full_name},
+
+Thank you for registering as a BrightLife Bangladesh agent. Your agent ID is \
+{application.agent_id}. We will contact you once your registration has been \
+reviewed.
+
+Best regards,
+BrightLife Bangladesh Team
+        """,
+        settings.DEFAULT_FROM_EMAIL,
+        [application.email],
+    )
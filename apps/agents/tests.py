@@ -1,6 +1,15 @@
+import json
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from io import BytesIO
+from unittest import mock
 
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 
 from rest_framework import status
@@ -8,6 +17,13 @@ from rest_framework.test import APITestCase
 
 from PIL import Image
 
+from .captcha import (
+    REJECTED_MESSAGE,
+    UNAVAILABLE_MESSAGE,
+    CircuitBreaker,
+    captcha_verifier,
+)
+
 
 def build_test_png():
     buffer = BytesIO()
@@ -18,6 +34,19 @@ def build_test_png():
 
 
 class AgentApplicationAPITests(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
     def test_can_submit_agent_application(self):
         url = reverse("agents:agent-application-list")
         payload = {
@@ -50,3 +79,160 @@ class AgentApplicationAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertTrue(response.data.get("success"))
+
+
+class StubCaptchaProvider:
+    """Local siteverify stub with a configurable delay and verdict"""
+
+    def __init__(self):
+        self.delay = 0
+        self.success = True
+        self.requests = 0
+        self.connections = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                stub.requests += 1
+                stub.connections.add(self.client_address)
+                time.sleep(stub.delay)
+                body = json.dumps({"success": stub.success}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        # Timed-out clients hang up mid-response; that is expected here
+        self.server.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.server.server_port}/siteverify"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class CaptchaVerifierTests(SimpleTestCase):
+    """Verification against a local stub provider"""
+
+    def setUp(self):
+        cache.clear()
+        captcha_verifier.reset()
+        self.provider = StubCaptchaProvider()
+        self.settings_override = override_settings(
+            AGENT_ONBOARDING_CAPTCHA_VERIFY_URL=self.provider.url,
+            AGENT_ONBOARDING_CAPTCHA_READ_TIMEOUT=0.2,
+            AGENT_ONBOARDING_CAPTCHA_FAILURE_THRESHOLD=2,
+            AGENT_ONBOARDING_CAPTCHA_RESET_TIMEOUT=30,
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        captcha_verifier.reset()
+        self.provider.stop()
+
+    def verify(self, token="token"):
+        return captcha_verifier.verify("turnstile", "secret", token, "127.0.0.1")
+
+    def test_connection_is_reused(self):
+        for index in range(3):
+            self.assertEqual(self.verify(f"token-{index}"), (True, None))
+
+        self.assertEqual(self.provider.requests, 3)
+        self.assertEqual(len(self.provider.connections), 1)
+
+    def test_verified_token_is_cached(self):
+        self.verify()
+        self.assertEqual(self.verify(), (True, None))
+
+        self.assertEqual(self.provider.requests, 1)
+
+    def test_rejected_token_is_not_cached(self):
+        self.provider.success = False
+
+        self.assertEqual(self.verify(), (False, REJECTED_MESSAGE))
+        self.verify()
+        self.assertEqual(self.provider.requests, 2)
+
+    def test_slow_provider_opens_circuit(self):
+        self.provider.delay = 0.5
+
+        with self.assertLogs("agents", "ERROR") as logs:
+            for index in range(2):
+                self.assertEqual(
+                    self.verify(f"slow-{index}"), (False, UNAVAILABLE_MESSAGE)
+                )
+        opened = [line for line in logs.output if "circuit opened" in line]
+        self.assertEqual(len(opened), 1)
+        requests_before = self.provider.requests
+
+        # With the circuit open the worker is not held waiting on the provider
+        started = time.monotonic()
+        self.assertEqual(self.verify("fast-fail"), (False, UNAVAILABLE_MESSAGE))
+        self.assertLess(time.monotonic() - started, 0.1)
+        self.assertEqual(self.provider.requests, requests_before)
+
+    @override_settings(AGENT_ONBOARDING_CAPTCHA_FAILURE_POLICY="open")
+    def test_fail_open_policy(self):
+        self.provider.delay = 0.5
+
+        self.assertEqual(self.verify(), (True, None))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker()
+        self.now = 1000.0
+        patcher = mock.patch("apps.agents.captcha.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for _ in range(2):
+            self.breaker.record_failure(failure_threshold=2)
+
+    def test_half_open_lets_one_trial_through(self):
+        self.assertFalse(self.breaker.allow(reset_timeout=30))
+
+        self.now += 30
+        self.assertTrue(self.breaker.allow(reset_timeout=30))
+        # Concurrent callers keep failing fast while the trial is in flight
+        self.assertFalse(self.breaker.allow(reset_timeout=30))
+        self.assertFalse(self.breaker.allow(reset_timeout=30))
+
+        self.breaker.record_success()
+        self.assertTrue(self.breaker.allow(reset_timeout=30))
+        self.assertTrue(self.breaker.allow(reset_timeout=30))
+
+    def test_only_the_opening_failure_reports_it(self):
+        breaker = CircuitBreaker()
+
+        self.assertFalse(breaker.record_failure(failure_threshold=2))
+        self.assertTrue(breaker.record_failure(failure_threshold=2))
+        # Failures arriving while open (calls already in flight) do not
+        self.assertFalse(breaker.record_failure(failure_threshold=2))
+
+    def test_failed_trial_reopens(self):
+        self.now += 30
+        self.assertTrue(self.breaker.allow(reset_timeout=30))
+
+        self.breaker.record_failure(failure_threshold=2)
+
+        self.assertFalse(self.breaker.allow(reset_timeout=30))
+        self.now += 30
+        self.assertTrue(self.breaker.allow(reset_timeout=30))
+
+    def test_lost_trial_is_replaced(self):
+        self.now += 30
+        self.assertTrue(self.breaker.allow(reset_timeout=30))
+
+        self.now += 30
+        self.assertTrue(self.breaker.allow(reset_timeout=30))
@@ -1,7 +1,4 @@
-import json
 import logging
-from urllib import parse as urllib_parse
-from urllib import request as urllib_request
 
 from django.conf import settings
 
@@ -10,19 +7,72 @@ from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.throttling import SimpleRateThrottle
 
+from apps.core.cache import get_cache
+from apps.core.fieldmaps import FieldMap, truthy
+from apps.core.projections import ProjectedListMixin, ReadOnlyProjection
+
+from .captcha import captcha_verifier
 from .models import AgentApplication
 from .serializers import (
     AgentApplicationListSerializer,
     AgentApplicationSerializer,
 )
+from .tasks import notify_agent_application
 
 logger = logging.getLogger("agents")
 
+AGENT_APPLICATION_FIELDS = FieldMap(
+    fields={
+        "applicantRole": "applicant_role",
+        "agentId": "agent_id",
+        "fmName": "fm_name",
+        "roleCode": "role_code",
+        "dgmName": "dgm_name",
+        "dgmCode": "dgm_code",
+        "gmName": "gm_name",
+        "gmCode": "gm_code",
+        "fullName": "full_name",
+        "email": "email",
+        "phone": "phone",
+        "address": "address",
+        "guardianName": "guardian_name",
+        "motherName": "mother_name",
+        "presentAddress": "present_address",
+        "permanentAddress": "permanent_address",
+        "dob": "dob",
+        "birthPlace": "birth_place",
+        "nidNumber": "nid_number",
+        "bankAccountNumber": "bank_account_number",
+        "bankName": "bank_name",
+        "bankBranchName": "bank_branch_name",
+        "applicantPhotoUpload": "applicant_photo_upload",
+        "nidDocumentUpload": "nid_document_upload",
+        "educationCertificateUpload": "education_certificate_upload",
+        "password": "password",
+        "confirmPassword": "confirm_password",
+        "agreeTerms": "agree_terms",
+    },
+    files={
+        "applicantPhoto": "applicant_photo",
+        "nidDocument": "nid_document",
+        "educationCertificate": "education_certificate",
+    },
+    converters={
+        "agree_terms": truthy,
+        # Normalize phone number to avoid formatting issues
+        "phone": lambda phone: phone.replace(" ", "").strip(),
+    },
+    defaults={"password": "", "confirm_password": "", "agree_terms": False},
+    passthrough=False,
+)
+
 
 class AgentOnboardingThrottleBase(SimpleRateThrottle):
     """Common throttle base that keys on client IP and logs abuse."""
 
     scope = "agent-onboarding"
+    # Shared cache so limits hold across gunicorn workers and nodes
+    cache = get_cache(settings.THROTTLE_CACHE_ALIAS)
 
     def __init__(self):
         super().__init__()
@@ -62,10 +112,11 @@ class AgentOnboardingHourlyThrottle(AgentOnboardingThrottleBase):
     scope = "agent-onboarding"
 
 
-class AgentApplicationViewSet(viewsets.ModelViewSet):
+class AgentApplicationViewSet(ProjectedListMixin, viewsets.ModelViewSet):
     """Handles CRUD actions for agent applications."""
 
     queryset = AgentApplication.objects.all()
+    list_projection = ReadOnlyProjection(AgentApplicationListSerializer)
     parser_classes = [MultiPartParser, FormParser]
     throttle_classes = [AgentOnboardingBurstThrottle, AgentOnboardingHourlyThrottle]
 
@@ -102,6 +153,10 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
                 user_agent=request.META.get("HTTP_USER_AGENT", ""),
                 ip_address=self._get_client_ip(request),
             )
+            notify_agent_application.enqueue(
+                str(application.id),
+                idempotency_key=f"agent-application:{application.id}",
+            )
             logger.info("Agent application submitted: %s", application.agent_id)
 
             return Response(
@@ -129,58 +184,7 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
         )
 
     def _transform_request_data(self, request):
-        data = {}
-        field_mapping = {
-            "applicantRole": "applicant_role",
-            "agentId": "agent_id",
-            "fmName": "fm_name",
-            "roleCode": "role_code",
-            "dgmName": "dgm_name",
-            "dgmCode": "dgm_code",
-            "gmName": "gm_name",
-            "gmCode": "gm_code",
-            "fullName": "full_name",
-            "email": "email",
-            "phone": "phone",
-            "address": "address",
-            "guardianName": "guardian_name",
-            "motherName": "mother_name",
-            "presentAddress": "present_address",
-            "permanentAddress": "permanent_address",
-            "dob": "dob",
-            "birthPlace": "birth_place",
-            "nidNumber": "nid_number",
-            "bankAccountNumber": "bank_account_number",
-            "bankName": "bank_name",
-            "bankBranchName": "bank_branch_name",
-        }
-
-        for source_key, target_key in field_mapping.items():
-            value = request.data.get(source_key)
-            if value not in [None, ""]:
-                data[target_key] = value
-
-        file_mapping = {
-            "applicantPhoto": "applicant_photo",
-            "nidDocument": "nid_document",
-            "educationCertificate": "education_certificate",
-        }
-
-        for source_key, target_key in file_mapping.items():
-            if file := request.FILES.get(source_key):
-                data[target_key] = file
-
-        data["password"] = request.data.get("password", "")
-        data["confirm_password"] = request.data.get("confirmPassword", "")
-
-        agree_terms_raw = str(request.data.get("agreeTerms", "false")).lower()
-        data["agree_terms"] = agree_terms_raw in {"true", "1", "yes", "on"}
-
-        # Normalize phone number to avoid formatting issues
-        if phone := data.get("phone"):
-            data["phone"] = phone.replace(" ", "").strip()
-
-        return data
+        return AGENT_APPLICATION_FIELDS.transform(request.data, request.FILES)
 
     def _get_client_ip(self, request):
         forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
@@ -201,67 +205,9 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
             return "Captcha verification is required. Please refresh and try again."
 
         remote_ip = self._get_client_ip(request)
-        success, error_message = self._verify_captcha(
+        success, error_message = captcha_verifier.verify(
             provider, secret, token, remote_ip
         )
         if success:
             return None
         return error_message or "Captcha verification failed."
-
-    def _verify_captcha(self, provider, secret, token, remote_ip):
-        payload = {
-            "secret": secret,
-            "response": token,
-        }
-        if remote_ip:
-            payload["remoteip"] = remote_ip
-
-        if provider == "recaptcha":
-            endpoint = "https://www.google.com/recaptcha/api/siteverify"
-        elif provider == "turnstile":
-            endpoint = "https://challenges.cloudflare.com/turnstile/v0/siteverify"
-        else:
-            logger.error("Unsupported CAPTCHA provider configured: %s", provider)
-            return False, "Captcha configuration error. Please contact support."
-
-        try:
-            encoded = urllib_parse.urlencode(payload).encode()
-            req = urllib_request.Request(
-                endpoint,
-                data=encoded,
-                method="POST",
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            with urllib_request.urlopen(req, timeout=5) as response:
-                result = json.loads(response.read().decode("utf-8"))
-        except Exception as exc:  # pragma: no cover - network error
-            logger.error("Captcha verification error: %s", exc, exc_info=True)
-            return (
-                False,
-                "Captcha verification is temporarily unavailable. Please retry.",
-            )
-
-        if provider == "recaptcha":
-            score = result.get("score", 0)
-            if (
-                result.get("success")
-                and score >= settings.AGENT_ONBOARDING_CAPTCHA_SCORE_THRESHOLD
-            ):
-                return True, None
-            logger.warning(
-                "reCAPTCHA rejected submission (score=%s, errors=%s)",
-                score,
-                result.get("error-codes"),
-            )
-            return False, "Captcha verification failed. Please try again."
-
-        if provider == "turnstile":
-            if result.get("success"):
-                return True, None
-            logger.warning(
-                "Cloudflare Turnstile rejected submission (errors=%s)",
-                result.get("error-codes"),
-            )
-            return False, "Captcha verification failed. Please try again."
-
-        return False, "Captcha verification failed."
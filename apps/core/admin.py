@@ -1 +1,47 @@
-# Register your models here.
+from django.contrib import admin
+from django.contrib.admin.widgets import AdminFileWidget
+
+from .media import is_protected, protected_media_url
+from .models import Job, Rendition
+
+
+class ProtectedFileLink:
+    """Stands in for a FieldFile in the widget template, linking to the download view"""
+
+    def __init__(self, field_file):
+        self.name = field_file.name
+        self.url = protected_media_url(field_file)
+
+    def __str__(self):
+        return self.name
+
+
+class ProtectedFileWidget(AdminFileWidget):
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        if self.is_initial(value):
+            context["widget"]["value"] = ProtectedFileLink(value)
+        return context
+
+
+class ProtectedMediaAdminMixin:
+    """Link protected file fields (see apps.core.media) to the download view"""
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if is_protected(self.model._meta.label, db_field.name):
+            kwargs["widget"] = ProtectedFileWidget
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["id", "task", "status", "attempts", "run_at", "finished_at"]
+    list_filter = ["status", "task"]
+    search_fields = ["task", "idempotency_key"]
+    readonly_fields = ["created_at", "updated_at", "locked_by", "locked_at"]
+
+
+@admin.register(Rendition)
+class RenditionAdmin(admin.ModelAdmin):
+    list_display = ["name", "size", "bytes", "last_accessed"]
+    search_fields = ["name", "source"]
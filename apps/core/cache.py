@@ -0,0 +1,127 @@
+"""
+Cache access shared by throttles and read caches.
+
+The backend comes from ``CACHE_URL`` (see settings): Redis in production so
+every gunicorn worker and node sees the same counters and cached reads, a
+file or database cache as a fallback, and local memory for tests.
+
+``CacheNamespace`` groups related keys under a prefix with a version number
+stored in the cache itself. Bumping the version invalidates every key in the
+namespace at once, without scanning, on any backend.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.utils.connection import ConnectionProxy
+
+
+def get_cache(alias=None):
+    """
+    Return a proxy to the cache ``alias`` (default: ``settings.CACHE_ALIAS``).
+
+    The proxy resolves the per-thread connection on each access, so it is
+    safe to keep as a module or class attribute.
+    """
+    return ConnectionProxy(caches, alias or getattr(settings, "CACHE_ALIAS", "default"))
+
+
+class CacheNamespace:
+    """Namespaced cache keys with versioned invalidation"""
+
+    def __init__(self, namespace, timeout=DEFAULT_TIMEOUT, alias=None):
+        self.namespace = namespace
+        self.timeout = timeout
+        self.cache = get_cache(alias)
+
+    @property
+    def _version_key(self):
+        return f"{self.namespace}:version"
+
+    def make_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def version(self):
+        """
+        Current version of the namespace.
+
+        New versions start from the clock (in ns) rather than 1, so a version
+        key that was evicted never comes back with a number still in use.
+        """
+        version = self.cache.get(self._version_key)
+        if version is None:
+            initial = time.time_ns()
+            self.cache.add(self._version_key, initial, timeout=None)
+            version = self.cache.get(self._version_key, initial)
+        return version
+
+    async def aversion(self):
+        version = await self.cache.aget(self._version_key)
+        if version is None:
+            initial = time.time_ns()
+            await self.cache.aadd(self._version_key, initial, timeout=None)
+            version = await self.cache.aget(self._version_key, initial)
+        return version
+
+    def get(self, key, default=None):
+        return self.cache.get(self.make_key(key), default, version=self.version())
+
+    async def aget(self, key, default=None):
+        return await self.cache.aget(
+            self.make_key(key), default, version=await self.aversion()
+        )
+
+    def get_many(self, keys):
+        version = self.version()
+        found = self.cache.get_many(
+            [self.make_key(key) for key in keys], version=version
+        )
+        return {
+            key: found[self.make_key(key)]
+            for key in keys
+            if self.make_key(key) in found
+        }
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        self.cache.set(
+            self.make_key(key),
+            value,
+            self._timeout(timeout),
+            version=self.version(),
+        )
+
+    async def aset(self, key, value, timeout=DEFAULT_TIMEOUT):
+        await self.cache.aset(
+            self.make_key(key),
+            value,
+            self._timeout(timeout),
+            version=await self.aversion(),
+        )
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT):
+        return self.cache.get_or_set(
+            self.make_key(key),
+            default,
+            self._timeout(timeout),
+            version=self.version(),
+        )
+
+    def delete(self, key):
+        self.cache.delete(self.make_key(key), version=self.version())
+
+    def delete_many(self, keys):
+        version = self.version()
+        self.cache.delete_many([self.make_key(key) for key in keys], version=version)
+
+    def invalidate(self):
+        """Orphan every key in the namespace by bumping its version"""
+        try:
+            self.cache.incr(self._version_key)
+        except ValueError:
+            # Version key was evicted; the next version() starts a fresh one
+            pass
+
+    def _timeout(self, timeout):
+        return self.timeout if timeout is DEFAULT_TIMEOUT else timeout
@@ -0,0 +1,72 @@
+"""
+Conditional GET for polled single-object endpoints.
+
+The version of an object is its primary key and ``updated_at``, giving a
+weak ETag and a Last-Modified date. A request that carries
+``If-None-Match`` or ``If-Modified-Since`` is checked against the version
+read with one ``values_list`` query, and a current copy is answered with
+304 Not Modified without loading or serializing the object. Full
+responses carry the same validators plus ``Cache-Control``, so a CDN or
+reverse proxy can absorb repeat polls (``public, max-age``) or revalidate
+every time (``private, no-cache``).
+
+Writes that bypass ``save()`` have to set ``updated_at`` themselves for
+the ETag to change.
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def object_version(pk, updated_at):
+    """``(weak ETag, last modified)`` of an object"""
+    digest = hashlib.blake2b(
+        f"{pk}:{updated_at.isoformat()}".encode(), digest_size=12
+    ).hexdigest()
+    return f'W/"{digest}"', updated_at
+
+
+def instance_version(instance):
+    return object_version(instance.pk, instance.updated_at)
+
+
+def stored_version(queryset):
+    """Version of the single object in ``queryset``, or None"""
+    row = queryset.values_list("pk", "updated_at").first()
+    return object_version(*row) if row else None
+
+
+async def astored_version(queryset):
+    row = await queryset.values_list("pk", "updated_at").afirst()
+    return object_version(*row) if row else None
+
+
+def is_conditional(request):
+    """Whether the client sent validators worth checking before the lookup"""
+    return "HTTP_IF_NONE_MATCH" in request.META or (
+        "HTTP_IF_MODIFIED_SINCE" in request.META
+    )
+
+
+def add_validators(response, version, **cache_control):
+    """Set ETag, Last-Modified and ``Cache-Control`` (patch_cache_control kwargs)"""
+    etag, updated_at = version
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(updated_at.timestamp())
+    patch_cache_control(response, **cache_control)
+    return response
+
+
+def not_modified(request, version, **cache_control):
+    """304 response if the client's copy is ``version``, otherwise None"""
+    if version is None:
+        return None
+    etag, updated_at = version
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(updated_at.timestamp())
+    )
+    if response is None:
+        return None
+    return add_validators(response, version, **cache_control)
@@ -0,0 +1,201 @@
+"""
+Streaming tabular exports.
+
+``csv_chunks`` and ``xlsx_chunks`` turn a header and an iterable of rows
+into an iterator of bytes, writing each row as it arrives, so an export of
+any size is held in memory one row (plus the deflate window) at a time and
+the first bytes go out before the query has finished. ``export_response``
+wraps either in a ``StreamingHttpResponse``.
+
+String cells that a spreadsheet app would evaluate as a formula (starting
+with ``=``, ``+``, ``-``, ``@``, tab or CR) are prefixed with ``'`` in CSV
+exports; XLSX inline strings are never evaluated.
+
+The XLSX writer emits a minimal SpreadsheetML package (one sheet, inline
+strings) through ``zipfile`` on an unseekable stream; no spreadsheet
+library is needed.
+"""
+
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Characters XML 1.0 does not allow, even escaped
+INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Leading characters that make spreadsheet apps read a CSV cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Bytes collected before a chunk is handed to the response
+FLUSH_SIZE = 64 * 1024
+
+
+def cell_text(value):
+    """Text of a cell value for CSV and XLSX string cells"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(timespec="seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    return str(value)
+
+
+def csv_cell(value):
+    """``cell_text`` with formula-like strings neutralised"""
+    text = cell_text(value)
+    if isinstance(value, str) and text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+class LineBuffer:
+    """File-like object that returns what is written to it (for csv.writer)"""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(header, rows):
+    """UTF-8 CSV, with a BOM so spreadsheet apps detect the encoding"""
+    writer = csv.writer(LineBuffer())
+    yield ("\ufeff" + writer.writerow(header)).encode()
+    pending = []
+    size = 0
+    for row in rows:
+        line = writer.writerow([csv_cell(value) for value in row]).encode()
+        pending.append(line)
+        size += len(line)
+        if size >= FLUSH_SIZE:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+class ChunkSink:
+    """Unseekable file object collecting zipfile output until taken"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self.chunks)
+        self.chunks, self.size = [], 0
+        return data
+
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" '
+    'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+    '2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/'
+    '2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+XLSX_SHEET_END = "</sheetData></worksheet>"
+
+
+def xlsx_cell(value):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(INVALID_XML_CHARS.sub("", cell_text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def xlsx_row(values):
+    return "<row>" + "".join(xlsx_cell(value) for value in values) + "</row>"
+
+
+def xlsx_chunks(header, rows, sheet_name="Export"):
+    """Single-sheet XLSX workbook"""
+    sink = ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        archive.writestr(
+            "xl/workbook.xml", XLSX_WORKBOOK.format(name=escape(sheet_name[:31]))
+        )
+        archive.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+        yield sink.take()
+
+        # Size unknown up front, so always write ZIP64 headers
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((XLSX_SHEET_START + xlsx_row(header)).encode())
+            for row in rows:
+                sheet.write(xlsx_row(row).encode())
+                if sink.size >= FLUSH_SIZE:
+                    yield sink.take()
+            sheet.write(XLSX_SHEET_END.encode())
+    yield sink.take()
+
+
+def export_chunks(export_format, header, rows):
+    if export_format == "xlsx":
+        return xlsx_chunks(header, rows)
+    return csv_chunks(header, rows)
+
+
+def export_response(export_format, filename, header, rows):
+    """StreamingHttpResponse downloading ``rows`` as ``filename.<format>``"""
+    response = StreamingHttpResponse(
+        export_chunks(export_format, header, rows),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{filename}.{export_format}"'
+    )
+    # Keep proxies from buffering the whole export before sending it on
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,106 @@
+"""
+Declarative mapping of frontend (camelCase) payloads to serializer fields.
+
+Submission endpoints declare a module-level ``FieldMap`` once: the frontend
+key of each field, the model field it feeds, an optional converter and
+whether it is an upload. The declaration is compiled into a single lookup
+table at import time, so ``transform`` renames, normalizes and filters a
+payload in one pass over its keys without rebuilding any dicts per request.
+
+``ChoiceMap`` normalizes free-form frontend values ("Silver", "unmarried")
+to model choices and is used as a converter.
+"""
+
+import json
+
+
+class ChoiceMap:
+    """Case-insensitive frontend value -> model choice converter"""
+
+    def __init__(self, mapping, default=None):
+        self.mapping = {key.lower(): value for key, value in mapping.items()}
+        self.default = default
+
+    def __call__(self, value):
+        if not isinstance(value, str):
+            return value
+        fallback = value if self.default is None else self.default
+        return self.mapping.get(value.strip().lower(), fallback)
+
+
+def json_list(value):
+    """A JSON array, a single JSON value or plain text, as a list"""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str):
+        return [str(value)]
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return [value]
+    return parsed if isinstance(parsed, list) else [parsed]
+
+
+def truthy(value):
+    """Checkbox/boolean form value as a bool"""
+    return str(value).lower() in {"true", "1", "yes", "on"}
+
+
+class FieldMap:
+    """
+    Compiled frontend -> backend field mapping.
+
+    ``fields`` and ``files`` map frontend keys to serializer field names;
+    the serializer names are accepted as keys too. ``files`` entries are
+    only taken from the uploaded files, never from plain form values.
+    ``converters`` maps serializer field names to callables; a converter
+    raising ``ValueError`` or ``TypeError`` drops the value. ``defaults``
+    fill fields absent from the payload. Keys that are not declared are
+    kept as they are when ``passthrough`` is set, and dropped otherwise.
+    Empty values (``None`` and ``""``) are always skipped.
+    """
+
+    def __init__(
+        self, fields, files=None, converters=None, defaults=None, passthrough=True
+    ):
+        converters = converters or {}
+        self.lookup = {}
+        for mapping, is_file in ((fields, False), (files or {}, True)):
+            for source, target in mapping.items():
+                spec = (target, converters.get(target), is_file)
+                self.lookup[source] = spec
+                self.lookup.setdefault(target, spec)
+        self.defaults = dict(defaults or {})
+        self.passthrough = passthrough
+
+    def add(self, result, key, value, files=None):
+        """Map one ``key``/``value`` pair of the payload into ``result``"""
+        if value is None or value == "":
+            return
+        spec = self.lookup.get(key)
+        if spec is None:
+            if self.passthrough:
+                result[key] = value
+            return
+        target, convert, is_file = spec
+        if is_file and (files is None or key not in files):
+            return
+        if convert is not None:
+            try:
+                value = convert(value)
+            except (TypeError, ValueError):
+                return
+        result[target] = value
+
+    def finish(self, result):
+        """Fill in ``defaults`` missing from a mapped ``result``"""
+        for key, value in self.defaults.items():
+            result.setdefault(key, value)
+        return result
+
+    def transform(self, data, files=None):
+        """Serializer data for a frontend payload (dict or QueryDict)"""
+        result = {}
+        for key, value in data.items():
+            self.add(result, key, value, files)
+        return self.finish(result)
@@ -0,0 +1,53 @@
+"""
+Helpers for plain Django (non-DRF) views, such as the async endpoints.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+# Server-Sent Events comment line, sent to keep idle streams open
+SSE_KEEPALIVE = b": keepalive\n\n"
+
+
+def parse_request_data(request):
+    """
+    Return the request body as a dict for JSON or form-encoded requests,
+    mirroring what DRF's JSONParser/FormParser would put in request.data.
+    Raises ValueError for malformed JSON.
+    """
+    if request.content_type == "application/json":
+        if not request.body:
+            return {}
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise ValueError("JSON body must be an object")
+        return data
+    return request.POST
+
+
+def sse_message(data, event=None, id=None):
+    """One Server-Sent Events message with ``data`` as JSON"""
+    lines = []
+    if event is not None:
+        lines.append(f"event: {event}")
+    if id is not None:
+        lines.append(f"id: {id}")
+    # Compact JSON has no raw newlines, so the data fits on one line
+    lines.append(f"data: {json.dumps(data, cls=DjangoJSONEncoder)}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def release_connections():
+    """
+    Close this thread's database connections before a long-lived response.
+
+    Django closes them at ``request_finished``, i.e. only when a stream
+    ends, so an idle stream would otherwise hold a connection throughout.
+    Connections inside a transaction (tests) are left alone. Call through
+    ``sync_to_async`` from async views, on the thread the queries ran on.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
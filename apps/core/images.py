@@ -0,0 +1,159 @@
+"""
+Normalization of uploaded photos and screenshots.
+
+Uploads are validated in the request from the image header only (no full
+decode), then a background task (see ``apps.core.tasks``) rewrites the
+stored file: EXIF orientation is applied and the metadata stripped,
+images larger than ``IMAGE_MAX_DIMENSION`` are downscaled, the result is
+re-encoded as ``IMAGE_FORMAT`` and the thumbnail rendition is pre-rendered
+(see ``apps.core.renditions``).
+The model field is switched to the new file with a conditional UPDATE, so
+no save signals fire (``image_normalized`` is sent instead) and a file
+replaced in the meantime is left alone.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.images import get_image_dimensions
+from django.dispatch import Signal
+from django.utils import timezone
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .tasks import task
+
+logger = logging.getLogger("tasks")
+
+FORMAT_EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+# Sent with ``instance`` and ``field_name`` once a field points at its
+# normalized file (the UPDATE sends no save signals)
+image_normalized = Signal()
+
+
+def validate_image_upload(file):
+    """
+    Reject uploads whose header cannot be parsed or whose pixel count
+    exceeds ``IMAGE_MAX_UPLOAD_PIXELS``. Only the header is read.
+    """
+    width, height = get_image_dimensions(file)
+    if width is None or height is None:
+        raise ValidationError("Upload a valid image.")
+    if width * height > settings.IMAGE_MAX_UPLOAD_PIXELS:
+        raise ValidationError("Image resolution is too large.")
+
+
+def normalize_image(image, max_dimension):
+    """Upright, metadata-free RGB(A) copy of ``image`` within ``max_dimension``"""
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+    if settings.IMAGE_FORMAT == "WEBP" and has_alpha:
+        image = image.convert("RGBA")
+    else:
+        image = image.convert("RGB")
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    return image
+
+
+def encode_image(image):
+    """Encode as ``IMAGE_FORMAT``; no EXIF or other metadata is written"""
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=settings.IMAGE_FORMAT,
+        quality=settings.IMAGE_QUALITY,
+        optimize=True,
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def is_normalized(image):
+    return (
+        image.format == settings.IMAGE_FORMAT
+        and max(image.size) <= settings.IMAGE_MAX_DIMENSION
+        and "exif" not in image.info
+    )
+
+
+def process_image_field(instance, field_name):
+    """Normalize the image in ``instance.<field_name>`` and write its thumbnail"""
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+    storage = field_file.storage
+    old_name = field_file.name
+
+    try:
+        with storage.open(old_name, "rb") as source:
+            image = Image.open(source)
+            already_normalized = is_normalized(image)
+            image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        # PDFs and other documents accepted by the field are kept as uploaded
+        logger.info("Skipping image normalization for %s: %s", old_name, exc)
+        return
+
+    # Imported here: renditions builds on this module's encoders
+    from .renditions import delete_renditions, save_rendition
+
+    if already_normalized:
+        save_rendition(old_name, settings.IMAGE_THUMBNAIL_SIZE, image)
+        return
+
+    normalized = normalize_image(image, settings.IMAGE_MAX_DIMENSION)
+    root, _ = os.path.splitext(old_name)
+    new_name = storage.save(
+        root + FORMAT_EXTENSIONS[settings.IMAGE_FORMAT], encode_image(normalized)
+    )
+    save_rendition(new_name, settings.IMAGE_THUMBNAIL_SIZE, normalized)
+
+    model = type(instance)
+    values = {field_name: new_name}
+    # Bump auto_now fields (updated_at) as save() would, so ETags change
+    now = timezone.now()
+    for field in model._meta.concrete_fields:
+        if getattr(field, "auto_now", False):
+            values[field.attname] = now
+    updated = model._default_manager.filter(
+        pk=instance.pk, **{field_name: old_name}
+    ).update(**values)
+    if updated:
+        storage.delete(old_name)
+        delete_renditions(old_name)
+        setattr(instance, field_name, new_name)
+        logger.info("Normalized image %s -> %s", old_name, new_name)
+        image_normalized.send(sender=model, instance=instance, field_name=field_name)
+    else:
+        # The file was replaced or the row deleted while we worked
+        storage.delete(new_name)
+        delete_renditions(new_name)
+
+
+@task(max_attempts=3)
+def process_image(model_label, pk, field_name):
+    """Background entry point for process_image_field"""
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is not None:
+        process_image_field(instance, field_name)
+
+
+def queue_image_processing(instance, *field_names):
+    """Queue normalization for each of ``field_names`` that holds a file"""
+    for field_name in field_names:
+        field_file = getattr(instance, field_name)
+        if field_file:
+            process_image.enqueue(
+                instance._meta.label,
+                str(instance.pk),
+                field_name,
+                idempotency_key=(
+                    f"image:{instance._meta.label}:{instance.pk}:{field_file.name}"
+                ),
+            )
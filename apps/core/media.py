@@ -0,0 +1,175 @@
+"""
+Access-controlled downloads of sensitive uploads.
+
+Identity documents, certificates and medical records (``PROTECTED_MEDIA_FIELDS``)
+are served through ``/api/v1/media/files/<app_label.Model>/<pk>/<field>/``
+instead of their public MEDIA_URL. Django checks the permission, then hands
+the byte transfer off according to ``PROTECTED_MEDIA_SERVER``:
+
+- ``nginx``: an ``X-Accel-Redirect`` to ``PROTECTED_MEDIA_INTERNAL_URL``,
+  an ``internal`` nginx location aliased to MEDIA_ROOT;
+- ``apache``: an ``X-Sendfile`` header with the file path (mod_xsendfile);
+- unset: a ``FileResponse`` from Django, honouring single ``Range``
+  requests, for development.
+
+On object storage the request is redirected to a short-lived presigned
+URL instead, so file bytes never pass through Python in production.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
+from django.urls import reverse
+from django.utils.http import content_disposition_header
+
+# Model label -> file fields that are only downloadable through Django.
+# Their upload directories must not be served publicly (see the nginx
+# configuration in DEPLOYMENT_SSH.md).
+PROTECTED_MEDIA_FIELDS = {
+    "agents.AgentApplication": {"nid_document", "education_certificate"},
+    "membership.MembershipApplication": {"age_proof_doc", "license_doc"},
+    "membership.Nominee": {"id_proof"},
+    "membership.MedicalRecord": {"file"},
+}
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def is_protected(model_label, field_name):
+    return field_name in PROTECTED_MEDIA_FIELDS.get(model_label, ())
+
+
+def protected_media_url(field_file):
+    """Download URL of a protected ``field_file``, or None if it is empty"""
+    if not field_file:
+        return None
+    instance = field_file.instance
+    return reverse(
+        "core:protected-media",
+        kwargs={
+            "model_label": instance._meta.label,
+            "pk": str(instance.pk),
+            "field_name": field_file.field.name,
+        },
+    )
+
+
+def serve_protected_file(request, field_file):
+    """Response delivering ``field_file`` the cheapest way available"""
+    storage = field_file.storage
+    name = field_file.name
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        # Object storage: the URL is presigned and expires
+        return HttpResponseRedirect(storage.url(name))
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    filename = os.path.basename(name)
+    server = settings.PROTECTED_MEDIA_SERVER
+
+    if server in ("nginx", "apache"):
+        response = HttpResponse(content_type=content_type)
+        if server == "nginx":
+            response["X-Accel-Redirect"] = (
+                settings.PROTECTED_MEDIA_INTERNAL_URL + quote(name)
+            )
+        else:
+            response["X-Sendfile"] = path
+    else:
+        response = ranged_file_response(request, path, content_type)
+
+    response["Content-Disposition"] = content_disposition_header(False, filename)
+    response["Cache-Control"] = "private, no-store"
+    response["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+class RangeNotSatisfiable(Exception):
+    """A single byte range that lies outside the file"""
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` inclusive for a single byte range. Returns None for
+    headers this view does not support (several ranges, other units,
+    malformed), which RFC 9110 lets a server ignore and answer with the
+    whole file. Raises RangeNotSatisfiable for a range outside the file.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        # Suffix range: the last N bytes
+        if int(end) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    if end and int(end) < start:
+        # An invalid range spec, not an unsatisfiable one
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(end), size - 1) if end else size - 1
+    return start, end
+
+
+def full_file_response(path, content_type):
+    response = FileResponse(open(path, "rb"), content_type=content_type)
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def ranged_file_response(request, path, content_type):
+    """
+    FileResponse for ``path``, or a 206 partial response for a single-range
+    Range request
+    """
+    size = os.path.getsize(path)
+    range_header = request.META.get("HTTP_RANGE")
+    if range_header is None:
+        return full_file_response(path, content_type)
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    if byte_range is None:
+        return full_file_response(path, content_type)
+
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(path, start, end - start + 1),
+        status=206,
+        content_type=content_type,
+    )
+    response["Content-Length"] = str(end - start + 1)
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def read_range(path, start, length):
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.14 on 2026-10-16 22:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Rendition",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Storage name", max_length=255, unique=True
+                    ),
+                ),
+                ("source", models.CharField(db_index=True, max_length=255)),
+                (
+                    "size",
+                    models.PositiveIntegerField(help_text="Bounding box in pixels"),
+                ),
+                ("bytes", models.PositiveIntegerField()),
+                (
+                    "last_accessed",
+                    models.DateTimeField(
+                        db_index=True, default=django.utils.timezone.now
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
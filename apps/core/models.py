@@ -4,6 +4,7 @@ Add shared models, mixins, utilities here.
 """
 
 from django.db import models
+from django.utils import timezone
 
 
 class TimeStampedModel(models.Model):
@@ -18,3 +19,66 @@ class TimeStampedModel(models.Model):
     class Meta:
         abstract = True
         ordering = ["-created_at"]
+
+
+class Job(TimeStampedModel):
+    """
+    A unit of background work, queued in the database.
+
+    Rows are written in the same transaction as the request that enqueues
+    them, so a job only becomes visible to workers once that request
+    commits. See ``apps.core.tasks``.
+    """
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    task = models.CharField(max_length=200, help_text="Registered task name")
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="queued", db_index=True
+    )
+    idempotency_key = models.CharField(
+        max_length=200,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text="Enqueueing again with the same key returns the existing job",
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(
+        default=timezone.now, help_text="Earliest time the job may run"
+    )
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["run_at", "id"]
+        indexes = [
+            models.Index(fields=["status", "run_at"], name="core_job_ready_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+
+class Rendition(models.Model):
+    """A stored image rendition, tracked for LRU eviction (see apps.core.renditions)"""
+
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name")
+    source = models.CharField(max_length=255, db_index=True)
+    size = models.PositiveIntegerField(help_text="Bounding box in pixels")
+    bytes = models.PositiveIntegerField()
+    last_accessed = models.DateTimeField(default=timezone.now, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
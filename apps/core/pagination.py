@@ -0,0 +1,194 @@
+"""
+Pagination classes shared by the admin list endpoints.
+"""
+
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.db import connections
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from apps.core.cache import CacheNamespace
+
+list_counts = CacheNamespace("list-count")
+
+
+def estimated_count(queryset, cache_timeout=60, namespace=None):
+    """
+    Cheap row count for list envelopes.
+
+    An unfiltered PostgreSQL table uses the planner's estimate from pg_class;
+    anything else runs COUNT(*) once and caches it for ``cache_timeout``
+    seconds in ``namespace``, so repeated page loads do not rescan the table.
+    """
+    connection = connections[queryset.db]
+    if not queryset.query.where and connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been analyzed
+        if row and row[0] >= 0:
+            return row[0]
+
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.sha1(f"{sql}|{params}".encode()).hexdigest()
+    return (namespace or list_counts).get_or_set(digest, queryset.count, cache_timeout)
+
+
+class EnvelopeCursorPagination(CursorPagination):
+    """
+    Keyset pagination wrapped in the ``{"success": True, "data": [...]}``
+    envelope used across the API.
+
+    The cursor encodes the position of the last row seen, so fetching a page
+    deep into the list costs the same as the first page. Subclasses set
+    ``ordering``; its first field should be indexed.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    # Set to add an estimated/cached "count" to the envelope
+    include_count = False
+    count_cache_timeout = 60
+    count_cache = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.set_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def set_count(self, queryset):
+        self.count = None
+        if self.include_count:
+            self.count = estimated_count(
+                queryset, self.count_cache_timeout, self.count_cache
+            )
+
+    def get_paginated_response(self, data):
+        payload = {
+            "success": True,
+            "data": data,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        if self.include_count:
+            payload["count"] = self.count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        paginated = super().get_paginated_response_schema(schema)
+        paginated["properties"] = {
+            "success": {"type": "boolean", "example": True},
+            "data": schema,
+            **{
+                key: value
+                for key, value in paginated["properties"].items()
+                if key != "results"
+            },
+        }
+        if self.include_count:
+            paginated["properties"]["count"] = {"type": "integer", "example": 123}
+        paginated["required"] = ["success", "data"]
+        return paginated
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+    )
+
+
+def after_position(ordering, position):
+    """Filter for rows that come after ``position`` in ``ordering``"""
+    condition = Q()
+    equal = {}
+    for field, value in zip(ordering, position):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+class KeysetCursorPagination(EnvelopeCursorPagination):
+    """
+    Cursor pagination positioned on every ``ordering`` field.
+
+    DRF's cursor holds the value of the first ordering field only and steps
+    over ties on it with an offset, so rows are skipped or repeated when the
+    list changes between pages, and a first field with few distinct values
+    (a search rank) turns pages into offset scans. Here the cursor holds the
+    last row's value of each field; ``ordering`` must end in a unique field.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.set_count(queryset)
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = tuple(self.get_ordering(request, queryset, view))
+        self.position, self.reverse = self.decode_cursor(request)
+
+        ordering = reverse_ordering(self.ordering) if self.reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(after_position(ordering, self.position))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if self.reverse:
+            self.page.reverse()
+
+        self.display_page_controls = self.template is not None and bool(
+            self.get_next_link() or self.get_previous_link()
+        )
+        return self.page
+
+    def get_next_link(self):
+        if not self.page or not (self.has_more or self.reverse):
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.page or not (self.has_more if self.reverse else self.position):
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            values = [row[field.lstrip("-")] for field in self.ordering]
+        else:
+            values = [getattr(row, field.lstrip("-")) for field in self.ordering]
+        return [str(value) for value in values]
+
+    def encode_cursor(self, position, reverse):
+        data = {"p": position, "r": 1} if reverse else {"p": position}
+        token = urlsafe_b64encode(json.dumps(data).encode()).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """(position, reverse) from the request's cursor, or (None, False)"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            data = json.loads(urlsafe_b64decode(token.encode("ascii")))
+            position = data["p"]
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError(position)
+        except (TypeError, ValueError, KeyError, UnicodeError, BinasciiError):
+            raise NotFound(self.invalid_cursor_message)
+        return [str(value) for value in position], bool(data.get("r"))
@@ -0,0 +1,213 @@
+"""
+Read-only fast path for list and profile responses.
+
+A ``ModelSerializer`` resolves every field of every object through DRF's
+generic field machinery, on model instances the queryset had to build
+first. For flat read-only projections (``*ListSerializer``) most of that
+work is redundant. ``ReadOnlyProjection`` compiles such a serializer once
+into a plan of ``(output key, column, converter)`` entries and applies it
+to ``.values()`` rows or to instances, producing the same JSON.
+
+Viewsets opt in with ``ProjectedListMixin`` and ``list_projection``;
+leaving ``list_projection`` unset keeps the serializer path. Serializers
+with fields the plan cannot reproduce (nested or method fields, dotted
+sources, relations) raise ``ImproperlyConfigured`` when first used.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.encoding import iri_to_uri
+from django.utils.functional import cached_property
+
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .renditions import rendition_url
+from .serializers import ProtectedFileField, RenditionField
+
+# Fields whose representation of a database value is the value itself
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.FloatField,
+    serializers.JSONField,
+)
+
+
+# Converter kinds finished per request by ReadOnlyProjection.bind()
+URL = "url"
+DATETIME = "datetime"
+
+
+def file_name(value):
+    """Storage name from a FieldFile or a ``.values()`` column"""
+    return getattr(value, "name", value)
+
+
+class ReadOnlyProjection:
+    """Compiled read-only form of ``serializer_class``"""
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def plan(self):
+        model = self.serializer_class.Meta.model
+        plan = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+            if "." in source or source == "*":
+                raise ImproperlyConfigured(
+                    f"{self.serializer_class.__name__}.{name}: source {source!r} "
+                    "cannot be projected"
+                )
+            convert, kind = self.converter(name, field, model, source)
+            plan.append((name, source, convert, kind))
+        return plan
+
+    def converter(self, name, field, model, source):
+        """``(converter or None, URL/DATETIME for per-request handling or None)``"""
+        if isinstance(field, RenditionField):
+            size = field.size
+            return lambda value: rendition_url(value, size), URL
+        if isinstance(field, ProtectedFileField):
+            raise ImproperlyConfigured(
+                f"{self.serializer_class.__name__}.{name}: protected files need "
+                "the instance and cannot be projected"
+            )
+        if isinstance(field, serializers.FileField):
+            storage = model._meta.get_field(source).storage
+
+            def file_url(value):
+                value = file_name(value)
+                return storage.url(value) if value else None
+
+            return file_url, URL
+        if isinstance(field, serializers.UUIDField):
+            return str, None
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+            default_iso = (
+                isinstance(output_format, str)
+                and output_format.lower() == ISO_8601
+                and not hasattr(field, "timezone")
+            )
+            return field.to_representation, DATETIME if default_iso else None
+        if isinstance(field, (serializers.DateField, serializers.DecimalField)):
+            return field.to_representation, None
+        if isinstance(field, PASSTHROUGH_FIELDS):
+            return None, None
+        raise ImproperlyConfigured(
+            f"{self.serializer_class.__name__}.{name}: "
+            f"{type(field).__name__} cannot be projected"
+        )
+
+    @property
+    def columns(self):
+        return [source for _, source, _, _ in self.plan]
+
+    def values(self, queryset, *extra):
+        """``queryset`` as ``.values()`` rows with the plan's columns (and ``extra``)"""
+        return queryset.values(*dict.fromkeys(self.columns + list(extra)))
+
+    def bind(self, request=None):
+        """
+        ``(key, column, converter)`` steps with the per-request parts (URL
+        origin, current timezone) resolved once rather than per row
+        """
+        absolute = absolute_url_builder(request)
+        current_timezone = timezone.get_current_timezone() if settings.USE_TZ else None
+        steps = []
+        for name, source, convert, kind in self.plan:
+            if kind == URL and absolute is not None:
+                convert = absolute_url(convert, absolute)
+            elif kind == DATETIME and current_timezone is not None:
+                convert = iso_datetime(convert, current_timezone)
+            steps.append((name, source, convert))
+        return steps
+
+    def represent(self, row, request=None, steps=None):
+        """Output of the serializer for a ``.values()`` row or an instance"""
+        get = row.__getitem__ if isinstance(row, dict) else row.__getattribute__
+        data = {}
+        for name, source, convert in steps or self.bind(request):
+            value = get(source)
+            if value is not None and convert is not None:
+                value = convert(value)
+            data[name] = value
+        return data
+
+    def represent_many(self, rows, request=None):
+        steps = self.bind(request)
+        return [self.represent(row, steps=steps) for row in rows]
+
+
+def absolute_url_builder(request):
+    """``request.build_absolute_uri`` with the origin looked up once"""
+    if request is None:
+        return None
+    origin = request.build_absolute_uri("/")[:-1]
+
+    def absolute(url):
+        if url.startswith("/") and not url.startswith("//"):
+            if "/./" not in url and "/../" not in url:
+                return iri_to_uri(origin + url)
+        return request.build_absolute_uri(url)
+
+    return absolute
+
+
+def absolute_url(convert, absolute):
+    def convert_absolute(value):
+        url = convert(value)
+        return absolute(url) if url else url
+
+    return convert_absolute
+
+
+def iso_datetime(convert, current_timezone):
+    """DRF's default ISO 8601 output, in a timezone looked up once"""
+
+    def convert_iso(value):
+        if value.tzinfo is None:
+            return convert(value)
+        text = value.astimezone(current_timezone).isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    return convert_iso
+
+
+class ProjectedListMixin:
+    """
+    Viewset mixin serving ``list`` through ``list_projection`` (a
+    ReadOnlyProjection) from ``.values()`` rows. Annotations and the
+    pagination ordering fields are fetched too, as cursor pagination reads
+    its position from the rows.
+    """
+
+    list_projection = None
+
+    def list(self, request, *args, **kwargs):
+        if self.list_projection is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = getattr(self.paginator, "ordering", None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        rows = self.list_projection.values(
+            queryset,
+            *queryset.query.annotations,
+            *(field.lstrip("-") for field in ordering),
+        )
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(
+                self.list_projection.represent_many(page, request)
+            )
+        return Response(self.list_projection.represent_many(rows, request))
@@ -0,0 +1,156 @@
+"""
+Publish/subscribe channels for pushing events to open connections.
+
+The broker comes from ``PUBSUB_URL`` (see settings):
+
+    memory://              in-process; only reaches subscribers served by the
+                           publishing process (tests, a single ASGI worker)
+    redis://host:6379/2    Redis pub/sub, shared by every worker and node
+
+Messages are JSON objects. ``publish`` is synchronous and may be called
+from any thread (sync views, admin actions, on_commit hooks). ``subscribe``
+is awaited on the event loop serving the connection and registers the
+subscription before returning, so nothing published after it returns is
+missed. Delivery is best effort: messages are not stored for subscribers
+that are not connected.
+"""
+
+import asyncio
+import json
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+def encode(message):
+    return json.dumps(message, cls=DjangoJSONEncoder)
+
+
+class InMemoryBroker:
+    """Process-local broker delivering to asyncio queues"""
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        """Deliver ``message`` to the channel's subscribers; returns their count"""
+        data = encode(message)
+        with self._lock:
+            subscriptions = list(self._channels.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(data)
+        return len(subscriptions)
+
+    async def subscribe(self, channel):
+        subscription = MemorySubscription(self, channel)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._channels.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._channels[subscription.channel]
+
+
+class MemorySubscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def deliver(self, data):
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, data)
+        except RuntimeError:
+            # The subscriber's event loop is gone
+            self.broker.unsubscribe(self)
+
+    async def get(self, timeout=None):
+        """Next message, or None if nothing arrives within ``timeout`` seconds"""
+        try:
+            data = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return json.loads(data)
+
+    async def close(self):
+        self.broker.unsubscribe(self)
+
+
+class RedisBroker:
+    """
+    Redis pub/sub. Each subscription holds its own connection; publishing
+    shares one client per process.
+    """
+
+    def __init__(self, url):
+        import redis
+
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, message):
+        return self.client.publish(channel, encode(message))
+
+    async def subscribe(self, channel):
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+        except BaseException:
+            await client.aclose()
+            raise
+        return RedisSubscription(client, pubsub)
+
+
+class RedisSubscription:
+    def __init__(self, client, pubsub):
+        self.client = client
+        self.pubsub = pubsub
+
+    async def get(self, timeout=None):
+        """Next message, or None if nothing arrives within ``timeout`` seconds"""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            # Returns None early for skipped subscribe confirmations
+            message = await self.pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=remaining
+            )
+            if message is not None:
+                return json.loads(message["data"])
+            if deadline is not None and loop.time() >= deadline:
+                return None
+
+    async def close(self):
+        try:
+            await self.pubsub.aclose()
+        finally:
+            await self.client.aclose()
+
+
+@lru_cache(maxsize=None)
+def _broker(url):
+    scheme = url.partition("://")[0]
+    if scheme == "memory":
+        return InMemoryBroker()
+    if scheme in ("redis", "rediss"):
+        return RedisBroker(url)
+    raise ImproperlyConfigured(f"Unsupported PUBSUB_URL scheme {scheme!r}")
+
+
+def get_broker():
+    """Broker for ``settings.PUBSUB_URL``, one per process"""
+    return _broker(settings.PUBSUB_URL)
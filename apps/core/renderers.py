@@ -0,0 +1,69 @@
+"""
+orjson-backed JSON renderer and parser (``JSON_BACKEND=orjson``).
+
+``ORJSONRenderer`` produces the same bytes as DRF's compact ``JSONRenderer``
+for the types the API returns: strings, numbers, UUIDs (hyphenated),
+datetimes (ISO 8601, ``Z`` for UTC), dates, Decimals (anything the
+serializers have not already turned into strings goes through DRF's own
+encoder ``default``) and ``\\u2028``/``\\u2029`` escaped. Floats may be
+spelled differently (``1e16`` rather than ``1e+16``), which parses to the
+same number. Requests for indented or ASCII-only output are rendered by
+the stdlib path.
+
+``ORJSONParser`` parses UTF-8 bodies with orjson and defers to
+``JSONParser`` for other charsets or when ``STRICT_JSON`` is off. Integers
+beyond 64 bits are read as floats.
+"""
+
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+import orjson
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Line and paragraph separators, escaped by DRF so output is valid JavaScript
+LINE_SEPARATOR = "\u2028".encode()
+PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+UTF8_CHARSETS = {"utf-8", "utf8"}
+
+
+class ORJSONRenderer(JSONRenderer):
+    """DRF's JSONRenderer output, encoded with orjson"""
+
+    default = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        rendered = orjson.dumps(data, default=self.default, option=ORJSON_OPTIONS)
+        if LINE_SEPARATOR in rendered or PARAGRAPH_SEPARATOR in rendered:
+            rendered = rendered.replace(LINE_SEPARATOR, b"\\u2028").replace(
+                PARAGRAPH_SEPARATOR, b"\\u2029"
+            )
+        return rendered
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser reading UTF-8 bodies with orjson"""
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if encoding.lower() not in UTF8_CHARSETS or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,197 @@
+"""
+Size-keyed image renditions (thumbnails) generated on demand.
+
+``rendition_url(field_file, size)`` returns a signed URL under
+``/api/v1/media/renditions/``. The first request renders the image at
+``size`` (one of ``RENDITION_SIZES``) and stores it next to the original
+as ``<name>.<size>x<size>.<ext>``; later requests redirect straight to the
+stored file, so the bytes are served by the media server, not Django.
+Signing keeps clients from asking for arbitrary files or sizes.
+
+The signature has no timestamp, so a rendition URL never expires and needs
+no login: anyone holding it can fetch the rendition, which is itself served
+from the public MEDIA_URL. Only use renditions for publicly served images
+(photos, payment screenshots), never for ``PROTECTED_MEDIA_FIELDS``.
+
+Every rendition is recorded in ``core.Rendition`` with its byte size and
+last access time. When the total exceeds ``RENDITION_CACHE_MAX_BYTES`` the
+least recently used renditions are deleted; they are re-rendered if asked
+for again. The total is kept in the cache, adjusted as renditions are
+stored and deleted, and recounted from the table when it is missing or
+older than ``STORED_BYTES_TIMEOUT``.
+"""
+
+import logging
+import os
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db.models import Sum
+from django.urls import get_script_prefix, reverse
+from django.utils import timezone
+
+from PIL import Image, UnidentifiedImageError
+
+from .cache import get_cache
+from .images import FORMAT_EXTENSIONS, encode_image, normalize_image
+from .models import Rendition
+
+logger = logging.getLogger("core")
+
+RENDITION_SALT = "core.renditions"
+RENDERABLE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+TOKEN_PLACEHOLDER = "__token__"
+
+STORED_BYTES_KEY = "renditions:stored-bytes"
+# Recount at least this often (seconds) to correct drift
+STORED_BYTES_TIMEOUT = 3600
+
+rendition_cache = get_cache()
+
+
+def rendition_name(name, size):
+    """Storage name of the ``size`` rendition stored next to ``name``"""
+    root, _ = os.path.splitext(name)
+    return f"{root}.{size}x{size}{FORMAT_EXTENSIONS[settings.IMAGE_FORMAT]}"
+
+
+def is_renderable(name):
+    return os.path.splitext(name)[1].lower() in RENDERABLE_EXTENSIONS
+
+
+def rendition_url(field_file, size=None):
+    """
+    Signed URL of the ``size`` rendition of ``field_file`` (or of a storage
+    name), or None
+    """
+    name = getattr(field_file, "name", field_file)
+    if not field_file or not name or not is_renderable(name):
+        return None
+    size = size or settings.IMAGE_THUMBNAIL_SIZE
+    # Untimestamped signature, so the URL is stable and cacheable
+    token = signing.Signer(salt=RENDITION_SALT).sign_object([name, size], compress=True)
+    return rendition_path(get_script_prefix()).replace(TOKEN_PLACEHOLDER, token)
+
+
+@lru_cache(maxsize=8)
+def rendition_path(script_prefix):
+    """
+    Rendition URL with a placeholder token, resolved once as ``reverse()``
+    dominates the cost of list thumbnails. ``script_prefix`` is only the
+    cache key: ``reverse()`` prepends the active script prefix itself, so a
+    cached path is valid only for the prefix it was built under (callers
+    pass ``get_script_prefix()``).
+    """
+    return reverse("core:rendition", kwargs={"token": TOKEN_PLACEHOLDER})
+
+
+def load_token(token):
+    """``(source_name, size)`` from a rendition URL token; raises BadSignature"""
+    name, size = signing.Signer(salt=RENDITION_SALT).unsign_object(token)
+    return name, int(size)
+
+
+def save_rendition(source_name, size, image=None):
+    """
+    Render ``source_name`` (or the already-open ``image``) at ``size`` and
+    store it; returns the rendition's storage name, or None if the source
+    is missing or not an image.
+    """
+    name = rendition_name(source_name, size)
+    if image is None:
+        try:
+            with default_storage.open(source_name, "rb") as source:
+                image = Image.open(source)
+                image.load()
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            return None
+
+    content = encode_image(normalize_image(image, size))
+    previous = Rendition.objects.filter(name=name).values_list("bytes", flat=True)
+    replaced_bytes = previous.first() or 0
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    saved = default_storage.save(name, content)
+    if saved != name:
+        # Another request stored the same rendition first
+        default_storage.delete(saved)
+
+    Rendition.objects.update_or_create(
+        name=name,
+        defaults={
+            "source": source_name,
+            "size": size,
+            "bytes": content.size,
+            "last_accessed": timezone.now(),
+        },
+    )
+    adjust_stored_bytes(content.size - replaced_bytes)
+    evict_renditions()
+    return name
+
+
+def get_rendition(source_name, size):
+    """Storage name of the rendition, rendering it on first use"""
+    name = rendition_name(source_name, size)
+    now = timezone.now()
+    touched_before = now - timedelta(seconds=settings.RENDITION_TOUCH_INTERVAL)
+    rendition = Rendition.objects.filter(name=name).first()
+    if rendition is not None and default_storage.exists(name):
+        # Throttle access-time writes; LRU order only needs to be approximate
+        if rendition.last_accessed < touched_before:
+            Rendition.objects.filter(pk=rendition.pk).update(last_accessed=now)
+        return name
+    return save_rendition(source_name, size)
+
+
+def delete_renditions(source_name):
+    """Delete every stored rendition of ``source_name``"""
+    freed = 0
+    for rendition in Rendition.objects.filter(source=source_name):
+        default_storage.delete(rendition.name)
+        rendition.delete()
+        freed += rendition.bytes
+    adjust_stored_bytes(-freed)
+
+
+def stored_bytes():
+    """Total size of the stored renditions, from the cache when counted"""
+    total = rendition_cache.get(STORED_BYTES_KEY)
+    if total is None:
+        total = Rendition.objects.aggregate(total=Sum("bytes"))["total"] or 0
+        rendition_cache.add(STORED_BYTES_KEY, total, timeout=STORED_BYTES_TIMEOUT)
+    return total
+
+
+def adjust_stored_bytes(delta):
+    if not delta:
+        return
+    try:
+        rendition_cache.incr(STORED_BYTES_KEY, delta)
+    except ValueError:
+        # Not counted yet (or expired); the next stored_bytes() recounts
+        pass
+
+
+def evict_renditions(max_bytes=None):
+    """Delete least recently used renditions until under ``max_bytes``"""
+    max_bytes = max_bytes or settings.RENDITION_CACHE_MAX_BYTES
+    total = stored_bytes()
+    if total <= max_bytes:
+        return 0
+
+    evicted = 0
+    freed = 0
+    for rendition in Rendition.objects.order_by("last_accessed", "id").iterator():
+        if total - freed <= max_bytes:
+            break
+        default_storage.delete(rendition.name)
+        rendition.delete()
+        freed += rendition.bytes
+        evicted += 1
+    adjust_stored_bytes(-freed)
+    logger.info("Evicted %s image rendition(s)", evicted)
+    return evicted
@@ -0,0 +1,75 @@
+from rest_framework import serializers
+
+from .media import is_protected, protected_media_url
+from .renditions import rendition_url
+from .storage import resolve_upload
+
+
+class RenditionField(serializers.Field):
+    """
+    Read-only URL of an image rendition, e.g.
+    ``photo_thumbnail = RenditionField(source="photo")``
+    """
+
+    def __init__(self, size=None, **kwargs):
+        self.size = size
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        url = rendition_url(value, self.size)
+        request = self.context.get("request")
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class DirectUploadField(serializers.CharField):
+    """
+    Write-only upload token from a direct-to-storage upload (see
+    apps.core.storage), validated into the object's storage key, e.g.
+    ``screenshot_upload = DirectUploadField("payment-screenshot",
+    source="screenshot", required=False)``
+    """
+
+    def __init__(self, purpose, **kwargs):
+        self.purpose = purpose
+        kwargs["write_only"] = True
+        super().__init__(**kwargs)
+
+    @property
+    def model_field(self):
+        """Model file field the key is saved to, when on a ModelSerializer"""
+        model = getattr(getattr(self.parent, "Meta", None), "model", None)
+        return model._meta.get_field(self.source) if model is not None else None
+
+    def to_internal_value(self, data):
+        return resolve_upload(
+            super().to_internal_value(data), self.purpose, model_field=self.model_field
+        )
+
+
+class ProtectedFileField(serializers.FileField):
+    """File field rendered as its access-controlled download URL"""
+
+    def to_representation(self, value):
+        url = protected_media_url(value)
+        request = self.context.get("request")
+        if url and request is not None:
+            return request.build_absolute_uri(url)
+        return url
+
+
+class ProtectedMediaMixin:
+    """
+    ModelSerializer mixin rendering the model's protected file fields (see
+    apps.core.media) as ProtectedFileField instead of public media URLs
+    """
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(
+            field_name, model_field
+        )
+        if is_protected(self.Meta.model._meta.label, field_name):
+            field_class = ProtectedFileField
+        return field_class, field_kwargs
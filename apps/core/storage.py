@@ -0,0 +1,165 @@
+"""
+Direct-to-storage uploads.
+
+With ``STORAGE_BACKEND=s3`` the frontend can upload files straight to the
+bucket instead of streaming them through a gunicorn worker:
+
+1. ``POST /api/v1/media/uploads/`` with a purpose (e.g.
+   ``payment-screenshot``), content type and size returns a presigned
+   POST (``url`` + ``fields``) and an upload ``token``.
+2. The browser POSTs the file to ``url`` with ``fields``. The bucket
+   enforces the content type and size limit of the purpose.
+3. The form submission sends ``token`` in place of the file (e.g.
+   ``screenshotUpload``); ``resolve_upload`` checks the signature, purpose
+   and stored object, and that the key is not already in use, before it
+   is saved on the model.
+
+With the filesystem backend presigning is unavailable and files are
+uploaded as multipart form data, as before.
+"""
+
+import os
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .images import validate_image_upload
+
+UPLOAD_TOKEN_SALT = "core.storage.upload"
+
+IMAGE_TYPES = ["image/jpeg", "image/png", "image/webp"]
+DOCUMENT_TYPES = IMAGE_TYPES + ["application/pdf"]
+
+# Upload purposes: where the object goes and what the bucket accepts
+UPLOAD_PURPOSES = {
+    "payment-screenshot": {
+        "prefix": "payment_proofs",
+        "max_bytes": 5 * 1024 * 1024,
+        "content_types": DOCUMENT_TYPES,
+    },
+    "member-photo": {
+        "prefix": "photos",
+        "max_bytes": 2 * 1024 * 1024,
+        "content_types": IMAGE_TYPES,
+    },
+    "agent-photo": {
+        "prefix": "agents/photos",
+        "max_bytes": 2 * 1024 * 1024,
+        "content_types": IMAGE_TYPES,
+    },
+    "agent-nid": {
+        "prefix": "agents/nid",
+        "max_bytes": 5 * 1024 * 1024,
+        "content_types": DOCUMENT_TYPES,
+    },
+    "agent-education": {
+        "prefix": "agents/education",
+        "max_bytes": 5 * 1024 * 1024,
+        "content_types": DOCUMENT_TYPES,
+    },
+}
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "application/pdf": ".pdf",
+}
+
+
+class DirectUploadUnavailable(Exception):
+    """The configured storage cannot presign uploads"""
+
+
+def direct_uploads_enabled(storage=None):
+    storage = storage or default_storage
+    return hasattr(storage, "bucket_name") and hasattr(storage, "connection")
+
+
+def presign_upload(purpose, content_type, size, storage=None):
+    """
+    Presigned POST for one object of ``purpose``. Raises ValidationError
+    for a request the purpose does not allow and DirectUploadUnavailable
+    on storages without presigning.
+    """
+    storage = storage or default_storage
+    if not direct_uploads_enabled(storage):
+        raise DirectUploadUnavailable("Direct uploads are not enabled")
+
+    spec = UPLOAD_PURPOSES.get(purpose)
+    if spec is None:
+        raise ValidationError("Unknown upload purpose.")
+    if content_type not in spec["content_types"]:
+        raise ValidationError("This file type is not allowed.")
+    if not 0 < size <= spec["max_bytes"]:
+        raise ValidationError(
+            f"File size must be less than {spec['max_bytes'] // (1024 * 1024)}MB"
+        )
+
+    key = "{}/{:%Y/%m}/{}{}".format(
+        spec["prefix"],
+        timezone.now(),
+        uuid.uuid4().hex,
+        CONTENT_TYPE_EXTENSIONS[content_type],
+    )
+    presigned = storage.connection.meta.client.generate_presigned_post(
+        Bucket=storage.bucket_name,
+        # Object key in the bucket, including the storage's location prefix
+        Key=storage._normalize_name(key),
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, spec["max_bytes"]],
+        ],
+        ExpiresIn=settings.DIRECT_UPLOAD_EXPIRY,
+    )
+    return {
+        "url": presigned["url"],
+        "fields": presigned["fields"],
+        "key": key,
+        "token": signing.dumps(
+            {"key": key, "purpose": purpose}, salt=UPLOAD_TOKEN_SALT
+        ),
+    }
+
+
+def resolve_upload(token, purpose, storage=None, model_field=None):
+    """
+    Storage key of a finished direct upload; raises ValidationError.
+
+    With ``model_field``, a key already saved in that field is rejected: a
+    replayed token would make several rows share one object, and
+    normalizing one of them deletes the file under the others. Once
+    normalized the original object is gone, so later replays fail the
+    existence check.
+    """
+    storage = storage or default_storage
+    try:
+        payload = signing.loads(
+            token,
+            salt=UPLOAD_TOKEN_SALT,
+            max_age=settings.DIRECT_UPLOAD_TOKEN_MAX_AGE,
+        )
+    except signing.BadSignature:
+        raise ValidationError("Invalid or expired upload token.")
+
+    key = payload.get("key")
+    if payload.get("purpose") != purpose or not key:
+        raise ValidationError("Upload token is not valid for this field.")
+    if model_field is not None and (
+        model_field.model._default_manager.filter(**{model_field.name: key}).exists()
+    ):
+        raise ValidationError("This upload has already been used.")
+    if not storage.exists(key):
+        raise ValidationError("The uploaded file was not found.")
+    if storage.size(key) > UPLOAD_PURPOSES[purpose]["max_bytes"]:
+        raise ValidationError("The uploaded file is too large.")
+
+    if os.path.splitext(key)[1] != ".pdf":
+        with storage.open(key, "rb") as uploaded:
+            validate_image_upload(uploaded)
+    return key
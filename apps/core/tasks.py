@@ -0,0 +1,256 @@
+"""
+Database-backed background tasks.
+
+Declare a task with ``@task`` in an app's ``tasks.py`` and queue it from a
+request with ``.enqueue()``::
+
+    @task(max_attempts=3)
+    def send_receipt(payment_proof_id):
+        ...
+
+    send_receipt.enqueue(str(proof.id), idempotency_key=f"receipt:{proof.id}")
+
+Jobs are rows in ``core.Job`` written in the request's transaction, so a
+job is only picked up once the submission has committed and is dropped if
+it rolls back. ``python manage.py run_tasks`` claims due jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` (several workers can run side by
+side), retries failures with exponential backoff and re-queues jobs whose
+worker died mid-run, up to their attempt limit. TASKS_LOCK_TIMEOUT counts
+from the start of each job, not from the claim of its batch.
+
+Arguments must be JSON-serializable; pass primary keys rather than model
+instances.
+"""
+
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from .models import Job
+
+logger = logging.getLogger("tasks")
+
+registry = {}
+
+
+class Task:
+    """A registered background task wrapping a plain function"""
+
+    def __init__(self, func, name=None, max_attempts=None):
+        self.func = func
+        self.name = name or f"{func.__module__}.{func.__qualname__}"
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, *args, idempotency_key=None, delay=None, **kwargs):
+        """
+        Queue the task and return its ``Job``.
+
+        With ``idempotency_key``, a job already queued under that key is
+        returned instead of creating a second one.
+        """
+        fields = {
+            "task": self.name,
+            "args": list(args),
+            "kwargs": kwargs,
+            "max_attempts": self.max_attempts or settings.TASKS_MAX_ATTEMPTS,
+            "run_at": timezone.now() + (delay or timedelta()),
+        }
+        if idempotency_key is None:
+            return Job.objects.create(**fields)
+
+        try:
+            with transaction.atomic():
+                return Job.objects.create(idempotency_key=idempotency_key, **fields)
+        except IntegrityError:
+            return Job.objects.get(idempotency_key=idempotency_key)
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Register ``func`` as a background task"""
+
+    def register(func):
+        registered = Task(func, name=name, max_attempts=max_attempts)
+        registry[registered.name] = registered
+        return registered
+
+    return register(func) if func is not None else register
+
+
+def autodiscover_tasks():
+    """Import every installed app's ``tasks`` module so its tasks register"""
+    autodiscover_modules("tasks")
+
+
+def get_task(name):
+    """
+    Look up a registered task, importing it by its dotted name if needed
+    (tasks declared outside a ``tasks`` module are not autodiscovered).
+    """
+    if name not in registry:
+        try:
+            import_string(name)
+        except ImportError:
+            pass
+    return registry.get(name)
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay(attempts):
+    """Backoff before retry number ``attempts``, doubling up to a cap"""
+    delay = settings.TASKS_RETRY_BACKOFF * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.TASKS_RETRY_BACKOFF_MAX))
+
+
+def fail_abandoned_jobs(now, stale):
+    """
+    Mark jobs whose worker died on their last attempt as failed. A job
+    that kills or hangs its worker (out of memory, an oversized image)
+    would otherwise be reclaimed forever.
+    """
+    abandoned = list(
+        Job.objects.select_for_update(skip_locked=True)
+        .filter(status="running", locked_at__lt=stale, attempts__gte=F("max_attempts"))
+        .values_list("id", "task")
+    )
+    if not abandoned:
+        return 0
+    Job.objects.filter(id__in=[pk for pk, _ in abandoned]).update(
+        status="failed",
+        finished_at=now,
+        last_error=(
+            f"Worker did not finish within {settings.TASKS_LOCK_TIMEOUT}s "
+            "on the last attempt"
+        ),
+        locked_by="",
+        locked_at=None,
+        updated_at=now,
+    )
+    for pk, name in abandoned:
+        logger.error("Task %s #%s failed permanently: worker abandoned it", name, pk)
+    return len(abandoned)
+
+
+def claim_jobs(worker_id, limit=10, due_by=None):
+    """
+    Lock up to ``limit`` jobs due by ``due_by`` (default: now) for
+    ``worker_id`` and mark them running
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    with transaction.atomic():
+        fail_abandoned_jobs(now, stale)
+        ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status="queued", run_at__lte=due_by or now)
+                | Q(
+                    status="running",
+                    locked_at__lt=stale,
+                    attempts__lt=F("max_attempts"),
+                )
+            )
+            .order_by("run_at", "id")
+            .values_list("id", flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids).update(
+            status="running",
+            locked_by=worker_id,
+            locked_at=now,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+    return list(Job.objects.filter(id__in=ids).order_by("run_at", "id"))
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome; returns True on success"""
+    registered = get_task(job.task)
+    try:
+        if registered is None:
+            raise LookupError(f"Unknown task '{job.task}'")
+        registered.func(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if registered is not None and job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.run_at = now + retry_delay(job.attempts)
+            logger.warning(
+                "Task %s #%s failed (attempt %s/%s), retrying at %s",
+                job.task,
+                job.pk,
+                job.attempts,
+                job.max_attempts,
+                job.run_at,
+            )
+        else:
+            job.status = "failed"
+            job.finished_at = now
+            logger.error("Task %s #%s failed permanently\n%s", job.task, job.pk, error)
+        job.last_error = error
+        job.locked_by = ""
+        job.locked_at = None
+        job.save(
+            update_fields=[
+                "status",
+                "run_at",
+                "finished_at",
+                "last_error",
+                "locked_by",
+                "locked_at",
+                "updated_at",
+            ]
+        )
+        return False
+
+    job.status = "succeeded"
+    job.finished_at = timezone.now()
+    job.locked_by = ""
+    job.locked_at = None
+    job.save(
+        update_fields=["status", "finished_at", "locked_by", "locked_at", "updated_at"]
+    )
+    return True
+
+
+def renew_claim(job):
+    """
+    Restart the lock timeout of a claimed job just before it runs. Later
+    jobs of a batch wait while earlier ones run; one that waited past
+    TASKS_LOCK_TIMEOUT may have been reclaimed by another worker, and is
+    then left to it (returns False).
+    """
+    now = timezone.now()
+    renewed = Job.objects.filter(
+        pk=job.pk, status="running", locked_by=job.locked_by, locked_at=job.locked_at
+    ).update(locked_at=now, updated_at=now)
+    job.locked_at = now
+    return bool(renewed)
+
+
+def run_pending(worker_id=None, limit=10, due_by=None):
+    """Claim and run one batch of due jobs; returns how many were run"""
+    jobs = claim_jobs(worker_id or default_worker_id(), limit=limit, due_by=due_by)
+    count = 0
+    for job in jobs:
+        if renew_claim(job):
+            run_job(job)
+            count += 1
+    return count
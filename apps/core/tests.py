@@ -1 +1,848 @@
-# Create your tests here.
+import asyncio
+import csv
+import shutil
+import tempfile
+import threading
+import tracemalloc
+import uuid
+import zipfile
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import clear_script_prefix, set_script_prefix
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from PIL import Image
+
+from .cache import CacheNamespace, get_cache
+from .exports import csv_chunks, xlsx_chunks
+from .fieldmaps import ChoiceMap, FieldMap, json_list, truthy
+from .http import sse_message
+from .images import encode_image, normalize_image, validate_image_upload
+from .media import protected_media_url
+from .models import Job, Rendition
+from .pubsub import InMemoryBroker
+from .renderers import ORJSONParser, ORJSONRenderer
+from .renditions import (
+    delete_renditions,
+    evict_renditions,
+    rendition_name,
+    rendition_url,
+    stored_bytes,
+)
+from .storage import presign_upload
+from .tasks import retry_delay, run_pending, task
+
+calls = []
+
+
+@task(name="tests.record")
+def record(value):
+    calls.append(value)
+
+
+@task(name="tests.takeover")
+def takeover(job_id):
+    # Another worker reclaiming a job that is waiting in the current batch
+    Job.objects.filter(pk=job_id).update(
+        locked_by="other-worker", locked_at=timezone.now()
+    )
+
+
+@task(name="tests.flaky", max_attempts=2)
+def flaky():
+    raise RuntimeError("provider down")
+
+
+class CacheNamespaceTest(SimpleTestCase):
+    """Test namespaced cache keys and versioned invalidation"""
+
+    def setUp(self):
+        cache.clear()
+        self.namespace = CacheNamespace("tests", timeout=60)
+
+    def test_set_and_get(self):
+        self.namespace.set("answer", 42)
+
+        self.assertEqual(self.namespace.get("answer"), 42)
+        self.assertIsNone(CacheNamespace("other").get("answer"))
+
+    def test_invalidate_drops_every_key(self):
+        self.namespace.set("a", 1)
+        self.namespace.set("b", 2)
+
+        self.namespace.invalidate()
+
+        self.assertIsNone(self.namespace.get("a"))
+        self.assertIsNone(self.namespace.get("b"))
+        self.namespace.set("a", 3)
+        self.assertEqual(self.namespace.get("a"), 3)
+
+    def test_invalidate_survives_evicted_version(self):
+        self.namespace.set("a", 1)
+        cache.delete(self.namespace._version_key)
+
+        self.namespace.invalidate()
+
+        self.assertIsNone(self.namespace.get("a"))
+
+    def test_get_or_set_and_delete_many(self):
+        self.assertEqual(self.namespace.get_or_set("a", lambda: 1), 1)
+        self.assertEqual(self.namespace.get_or_set("a", lambda: 2), 1)
+
+        self.namespace.delete_many(["a"])
+
+        self.assertEqual(self.namespace.get_many(["a"]), {})
+
+
+class GetCacheTest(SimpleTestCase):
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "shared": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "shared",
+            },
+        }
+    )
+    def test_proxy_resolves_alias(self):
+        proxy = get_cache("shared")
+        proxy.set("key", "value")
+
+        self.assertEqual(caches["shared"].get("key"), "value")
+        self.assertIsNone(caches["default"].get("key"))
+
+
+@override_settings(TASKS_RETRY_BACKOFF=30, TASKS_RETRY_BACKOFF_MAX=3600)
+class TaskQueueTest(TestCase):
+    """Test the database-backed task queue"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueued_job_runs(self):
+        job = record.enqueue("hello")
+
+        self.assertEqual(run_pending(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(calls, ["hello"])
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(run_pending(), 0)
+
+    def test_idempotency_key(self):
+        first = record.enqueue("a", idempotency_key="once")
+        second = record.enqueue("b", idempotency_key="once")
+
+        self.assertEqual(first.pk, second.pk)
+        run_pending()
+        self.assertEqual(calls, ["a"])
+
+    def test_delayed_job_waits(self):
+        record.enqueue("later", delay=timedelta(minutes=5))
+
+        self.assertEqual(run_pending(), 0)
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        job = flaky.enqueue()
+
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=25))
+        self.assertIn("provider down", job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.attempts, 2)
+
+    def test_retry_delay_doubles_up_to_cap(self):
+        self.assertEqual(retry_delay(1), timedelta(seconds=30))
+        self.assertEqual(retry_delay(3), timedelta(seconds=120))
+        self.assertEqual(retry_delay(20), timedelta(seconds=3600))
+
+    def test_abandoned_job_is_reclaimed(self):
+        job = record.enqueue("again")
+        Job.objects.filter(pk=job.pk).update(
+            status="running",
+            locked_by="dead-worker",
+            locked_at=timezone.now() - timedelta(hours=1),
+            attempts=1,
+        )
+
+        self.assertEqual(run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "succeeded")
+        self.assertEqual(job.attempts, 2)
+
+    def test_abandoned_job_out_of_attempts_fails(self):
+        job = record.enqueue("crashes")
+        Job.objects.filter(pk=job.pk).update(
+            status="running",
+            locked_by="dead-worker",
+            locked_at=timezone.now() - timedelta(hours=1),
+            attempts=job.max_attempts,
+        )
+
+        self.assertEqual(run_pending(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.attempts, job.max_attempts)
+        self.assertEqual(job.locked_by, "")
+        self.assertIn("did not finish", job.last_error)
+        self.assertEqual(calls, [])
+
+    def test_job_reclaimed_while_waiting_in_batch_is_skipped(self):
+        waiting = record.enqueue("twice")
+        takeover.enqueue(str(waiting.pk))
+        # Claimed in the same batch, after the takeover job
+        Job.objects.filter(pk=waiting.pk).update(run_at=timezone.now())
+
+        self.assertEqual(run_pending(), 1)
+
+        waiting.refresh_from_db()
+        self.assertEqual(calls, [])
+        self.assertEqual(waiting.status, "running")
+        self.assertEqual(waiting.locked_by, "other-worker")
+
+    def test_unknown_task_fails(self):
+        job = Job.objects.create(task="tests.missing")
+
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, "failed")
+
+    def test_run_tasks_once(self):
+        record.enqueue(1)
+        record.enqueue(2)
+        out = StringIO()
+
+        call_command("run_tasks", "--once", "--batch-size", "1", stdout=out)
+
+        self.assertEqual(calls, [1, 2])
+        self.assertIn("Ran 2 job(s)", out.getvalue())
+
+    @override_settings(TASKS_RETRY_BACKOFF=0)
+    def test_run_tasks_once_runs_a_failing_job_once(self):
+        job = Job.objects.create(task="tests.flaky", max_attempts=5)
+        out = StringIO()
+
+        call_command("run_tasks", "--once", stdout=out)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("Ran 1 job(s)", out.getvalue())
+
+
+def build_jpeg(size, orientation=None):
+    buffer = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new("RGB", size, color="red").save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+@override_settings(IMAGE_FORMAT="WEBP", IMAGE_QUALITY=80)
+class ImagePipelineTest(SimpleTestCase):
+    """Test upload validation and normalization"""
+
+    def test_validation_reads_header(self):
+        upload = SimpleUploadedFile("photo.jpg", build_jpeg((40, 30)))
+
+        with override_settings(IMAGE_MAX_UPLOAD_PIXELS=10_000):
+            validate_image_upload(upload)
+        with override_settings(IMAGE_MAX_UPLOAD_PIXELS=1_000):
+            with self.assertRaises(ValidationError):
+                validate_image_upload(upload)
+
+    def test_validation_rejects_non_images(self):
+        with self.assertRaises(ValidationError):
+            validate_image_upload(SimpleUploadedFile("photo.jpg", b"not an image"))
+
+    def test_normalize_applies_orientation_and_strips_exif(self):
+        # Orientation 6: stored landscape, displayed portrait
+        image = Image.open(BytesIO(build_jpeg((3000, 1000), orientation=6)))
+
+        encoded = encode_image(normalize_image(image, 1600))
+
+        result = Image.open(BytesIO(encoded.read()))
+        self.assertEqual(result.format, "WEBP")
+        self.assertEqual(result.size, (533, 1600))
+        self.assertNotIn("exif", result.info)
+
+
+class FakeFieldFile:
+    """Just enough of a FieldFile for rendition_url"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __bool__(self):
+        return bool(self.name)
+
+
+class RenditionTest(TestCase):
+    """Test on-demand renditions and their LRU eviction"""
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_FORMAT="WEBP",
+            RENDITION_SIZES=[150, 300],
+        )
+        self.settings_override.enable()
+        self.source = default_storage.save(
+            "photos/member.jpg", ContentFile(build_jpeg((1200, 800)))
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_rendition_is_rendered_once(self):
+        url = rendition_url(FakeFieldFile(self.source), 300)
+
+        response = self.client.get(url)
+
+        name = rendition_name(self.source, 300)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], default_storage.url(name))
+        with default_storage.open(name) as stored:
+            self.assertEqual(Image.open(stored).size, (300, 200))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_unsigned_or_unknown_size_is_rejected(self):
+        url = rendition_url(FakeFieldFile(self.source), 600)
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(
+            self.client.get("/api/v1/media/renditions/forged/").status_code, 404
+        )
+
+    def test_documents_have_no_rendition(self):
+        self.assertIsNone(rendition_url(FakeFieldFile("records/report.pdf")))
+
+    def test_url_follows_script_prefix(self):
+        url = rendition_url(FakeFieldFile(self.source), 300)
+        set_script_prefix("/backend/")
+        try:
+            prefixed = rendition_url(FakeFieldFile(self.source), 300)
+        finally:
+            clear_script_prefix()
+
+        self.assertEqual(prefixed, "/backend" + url)
+        self.assertEqual(rendition_url(FakeFieldFile(self.source), 300), url)
+
+    def test_least_recently_used_are_evicted(self):
+        self.client.get(rendition_url(FakeFieldFile(self.source), 150))
+        self.client.get(rendition_url(FakeFieldFile(self.source), 300))
+        old, recent = Rendition.objects.order_by("size")
+        Rendition.objects.filter(pk=old.pk).update(
+            last_accessed=timezone.now() - timedelta(days=1)
+        )
+
+        with self.assertLogs("core", "INFO"):
+            evict_renditions(max_bytes=recent.bytes)
+
+        self.assertFalse(default_storage.exists(old.name))
+        self.assertTrue(default_storage.exists(recent.name))
+        self.assertEqual(list(Rendition.objects.all()), [recent])
+        self.assertEqual(stored_bytes(), recent.bytes)
+
+    def test_stored_bytes_are_not_recounted_per_render(self):
+        self.client.get(rendition_url(FakeFieldFile(self.source), 150))
+        self.client.get(rendition_url(FakeFieldFile(self.source), 300))
+        total = sum(Rendition.objects.values_list("bytes", flat=True))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(stored_bytes(), total)
+            self.assertEqual(evict_renditions(max_bytes=total), 0)
+
+        delete_renditions(self.source)
+        self.assertEqual(stored_bytes(), 0)
+
+
+class BucketStandInStorage(FileSystemStorage):
+    """Filesystem storage posing as an S3 bucket for presigning"""
+
+    bucket_name = "brightlife"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.connection = mock.Mock()
+        self.connection.meta.client.generate_presigned_post.side_effect = (
+            lambda Bucket, Key, **kwargs: {
+                "url": f"http://localhost:9000/{Bucket}",
+                "fields": {"key": Key, **kwargs["Fields"]},
+            }
+        )
+
+    def _normalize_name(self, name):
+        return name
+
+
+class DirectUploadTest(TestCase):
+    """Test presigned direct-to-storage uploads"""
+
+    url = "/api/v1/media/uploads/"
+
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.bucket = BucketStandInStorage(location=self.media_root)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def presign(self, **data):
+        payload = {"purpose": "payment-screenshot", "contentType": "image/jpeg"}
+        payload["size"] = 1024
+        payload.update(data)
+        with mock.patch("apps.core.storage.default_storage", self.bucket):
+            return self.client.post(self.url, payload, content_type="application/json")
+
+    def test_presigned_post(self):
+        response = self.presign()
+
+        self.assertEqual(response.status_code, 200)
+        upload = response.json()["data"]
+        self.assertTrue(upload["key"].startswith("payment_proofs/"))
+        self.assertEqual(upload["fields"]["key"], upload["key"])
+        conditions = (
+            self.bucket.connection.meta.client.generate_presigned_post.call_args
+        )
+        self.assertIn(
+            ["content-length-range", 1, 5 * 1024 * 1024],
+            conditions.kwargs["Conditions"],
+        )
+
+    def test_rejects_type_and_size(self):
+        self.assertEqual(self.presign(contentType="text/html").status_code, 400)
+        self.assertEqual(self.presign(size=50 * 1024 * 1024).status_code, 400)
+        self.assertEqual(self.presign(purpose="anything").status_code, 400)
+
+    def test_unavailable_on_filesystem_storage(self):
+        response = self.client.post(
+            self.url,
+            {"purpose": "payment-screenshot", "contentType": "image/jpeg", "size": 1},
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 501)
+
+    def test_submission_with_upload_token(self):
+        with mock.patch("apps.core.storage.default_storage", self.bucket):
+            upload = presign_upload("payment-screenshot", "image/jpeg", 1024)
+        # The browser's POST to the bucket
+        default_storage.save(upload["key"], ContentFile(build_jpeg((40, 30))))
+
+        response = self.client.post(
+            "/api/v1/payment/proof/",
+            {
+                "transaction_id": "DIRECT1",
+                "payment_method": "bkash",
+                "amount": "100.00",
+                "payer_name": "Direct Upload",
+                "payer_contact": "01812345678",
+                "screenshot_upload": upload["token"],
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        payment = apps.get_model("payment", "PaymentProof").objects.get(
+            transaction_id="DIRECT1"
+        )
+        self.assertEqual(payment.screenshot.name, upload["key"])
+
+    def test_replayed_token_is_rejected(self):
+        with mock.patch("apps.core.storage.default_storage", self.bucket):
+            upload = presign_upload("payment-screenshot", "image/jpeg", 1024)
+        default_storage.save(upload["key"], ContentFile(build_jpeg((40, 30))))
+
+        responses = [
+            self.client.post(
+                "/api/v1/payment/proof/",
+                {
+                    "transaction_id": f"REPLAY{i}",
+                    "payment_method": "bkash",
+                    "amount": "100.00",
+                    "payer_name": "Direct Upload",
+                    "payer_contact": "01812345678",
+                    "screenshot_upload": upload["token"],
+                },
+                content_type="application/json",
+            )
+            for i in range(2)
+        ]
+
+        self.assertEqual(responses[0].status_code, 201)
+        self.assertEqual(responses[1].status_code, 400)
+        PaymentProof = apps.get_model("payment", "PaymentProof")
+        self.assertEqual(
+            PaymentProof.objects.filter(screenshot=upload["key"]).count(), 1
+        )
+
+    def test_token_for_missing_object_is_rejected(self):
+        with mock.patch("apps.core.storage.default_storage", self.bucket):
+            upload = presign_upload("payment-screenshot", "image/jpeg", 1024)
+
+        response = self.client.post(
+            "/api/v1/payment/proof/",
+            {
+                "transaction_id": "DIRECT2",
+                "payment_method": "bkash",
+                "amount": "100.00",
+                "payer_name": "Direct Upload",
+                "payer_contact": "01812345678",
+                "screenshot_upload": upload["token"],
+            },
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(PROTECTED_MEDIA_SERVER="")
+class ProtectedMediaTest(TestCase):
+    """Test access-controlled downloads of sensitive documents"""
+
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        application = apps.get_model("membership", "MembershipApplication")(
+            membership_type="individual",
+            name_english="Protected Member",
+            dob=date(1990, 1, 1),
+            gender="male",
+            marital_status="single",
+            mobile="01712345678",
+            accept_terms=True,
+        )
+        application.save()
+        self.record = apps.get_model("membership", "MedicalRecord").objects.create(
+            application=application,
+            file=ContentFile(self.content, name="report.pdf"),
+        )
+        self.url = protected_media_url(self.record.file)
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_requires_staff(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+        member = get_user_model().objects.create_user(
+            username="member", email="member@example.com", password="member-pass"
+        )
+        self.client.force_login(member)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_unregistered_field_is_not_served(self):
+        self.client.force_login(self.admin)
+        url = f"/api/v1/media/files/membership.MedicalRecord/{self.record.pk}/id/"
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_full_download(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_range_request(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=100-199")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.content[100:200])
+        self.assertEqual(
+            response["Content-Range"], f"bytes 100-199/{len(self.content)}"
+        )
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-24")
+        self.assertEqual(b"".join(response.streaming_content), self.content[-24:])
+
+        response = self.client.get(self.url, HTTP_RANGE="bytes=5000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.content)}")
+
+    def test_unsupported_range_is_ignored(self):
+        self.client.force_login(self.admin)
+
+        for header in ("bytes=0-1,5-6", "items=0-1", "bytes=9-2", "bytes=-"):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(b"".join(response.streaming_content), self.content)
+
+    @override_settings(PROTECTED_MEDIA_SERVER="nginx")
+    def test_nginx_sends_the_file(self):
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/" + self.record.file.name
+        )
+        self.assertEqual(response.content, b"")
+
+
+class StreamingExportTest(SimpleTestCase):
+    """Exports are produced row by row in bounded memory"""
+
+    header = ["id", "name", "joined"]
+
+    def rows(self, count):
+        for number in range(count):
+            yield [number, f"Member <{number}> & co", date(2024, 1, 1)]
+
+    def test_csv(self):
+        output = b"".join(csv_chunks(self.header, self.rows(2)))
+        self.assertEqual(
+            output.decode("utf-8-sig").splitlines(),
+            [
+                "id,name,joined",
+                "0,Member <0> & co,2024-01-01",
+                "1,Member <1> & co,2024-01-01",
+            ],
+        )
+
+    def test_csv_neutralises_formulas(self):
+        rows = [
+            ['=HYPERLINK("http://evil")', "+8801712345678", "-1+2", "@SUM(A1)"],
+            ["\tcmd", "\rcmd", Decimal("-5.00"), -3],
+        ]
+        output = b"".join(csv_chunks(["a", "b", "c", "d"], rows))
+        lines = list(csv.reader(StringIO(output.decode("utf-8-sig"))))
+        self.assertEqual(
+            lines[1],
+            ['\'=HYPERLINK("http://evil")', "'+8801712345678", "'-1+2", "'@SUM(A1)"],
+        )
+        # Numbers keep their sign
+        self.assertEqual(lines[2], ["'\tcmd", "'\rcmd", "-5.00", "-3"])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        output = b"".join(xlsx_chunks(self.header, self.rows(2)))
+        with zipfile.ZipFile(BytesIO(output)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertIn("<c><v>1</v></c>", sheet)
+        self.assertIn("Member &lt;1&gt; &amp; co", sheet)
+        self.assertEqual(sheet.count("<row>"), 3)
+
+    def test_memory_does_not_grow_with_rows(self):
+        for chunks in (csv_chunks, xlsx_chunks):
+            with self.subTest(chunks.__name__):
+                tracemalloc.start()
+                try:
+                    size = sum(
+                        len(chunk) for chunk in chunks(self.header, self.rows(50000))
+                    )
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                # Far below the ~6MB of CSV or sheet XML the rows amount to
+                self.assertLess(peak, 2 * 1024 * 1024)
+                self.assertGreater(size, 0)
+
+
+class FieldMapTest(SimpleTestCase):
+    """Frontend payloads are renamed, normalized and filtered in one pass"""
+
+    field_map = FieldMap(
+        fields={"fullName": "full_name", "plan": "plan", "tags": "tags", "ok": "ok"},
+        files={"photoFile": "photo"},
+        converters={
+            "plan": ChoiceMap({"Silver": "individual"}),
+            "tags": json_list,
+            "ok": truthy,
+            "full_name": str.title,
+        },
+        defaults={"ok": False},
+    )
+
+    def test_transform(self):
+        upload = SimpleUploadedFile("a.jpg", b"data")
+        data = {
+            "fullName": "jane doe",
+            "plan": " SILVER ",
+            "tags": '["a", "b"]',
+            "gender": "female",
+            "email": "",
+            "photoFile": upload,
+        }
+        self.assertEqual(
+            self.field_map.transform(data, files={"photoFile": upload}),
+            {
+                "full_name": "Jane Doe",
+                "plan": "individual",
+                "tags": ["a", "b"],
+                "gender": "female",
+                "photo": upload,
+                "ok": False,
+            },
+        )
+
+    def test_backend_names_and_unknown_choices_pass_through(self):
+        self.assertEqual(
+            self.field_map.transform({"full_name": "x", "plan": "family", "ok": "on"}),
+            {"full_name": "X", "plan": "family", "ok": True},
+        )
+
+    def test_files_only_come_from_uploads(self):
+        self.assertNotIn(
+            "photo", self.field_map.transform({"photoFile": "/etc/passwd"})
+        )
+
+    def test_strict_map_drops_undeclared_keys(self):
+        strict = FieldMap(fields={"fullName": "full_name"}, passthrough=False)
+        self.assertEqual(
+            strict.transform({"fullName": "x", "is_staff": "true"}), {"full_name": "x"}
+        )
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    """The orjson renderer and parser match DRF's stdlib ones byte for byte"""
+
+    data = {
+        "id": uuid.UUID("6f1c2b5e-1d2a-4c3b-9a8f-0e1d2c3b4a59"),
+        "amount": Decimal("1500.50"),
+        "monthly_income": Decimal("12000"),
+        "submitted_at": datetime(2024, 3, 1, 10, 30, tzinfo=dt_timezone.utc),
+        "verified_at": datetime(
+            2024, 3, 1, 16, 30, 0, 250000, tzinfo=dt_timezone(timedelta(hours=6))
+        ),
+        "naive": datetime(2024, 3, 1, 10, 30),
+        "dob": date(1990, 1, 1),
+        "name_bangla": "আবদুল করিম",
+        "note": "line\u2028break\u2029",
+        "message": gettext_lazy("Validation failed"),
+        "errors": {"amount": [ErrorDetail("Invalid", code="invalid")]},
+        "counts": {1: 2, "total": 3},
+        "flags": [True, False, None],
+        "rows": ReturnList(
+            [ReturnDict({"share": 50}, serializer=None)], serializer=None
+        ),
+    }
+
+    def test_output_matches_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.data), JSONRenderer().render(self.data)
+        )
+
+    def test_golden_output(self):
+        rendered = ORJSONRenderer().render(
+            {
+                "id": self.data["id"],
+                "amount": self.data["amount"],
+                "submitted_at": self.data["submitted_at"],
+                "verified_at": self.data["verified_at"],
+            }
+        )
+        self.assertEqual(
+            rendered,
+            b'{"id":"6f1c2b5e-1d2a-4c3b-9a8f-0e1d2c3b4a59","amount":1500.5,'
+            b'"submitted_at":"2024-03-01T10:30:00Z",'
+            b'"verified_at":"2024-03-01T16:30:00.250000+06:00"}',
+        )
+
+    def test_indent_uses_stdlib_path(self):
+        media_type = "application/json; indent=2"
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, media_type),
+            JSONRenderer().render(self.data, media_type),
+        )
+
+    def test_parser(self):
+        body = '{"name": "আবদুল", "amount": "10.00", "nominees": [{"share": 100}]}'
+        parsed = ORJSONParser().parse(BytesIO(body.encode()))
+        self.assertEqual(parsed, JSONParser().parse(BytesIO(body.encode())))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"amount": NaN}'))
+
+
+class InMemoryBrokerTest(SimpleTestCase):
+    async def test_delivers_to_channel_subscribers(self):
+        broker = InMemoryBroker()
+        subscription = await broker.subscribe("a")
+        other = await broker.subscribe("b")
+
+        self.assertEqual(broker.publish("a", {"status": "verified"}), 1)
+
+        self.assertEqual(await subscription.get(timeout=1), {"status": "verified"})
+        self.assertIsNone(await other.get(timeout=0.01))
+
+    async def test_publish_from_another_thread(self):
+        broker = InMemoryBroker()
+        subscription = await broker.subscribe("a")
+
+        thread = threading.Thread(target=broker.publish, args=("a", {"n": 1}))
+        thread.start()
+
+        self.assertEqual(await subscription.get(timeout=1), {"n": 1})
+        thread.join()
+
+    async def test_close_unsubscribes(self):
+        broker = InMemoryBroker()
+        subscription = await broker.subscribe("a")
+        await subscription.close()
+
+        self.assertEqual(broker.publish("a", {}), 0)
+        self.assertEqual(broker._channels, {})
+
+    def test_closed_loop_subscription_is_dropped(self):
+        broker = InMemoryBroker()
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(broker.subscribe("a"))
+        loop.close()
+
+        broker.publish("a", {})
+
+        self.assertEqual(broker._channels, {})
+
+    def test_sse_message(self):
+        self.assertEqual(
+            sse_message({"text": "a\nb"}, event="status", id="pending"),
+            b'event: status\nid: pending\ndata: {"text": "a\\nb"}\n\n',
+        )
@@ -0,0 +1,34 @@
+"""
+Upload handling shared by the submission endpoints.
+"""
+
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class SpoolToDiskUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams every uploaded file to a temporary file in fixed-size chunks.
+
+    Django's default handler chain keeps files under
+    FILE_UPLOAD_MAX_MEMORY_SIZE in memory, so a form with many small files
+    is held in RAM in full. Spooling everything to disk keeps peak memory
+    per request at roughly one chunk, and FileSystemStorage moves the temp
+    file into MEDIA_ROOT on save instead of copying it.
+    """
+
+
+class SpooledUploadMixin:
+    """
+    View mixin that installs SpoolToDiskUploadHandler before parsing.
+
+    Upload handlers have to be set on the underlying HttpRequest before
+    request.data/request.FILES are first accessed.
+    """
+
+    upload_handler_classes = [SpoolToDiskUploadHandler]
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [
+            handler(request) for handler in self.upload_handler_classes
+        ]
+        return super().initialize_request(request, *args, **kwargs)
@@ -0,0 +1,15 @@
+from django.urls import path
+
+from .views import DirectUploadView, ProtectedMediaView, RenditionView
+
+app_name = "core"
+
+urlpatterns = [
+    path("uploads/", DirectUploadView.as_view(), name="direct-upload"),
+    path("renditions/<str:token>/", RenditionView.as_view(), name="rendition"),
+    path(
+        "files/<str:model_label>/<str:pk>/<str:field_name>/",
+        ProtectedMediaView.as_view(),
+        name="protected-media",
+    ),
+]
@@ -1 +1,108 @@
-# Create your views here.
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponseRedirect
+from django.utils.cache import patch_cache_control
+from django.views import View
+
+from rest_framework import permissions, status
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .media import is_protected, serve_protected_file
+from .renditions import get_rendition, load_token
+from .storage import DirectUploadUnavailable, presign_upload
+
+
+class RenditionView(View):
+    """
+    Redirect to a stored image rendition, rendering it on first use
+    GET /api/v1/media/renditions/<token>/
+    """
+
+    http_method_names = ["get", "head", "options"]
+
+    def get(self, request, token):
+        try:
+            source_name, size = load_token(token)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise Http404("Unknown rendition")
+        if size not in settings.RENDITION_SIZES:
+            raise Http404("Unknown rendition")
+
+        name = get_rendition(source_name, size)
+        if name is None:
+            raise Http404("Unknown rendition")
+
+        response = HttpResponseRedirect(default_storage.url(name))
+        # Renditions can be evicted, so only cache the redirect briefly
+        patch_cache_control(response, public=True, max_age=300)
+        return response
+
+
+class DirectUploadView(APIView):
+    """
+    Presign a direct-to-storage upload for a public form
+    POST /api/v1/media/uploads/  {"purpose", "contentType", "size"}
+    """
+
+    permission_classes = [permissions.AllowAny]
+    throttle_scope = "direct-upload"
+
+    def post(self, request):
+        try:
+            size = int(request.data.get("size", 0))
+        except (TypeError, ValueError):
+            size = 0
+
+        try:
+            upload = presign_upload(
+                request.data.get("purpose", ""),
+                request.data.get("contentType", ""),
+                size,
+            )
+        except DirectUploadUnavailable:
+            return Response(
+                {
+                    "success": False,
+                    "message": "Direct uploads are not enabled. "
+                    "Send the file with the form instead.",
+                },
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        except ValidationError as exc:
+            return Response(
+                {"success": False, "message": exc.messages[0]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({"success": True, "data": upload})
+
+
+class ProtectedMediaView(APIView):
+    """
+    Download a protected upload after checking permissions
+    GET /api/v1/media/files/<app_label.Model>/<pk>/<field>/
+    """
+
+    # Session auth as well, so links in the Django admin work
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, model_label, pk, field_name):
+        if not is_protected(model_label, field_name):
+            raise Http404("Unknown file")
+        model = apps.get_model(model_label)
+        try:
+            instance = model._default_manager.filter(pk=pk).first()
+        except (ValidationError, ValueError):
+            instance = None
+        field_file = getattr(instance, field_name, None)
+        if not field_file:
+            raise Http404("Unknown file")
+        return serve_protected_file(request, field_file)
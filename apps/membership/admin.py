@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from .models import ApplicationStatusHistory, MembershipApplication, Nominee
+from .models import (
+    ApplicationStatusHistory,
+    MembershipApplication,
+    MembershipStatistic,
+    Nominee,
+    ProposalNumberCounter,
+)
 
 # Minimal admin registration for Python 3.14 compatibility
 # Removed all customizations to avoid template context issues
@@ -28,3 +34,16 @@ class NomineeAdmin(admin.ModelAdmin):
 class StatusHistoryAdmin(admin.ModelAdmin):
     list_display = ["previous_status", "new_status", "changed_by", "timestamp"]
     search_fields = ["changed_by"]
+
+
+@admin.register(ProposalNumberCounter)
+class ProposalNumberCounterAdmin(admin.ModelAdmin):
+    list_display = ["period", "last_value", "updated_at"]
+    readonly_fields = ["period", "last_value", "updated_at"]
+
+
+@admin.register(MembershipStatistic)
+class MembershipStatisticAdmin(admin.ModelAdmin):
+    list_display = ["month", "status", "membership_type", "fo_code", "count"]
+    list_filter = ["status", "membership_type"]
+    readonly_fields = ["month", "status", "membership_type", "fo_code", "count"]
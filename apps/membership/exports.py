@@ -0,0 +1,95 @@
+"""
+Export of membership applications as CSV or XLSX rows.
+
+Applications are read with a server-side cursor (``iterator``) in chunks of
+``EXPORT_CHUNK_SIZE``; the nominees of each chunk are fetched with one
+query and flattened into ``EXPORT_NOMINEE_COLUMNS`` column groups per row,
+with any further nominees summarised in the last column. Rows are produced
+lazily for ``apps.core.exports``, so memory use does not grow with the
+number of applications.
+"""
+
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+
+from .models import MembershipApplication, Nominee
+
+APPLICATION_COLUMNS = [
+    "proposal_no",
+    "status",
+    "membership_type",
+    "name_english",
+    "name_bangla",
+    "father_name",
+    "mother_name",
+    "spouse_name",
+    "gender",
+    "dob",
+    "age",
+    "marital_status",
+    "mobile",
+    "email",
+    "nationality",
+    "nid_number",
+    "age_proof",
+    "driving_license",
+    "education",
+    "occupation",
+    "monthly_income",
+    "income_source",
+    "present_address",
+    "permanent_address",
+    "blood_group",
+    "fo_code",
+    "fo_name",
+    "valid_until",
+    "created_at",
+]
+NOMINEE_COLUMNS = ["name", "relationship", "share", "age"]
+
+
+def export_header():
+    header = list(APPLICATION_COLUMNS)
+    for number in range(1, settings.EXPORT_NOMINEE_COLUMNS + 1):
+        header += [f"nominee_{number}_{column}" for column in NOMINEE_COLUMNS]
+    header.append("other_nominees")
+    return header
+
+
+def nominee_cells(nominees):
+    """Fixed-width nominee columns plus a summary of any extra nominees"""
+    slots = settings.EXPORT_NOMINEE_COLUMNS
+    cells = []
+    for nominee in nominees[:slots]:
+        cells += nominee
+    cells += [None] * (len(NOMINEE_COLUMNS) * slots - len(cells))
+    cells.append(
+        "; ".join(
+            f"{name} ({relationship}, {share}%)"
+            for name, relationship, share, _ in nominees[slots:]
+        )
+    )
+    return cells
+
+
+def export_rows(queryset=None, chunk_size=None):
+    """Rows matching export_header() for ``queryset``, one chunk at a time"""
+    if queryset is None:
+        queryset = MembershipApplication.objects.all()
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    applications = queryset.order_by("created_at", "id").values_list(
+        "id", *APPLICATION_COLUMNS
+    )
+    rows = applications.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        nominees = defaultdict(list)
+        for application_id, *nominee in (
+            Nominee.objects.filter(application_id__in=[row[0] for row in chunk])
+            .order_by("application_id", "id")
+            .values_list("application_id", *NOMINEE_COLUMNS)
+        ):
+            nominees[application_id].append(nominee)
+        for application_id, *values in chunk:
+            yield values + nominee_cells(nominees[application_id])
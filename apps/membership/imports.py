@@ -0,0 +1,172 @@
+"""
+Bulk import of legacy member rosters (``manage.py import_members``).
+
+Rows are read lazily from CSV or JSONL and handled in batches:
+
+1. every row is validated with ``MembershipApplicationSerializer``, the
+   same rules as a web submission; rows that fail are written to the
+   error file with their line number and errors;
+2. the valid rows of the batch get proposal numbers from one block
+   reservation and are inserted with ``bulk_create`` (applications, then
+   nominees) in a single transaction;
+3. if the batch insert fails, its rows are retried one by one so a single
+   bad row only rejects itself.
+
+Columns are the serializer's field names (``name_english``,
+``membership_type``, ``accept_terms`` ...) or the frontend's camelCase
+names, mapped and normalized like a web submission (``APPLICATION_FIELDS``).
+``nominees`` is a list of nominee objects in JSONL, or the same list as a
+JSON string in CSV.
+"""
+
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import DatabaseError, transaction
+
+from .mappings import APPLICATION_FIELDS
+from .models import MembershipApplication, Nominee
+from .proposal_numbers import proposal_number_allocator
+from .serializers import MembershipApplicationSerializer
+from .statistics import count_new_applications
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+def read_csv(file):
+    for line_number, row in enumerate(csv.DictReader(file), start=2):
+        # Empty cells mean "not given", like an omitted form field
+        row = {key: value for key, value in row.items() if key and value != ""}
+        if isinstance(row.get("nominees"), str):
+            try:
+                row["nominees"] = json.loads(row["nominees"])
+            except ValueError:
+                pass  # Reported by the serializer
+        yield line_number, row
+
+
+def read_jsonl(file):
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                row = {"__error__": f"Invalid JSON: {exc}"}
+            if not isinstance(row, dict):
+                row = {"__error__": "Each line must be a JSON object"}
+            yield line_number, row
+
+
+def read_rows(file, file_format):
+    """``(line number, row dict)`` for each record of ``file``"""
+    return read_jsonl(file) if file_format == "jsonl" else read_csv(file)
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+class MemberImporter:
+    """Validates and inserts roster rows batch by batch"""
+
+    def __init__(self, error_file, batch_size=500, dry_run=False):
+        self.error_file = error_file
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.result = ImportResult()
+
+    def run(self, rows, progress=None):
+        """Import ``(line number, row)`` pairs; ``progress(result)`` per batch"""
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+            if progress is not None:
+                progress(self.result)
+        return self.result
+
+    def import_batch(self, batch):
+        self.result.rows += len(batch)
+        valid = []
+        for line_number, row in batch:
+            entry = self.validate(line_number, row)
+            if entry is not None:
+                valid.append(entry)
+        if self.dry_run or not valid:
+            self.result.imported += len(valid)
+            return
+
+        try:
+            self.insert(valid)
+        except DatabaseError:
+            # Find the offending rows; the rest of the batch still goes in
+            for entry in valid:
+                try:
+                    self.insert([entry])
+                except DatabaseError as exc:
+                    self.record_error(entry[0], entry[1], {"database": [str(exc)]})
+                else:
+                    self.result.imported += 1
+        else:
+            self.result.imported += len(valid)
+
+    def validate(self, line_number, row):
+        """``(line number, row, validated data)`` or None after recording errors"""
+        if "__error__" in row:
+            self.record_error(line_number, None, {"row": [row["__error__"]]})
+            return None
+        serializer = MembershipApplicationSerializer(
+            data=APPLICATION_FIELDS.transform(row)
+        )
+        if not serializer.is_valid():
+            self.record_error(line_number, row, serializer.errors)
+            return None
+        return line_number, row, serializer.validated_data
+
+    def insert(self, entries):
+        with transaction.atomic():
+            numbers = proposal_number_allocator.reserve(len(entries))
+            applications = []
+            nominees = []
+            for (_, _, data), number in zip(entries, numbers):
+                data = dict(data)
+                nominees_data = data.pop("nominees", [])
+                data.pop("medical_records", None)
+                application = MembershipApplication(
+                    proposal_number=number, proposal_no=number, **data
+                )
+                application.sync_derived_fields()
+                applications.append(application)
+                for nominee_data in nominees_data:
+                    nominee = Nominee(application=application, **nominee_data)
+                    nominee.sync_share_percentage()
+                    nominees.append(nominee)
+
+            MembershipApplication.objects.bulk_create(applications)
+            Nominee.objects.bulk_create(nominees)
+            count_new_applications(applications)
+
+    def record_error(self, line_number, row, errors):
+        self.result.failed += 1
+        self.error_file.write(
+            json.dumps(
+                {"line": line_number, "errors": errors, "row": row},
+                default=str,
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
@@ -0,0 +1,177 @@
+"""
+Member login lookup and short-lived cache.
+
+Members log in with a proposal number that may be stored in either
+``proposal_no`` or ``proposal_number``. Both columns carry an ``UPPER(...)``
+expression index, and lookups compare against the upper-cased key so the
+planner can use them. The few fields login needs are cached for a short
+time so repeated logins during portal peaks skip the database.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+from rest_framework import status
+
+from apps.core.cache import CacheNamespace
+from apps.core.projections import ReadOnlyProjection
+
+from .models import MembershipApplication
+from .serializers import MemberProfileSerializer
+
+logger = logging.getLogger("membership")
+
+login_cache = CacheNamespace("membership-login")
+
+# Fields a member can log in with; records are cached under each of them
+LOGIN_KEY_FIELDS = ("proposal_no", "proposal_number")
+
+# Profile returned on login, rendered from a .values() row
+MEMBER_PROFILE = ReadOnlyProjection(MemberProfileSerializer)
+
+
+def normalize_login_key(proposal_no):
+    """Canonical form of a proposal number used for lookups and cache keys"""
+    return proposal_no.strip().upper()
+
+
+def member_lookup(proposal_no):
+    """Queryset matching ``proposal_no`` via the UPPER() expression indexes"""
+    key = normalize_login_key(proposal_no)
+    return MembershipApplication.objects.alias(
+        proposal_no_upper=Upper("proposal_no"),
+        proposal_number_upper=Upper("proposal_number"),
+    ).filter(Q(proposal_no_upper=key) | Q(proposal_number_upper=key))
+
+
+def member_rows(proposal_no):
+    """``.values()`` rows with the columns login and the profile need"""
+    return MEMBER_PROFILE.values(
+        member_lookup(proposal_no),
+        "dob",
+        "date_of_birth",
+        "status",
+        "valid_until",
+        "name_english",
+    )
+
+
+def find_member(proposal_no):
+    """Find a member by proposal number, as a ``member_rows`` row"""
+    return member_rows(proposal_no).first()
+
+
+def build_login_record(member):
+    """The subset of a member row that login checks and returns"""
+    return {
+        "dob": member["dob"] or member["date_of_birth"],
+        "status": member["status"],
+        "valid_until": member["valid_until"],
+        "name_english": member["name_english"],
+        "profile": MEMBER_PROFILE.represent(member),
+    }
+
+
+def get_login_record(proposal_no):
+    """Return the cached login record for ``proposal_no`` or None"""
+    cache_key = normalize_login_key(proposal_no)
+    record = login_cache.get(cache_key)
+    if record is None:
+        member = find_member(proposal_no)
+        if member is None:
+            return None
+        record = build_login_record(member)
+        login_cache.set(cache_key, record, settings.MEMBER_LOGIN_CACHE_TIMEOUT)
+    return record
+
+
+async def aget_login_record(proposal_no):
+    """Async version of get_login_record for the ASGI login view"""
+    cache_key = normalize_login_key(proposal_no)
+    record = await login_cache.aget(cache_key)
+    if record is None:
+        member = await member_rows(proposal_no).afirst()
+        if member is None:
+            return None
+        record = build_login_record(member)
+        await login_cache.aset(cache_key, record, settings.MEMBER_LOGIN_CACHE_TIMEOUT)
+    return record
+
+
+def evaluate_login(proposal_no, birth_year, member):
+    """
+    Apply the login rules to a login record (or None if not found).
+    Returns the response payload and HTTP status code.
+    """
+    if not member:
+        logger.warning(f"Login failed: Member not found - {proposal_no}")
+        return {
+            "success": False,
+            "message": "Invalid credentials. Member not found.",
+        }, status.HTTP_401_UNAUTHORIZED
+
+    # Verify birth year from dob or date_of_birth
+    member_dob = member["dob"]
+    if not member_dob:
+        logger.warning(f"Login failed: No DOB on record - {proposal_no}")
+        return {
+            "success": False,
+            "message": "Invalid credentials. Birth year mismatch.",
+        }, status.HTTP_401_UNAUTHORIZED
+
+    if member_dob.year != birth_year:
+        logger.warning(f"Login failed: Birth year mismatch - {proposal_no}")
+        return {
+            "success": False,
+            "message": "Invalid credentials. Birth year mismatch.",
+        }, status.HTTP_401_UNAUTHORIZED
+
+    # Check membership status
+    status_message = None
+    if member["status"] == "pending":
+        status_message = "Your application is pending review."
+    elif member["status"] == "under_review":
+        status_message = "Your application is under review."
+    elif member["status"] == "rejected":
+        return {
+            "success": False,
+            "message": "Your membership application was rejected. Please contact support.",
+        }, status.HTTP_403_FORBIDDEN
+    elif member["status"] == "expired":
+        status_message = "Your membership has expired. Please renew."
+
+    # Check validity date
+    valid_until = member["valid_until"]
+    if valid_until and valid_until < timezone.now().date():
+        status_message = "Your membership has expired. Please renew."
+
+    logger.info(f"Member login successful: {proposal_no} - {member['name_english']}")
+
+    return {
+        "success": True,
+        "message": "Login successful",
+        "data": {
+            "member": member["profile"],
+            # Add status message if applicable
+            "statusMessage": status_message,
+        },
+    }, status.HTTP_200_OK
+
+
+def invalidate_login_record(member, previous=()):
+    """
+    Drop cached login records after a member changes. ``previous`` are the
+    stored LOGIN_KEY_FIELDS values before an update, whose records would
+    otherwise keep being served after a proposal number changes.
+    """
+    keys = {
+        normalize_login_key(value)
+        for value in (member.proposal_no, member.proposal_number, *previous)
+        if value
+    }
+    if keys:
+        login_cache.delete_many(keys)
@@ -0,0 +1,63 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.core.exports import EXPORT_FORMATS, export_chunks
+from apps.membership.exports import export_header, export_rows
+from apps.membership.models import MembershipApplication
+
+
+class Command(BaseCommand):
+    help = "Export membership applications with their nominees as CSV or XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=sorted(EXPORT_FORMATS),
+            default="csv",
+        )
+        parser.add_argument(
+            "--output",
+            "-o",
+            help="File to write (default: standard output)",
+        )
+        parser.add_argument(
+            "--status", help="Only export applications with this status"
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=None,
+            help="Applications per cursor fetch (default: EXPORT_CHUNK_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        queryset = MembershipApplication.objects.all()
+        if options["status"]:
+            queryset = queryset.filter(status=options["status"])
+
+        chunks = export_chunks(
+            options["export_format"],
+            export_header(),
+            export_rows(queryset, chunk_size=options["chunk_size"]),
+        )
+        started = time.monotonic()
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                written = write_chunks(chunks, output)
+            self.stderr.write(
+                f"Wrote {written} bytes to {options['output']} "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        else:
+            write_chunks(chunks, sys.stdout.buffer)
+
+
+def write_chunks(chunks, output):
+    written = 0
+    for chunk in chunks:
+        output.write(chunk)
+        written += len(chunk)
+    return written
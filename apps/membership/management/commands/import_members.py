@@ -0,0 +1,78 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.membership.imports import IMPORT_FORMATS, MemberImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a legacy member roster (CSV or JSONL with the membership "
+        "application serializer's field names) in validated bulk batches"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Roster file (.csv or .jsonl)")
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=IMPORT_FORMATS,
+            help="File format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows validated and inserted per transaction (default: 500)",
+        )
+        parser.add_argument(
+            "--errors",
+            help="JSONL file for rejected rows (default: <path>.errors.jsonl)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate every row without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["file_format"] or os.path.splitext(path)[1][1:].lower()
+        if file_format not in IMPORT_FORMATS:
+            raise CommandError("Use --format csv or --format jsonl")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        errors_path = options["errors"] or f"{path}.errors.jsonl"
+
+        try:
+            roster = open(path, newline="", encoding="utf-8-sig")
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+        with roster, open(errors_path, "w", encoding="utf-8") as error_file:
+            importer = MemberImporter(
+                error_file,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+            result = importer.run(read_rows(roster, file_format), self.report)
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {result.imported} of {result.rows} row(s) in "
+                f"{result.elapsed:.1f}s ({result.rows_per_second:.0f} rows/s)"
+            )
+        )
+        if result.failed:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{result.failed} row(s) rejected, see {errors_path}"
+                )
+            )
+
+    def report(self, result):
+        self.stdout.write(
+            f"{result.rows} row(s) read, {result.imported} ok, {result.failed} "
+            f"rejected ({result.rows_per_second:.0f} rows/s)"
+        )
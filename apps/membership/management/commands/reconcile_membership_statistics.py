@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.membership.statistics import reconcile_statistics
+
+
+class Command(BaseCommand):
+    help = "Rebuild membership statistics rollups from the applications table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report wrong buckets without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        changes = reconcile_statistics(dry_run=options["dry_run"])
+        for (month, status, membership_type, fo_code), stored, actual in changes:
+            self.stdout.write(
+                f"{month:%Y-%m} {status}/{membership_type}/{fo_code or '-'}: "
+                f"{stored} -> {actual}"
+            )
+        verb = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(f"{verb} {len(changes)} wrong bucket(s)")
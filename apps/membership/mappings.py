@@ -0,0 +1,78 @@
+"""
+Frontend -> backend field mappings for membership submissions, shared by
+the application endpoint, the serializers and ``import_members``.
+"""
+
+from apps.core.fieldmaps import ChoiceMap, FieldMap, json_list
+
+MEMBERSHIP_TYPES = ChoiceMap(
+    {
+        "silver": "individual",
+        "bronze": "individual",
+        "gold": "family",
+        "executive": "corporate",
+    }
+)
+
+MARITAL_STATUSES = ChoiceMap(
+    {
+        "unmarried": "single",
+        "married": "married",
+        "divorced": "divorced",
+        "others": "widowed",
+    }
+)
+
+# Nominee relation (free text) -> relationship choice
+RELATIONSHIPS = ChoiceMap(
+    {
+        "son": "child",
+        "daughter": "child",
+        "wife": "spouse",
+        "husband": "spouse",
+        "father": "father",
+        "mother": "mother",
+        "brother": "sibling",
+        "sister": "sibling",
+    },
+    default="child",
+)
+
+APPLICATION_FIELDS = FieldMap(
+    fields={
+        "proposalNo": "proposal_no",
+        "foCode": "fo_code",
+        "foName": "fo_name",
+        "membershipType": "membership_type",
+        "nameBangla": "name_bangla",
+        "nameEnglish": "name_english",
+        "photoUpload": "photo_upload",
+        "fatherName": "father_name",
+        "motherName": "mother_name",
+        "spouseName": "spouse_name",
+        "ageProof": "age_proof",
+        "drivingLicense": "driving_license",
+        "maritalStatus": "marital_status",
+        "professionalQualifications": "professional_qualifications",
+        "organizationDetails": "organization_details",
+        "dailyWork": "daily_work",
+        "annualIncome": "annual_income",
+        "monthlyIncome": "monthly_income",
+        "incomeSource": "income_source",
+        "presentAddress": "present_address",
+        "permanentAddress": "permanent_address",
+        "bloodGroup": "blood_group",
+        "surgeryDetails": "surgery_details",
+        "acceptTerms": "accept_terms",
+    },
+    files={
+        "photo": "photo",
+        "ageProofDoc": "age_proof_doc",
+        "licenseDoc": "license_doc",
+    },
+    converters={
+        "membership_type": MEMBERSHIP_TYPES,
+        "marital_status": MARITAL_STATUSES,
+        "age_proof": json_list,
+    },
+)
@@ -0,0 +1,47 @@
+# Generated by Django 5.0.14 on 2026-10-16 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "membership",
+            "0006_rename_membership__dob_3a5f7c_idx_membership__dob_f1a93d_idx_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProposalNumberCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(help_text="YYYYMM", max_length=6, unique=True),
+                ),
+                (
+                    "last_value",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Highest proposal number reserved for this period",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Proposal Number Counter",
+                "verbose_name_plural": "Proposal Number Counters",
+                "ordering": ["-period"],
+            },
+        ),
+    ]
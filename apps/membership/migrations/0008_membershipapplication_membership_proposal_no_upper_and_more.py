@@ -0,0 +1,28 @@
+# Generated by Django 5.0.14 on 2026-10-16 22:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("membership", "0007_proposalnumbercounter"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="membershipapplication",
+            index=models.Index(
+                django.db.models.functions.text.Upper("proposal_no"),
+                name="membership_proposal_no_upper",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="membershipapplication",
+            index=models.Index(
+                django.db.models.functions.text.Upper("proposal_number"),
+                name="membership_proposal_num_upper",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:01
+
+from django.db import migrations, models
+from django.db.models import Count, DateField, Value
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def build_statistics(apps, schema_editor):
+    """Count existing applications into the rollup table"""
+    MembershipApplication = apps.get_model("membership", "MembershipApplication")
+    MembershipStatistic = apps.get_model("membership", "MembershipStatistic")
+    rows = (
+        MembershipApplication.objects.annotate(
+            month=TruncMonth("created_at", output_field=DateField()),
+            bucket_fo_code=Coalesce("fo_code", Value("")),
+        )
+        .values("month", "status", "membership_type", "bucket_fo_code")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    MembershipStatistic.objects.bulk_create(
+        MembershipStatistic(
+            month=row["month"],
+            status=row["status"],
+            membership_type=row["membership_type"],
+            fo_code=row["bucket_fo_code"],
+            count=row["total"],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "membership",
+            "0008_membershipapplication_membership_proposal_no_upper_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MembershipStatistic",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "month",
+                    models.DateField(
+                        help_text="First day of the month the application was created"
+                    ),
+                ),
+                ("status", models.CharField(max_length=20)),
+                ("membership_type", models.CharField(max_length=20)),
+                ("fo_code", models.CharField(blank=True, default="", max_length=50)),
+                ("count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Membership Statistic",
+                "verbose_name_plural": "Membership Statistics",
+                "ordering": ["-month", "status"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="membershipstatistic",
+            constraint=models.UniqueConstraint(
+                fields=("month", "status", "membership_type", "fo_code"),
+                name="membership_statistic_bucket",
+            ),
+        ),
+        migrations.RunPython(build_statistics, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@ from django.core.validators import (
     MinValueValidator,
 )
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 
@@ -220,6 +221,11 @@ class MembershipApplication(models.Model):
             models.Index(fields=["proposal_no"]),
             models.Index(fields=["nid_number"]),
             models.Index(fields=["dob"]),
+            # Case-insensitive member login lookups
+            models.Index(Upper("proposal_no"), name="membership_proposal_no_upper"),
+            models.Index(
+                Upper("proposal_number"), name="membership_proposal_num_upper"
+            ),
         ]
 
     def save(self, *args, **kwargs):
@@ -228,6 +234,14 @@ class MembershipApplication(models.Model):
             self.proposal_number = self.generate_proposal_number()
             self.proposal_no = self.proposal_number
 
+        self.sync_derived_fields()
+        super().save(*args, **kwargs)
+
+    def sync_derived_fields(self):
+        """
+        Fill age and the legacy mirror fields. Called by save(); call it
+        directly before bulk_create, which skips save().
+        """
         # Auto-calculate age from dob or date_of_birth
         dob = self.dob or self.date_of_birth
         if dob:
@@ -250,35 +264,65 @@ class MembershipApplication(models.Model):
         if self.accept_terms and not self.terms_accepted:
             self.terms_accepted = self.accept_terms
 
-        super().save(*args, **kwargs)
-
     def generate_proposal_number(self):
         """Generate unique proposal number: BL-YYYYMM-XXXX"""
-        from datetime import datetime
+        from .proposal_numbers import proposal_number_allocator
 
-        today = datetime.now()
-        prefix = f"BL-{today.strftime('%Y%m')}"
+        return proposal_number_allocator.next_number()
 
-        # Get last proposal number for this month
-        last_application = (
-            MembershipApplication.objects.filter(proposal_number__startswith=prefix)
-            .order_by("-proposal_number")
-            .first()
-        )
+    def __str__(self):
+        return f"{self.proposal_number} - {self.first_name} {self.last_name}"
 
-        if last_application:
-            try:
-                last_number = int(last_application.proposal_number.split("-")[-1])
-            except Exception:
-                last_number = 0
-            new_number = last_number + 1
-        else:
-            new_number = 1
 
-        return f"{prefix}-{new_number:04d}"
+class ProposalNumberCounter(models.Model):
+    """
+    Per-month counter backing proposal number allocation.
+    Workers reserve blocks of numbers by advancing ``last_value``.
+    """
+
+    period = models.CharField(max_length=6, unique=True, help_text="YYYYMM")
+    last_value = models.PositiveIntegerField(
+        default=0, help_text="Highest proposal number reserved for this period"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-period"]
+        verbose_name = "Proposal Number Counter"
+        verbose_name_plural = "Proposal Number Counters"
 
     def __str__(self):
-        return f"{self.proposal_number} - {self.first_name} {self.last_name}"
+        return f"BL-{self.period}: {self.last_value}"
+
+
+class MembershipStatistic(models.Model):
+    """
+    Application count for one (month, status, type, field officer) bucket.
+    Maintained incrementally by signals (see ``statistics.py``) so dashboard
+    queries scan buckets, not applications.
+    """
+
+    month = models.DateField(
+        help_text="First day of the month the application was created"
+    )
+    status = models.CharField(max_length=20)
+    membership_type = models.CharField(max_length=20)
+    fo_code = models.CharField(max_length=50, blank=True, default="")
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["-month", "status"]
+        verbose_name = "Membership Statistic"
+        verbose_name_plural = "Membership Statistics"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "status", "membership_type", "fo_code"],
+                name="membership_statistic_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.status}/{self.membership_type}: {self.count}"
 
 
 class Nominee(models.Model):
@@ -353,10 +397,13 @@ class Nominee(models.Model):
         verbose_name_plural = "Nominees"
 
     def save(self, *args, **kwargs):
-        # Sync share and share_percentage
+        self.sync_share_percentage()
+        super().save(*args, **kwargs)
+
+    def sync_share_percentage(self):
+        """Sync share and share_percentage (also used before bulk_create)"""
         if self.share and not self.share_percentage:
             self.share_percentage = self.share
-        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} ({self.relationship}) - {self.share}%"
@@ -0,0 +1,128 @@
+"""
+Proposal number allocation for membership applications.
+
+Numbers follow the ``BL-YYYYMM-XXXX`` format. Each worker process reserves a
+block of numbers from the per-month ``ProposalNumberCounter`` row and hands
+them out from memory, so the applications table is never scanned and two
+workers can never issue the same number. Numbers left unused in a block when
+a process exits are simply skipped (gaps are expected).
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+PROPOSAL_PREFIX = "BL"
+
+
+def current_period():
+    """Return the allocation period (``YYYYMM``) for the current month"""
+    return timezone.now().strftime("%Y%m")
+
+
+def format_proposal_number(period, number):
+    """Format a counter value as ``BL-YYYYMM-XXXX``"""
+    return f"{PROPOSAL_PREFIX}-{period}-{number:04d}"
+
+
+class ProposalNumberAllocator:
+    """
+    Hands out proposal numbers from blocks reserved in the database.
+
+    A block only becomes reusable by other requests once the transaction
+    that reserved it has committed; if that transaction rolls back, the
+    counter row rolls back with it and the block is discarded.
+    """
+
+    def __init__(self, block_size=None):
+        self._block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def block_size(self):
+        if self._block_size is not None:
+            return self._block_size
+        return max(1, getattr(settings, "PROPOSAL_NUMBER_BLOCK_SIZE", 20))
+
+    def next_number(self, period=None):
+        """Return the next free proposal number for ``period``"""
+        return self.reserve(1, period=period)[0]
+
+    def reserve(self, count, period=None):
+        """Return ``count`` unused proposal numbers for ``period``"""
+        period = period or current_period()
+        numbers = []
+
+        with self._lock:
+            block = self._blocks.get(period)
+            while block and block[0] <= block[1] and len(numbers) < count:
+                numbers.append(block[0])
+                block[0] += 1
+
+        missing = count - len(numbers)
+        if missing:
+            start, end = self._reserve_block(period, max(missing, self.block_size))
+            numbers.extend(range(start, start + missing))
+            if start + missing <= end:
+                self._release_on_commit(period, start + missing, end)
+
+        return [format_proposal_number(period, number) for number in numbers]
+
+    def reset(self):
+        """Drop all cached blocks (used by tests)"""
+        with self._lock:
+            self._blocks.clear()
+
+    def _reserve_block(self, period, size):
+        from .models import ProposalNumberCounter
+
+        counters = ProposalNumberCounter.objects.select_for_update()
+        with transaction.atomic():
+            counter = counters.filter(period=period).first()
+            if counter is None:
+                counter, _ = counters.get_or_create(
+                    period=period,
+                    defaults={"last_value": self._seed_value(period)},
+                )
+            start = counter.last_value + 1
+            counter.last_value += size
+            counter.save(update_fields=["last_value", "updated_at"])
+
+        return start, counter.last_value
+
+    def _release_on_commit(self, period, start, end):
+        def release():
+            with self._lock:
+                self._blocks[period] = [start, end]
+
+        transaction.on_commit(release)
+
+    def _seed_value(self, period):
+        """
+        Highest number already issued for ``period``.
+
+        Only runs once per month, when the counter row is first created, so
+        numbers issued before the counter existed are never reused.
+        """
+        from .models import MembershipApplication
+
+        last_number = (
+            MembershipApplication.objects.filter(
+                proposal_number__startswith=f"{PROPOSAL_PREFIX}-{period}-"
+            )
+            .order_by("-proposal_number")
+            .values_list("proposal_number", flat=True)
+            .first()
+        )
+        if not last_number:
+            return 0
+        try:
+            return int(last_number.split("-")[-1])
+        except ValueError:
+            return 0
+
+
+proposal_number_allocator = ProposalNumberAllocator()
@@ -1,5 +1,13 @@
 from rest_framework import serializers
 
+from apps.core.images import queue_image_processing, validate_image_upload
+from apps.core.serializers import (
+    DirectUploadField,
+    ProtectedMediaMixin,
+    RenditionField,
+)
+
+from .mappings import RELATIONSHIPS
 from .models import (
     ApplicationStatusHistory,
     MedicalRecord,
@@ -47,6 +55,8 @@ class MemberProfileSerializer(serializers.ModelSerializer):
     Serializer for returning member profile data after login
     """
 
+    photo_thumbnail = RenditionField(source="photo")
+
     class Meta:
         model = MembershipApplication
         fields = [
@@ -66,11 +76,12 @@ class MemberProfileSerializer(serializers.ModelSerializer):
             "present_address",
             "created_at",
             "photo",
+            "photo_thumbnail",
         ]
         read_only_fields = fields
 
 
-class NomineeSerializer(serializers.ModelSerializer):
+class NomineeSerializer(ProtectedMediaMixin, serializers.ModelSerializer):
     """
     Serializer for Nominee model matching frontend structure
     """
@@ -93,6 +104,12 @@ class NomineeSerializer(serializers.ModelSerializer):
             "id_proof": {"required": False, "allow_null": True},
         }
 
+    def validate_photo(self, value):
+        """Check the photo header before it is stored"""
+        if value:
+            validate_image_upload(value)
+        return value
+
     def validate_share(self, value):
         """Validate share percentage is between 0 and 100"""
         if value < 0 or value > 100:
@@ -105,22 +122,11 @@ class NomineeSerializer(serializers.ModelSerializer):
         """Normalize relationship from user input"""
         # Normalize relationship if relation is provided
         if "relation" in data:
-            relation = data["relation"].lower().strip()
-            mapping = {
-                "son": "child",
-                "daughter": "child",
-                "wife": "spouse",
-                "husband": "spouse",
-                "father": "father",
-                "mother": "mother",
-                "brother": "sibling",
-                "sister": "sibling",
-            }
-            data["relationship"] = mapping.get(relation, "child")
+            data["relationship"] = RELATIONSHIPS(data["relation"])
         return data
 
 
-class MedicalRecordSerializer(serializers.ModelSerializer):
+class MedicalRecordSerializer(ProtectedMediaMixin, serializers.ModelSerializer):
     """Serializer for medical record files"""
 
     class Meta:
@@ -129,13 +135,16 @@ class MedicalRecordSerializer(serializers.ModelSerializer):
         read_only_fields = ["uploaded_at"]
 
 
-class MembershipApplicationSerializer(serializers.ModelSerializer):
+class MembershipApplicationSerializer(ProtectedMediaMixin, serializers.ModelSerializer):
     """
     Main serializer for membership application
-    Handles field mapping from frontend to backend
+    Takes backend field names and choices; frontend payloads are mapped
+    first through ``mappings.APPLICATION_FIELDS``
     """
 
     nominees = NomineeSerializer(many=True, required=False)
+    # Token from a direct-to-storage upload, accepted in place of the photo
+    photo_upload = DirectUploadField("member-photo", source="photo", required=False)
     medical_records = serializers.ListField(
         child=serializers.FileField(), required=False, write_only=True
     )
@@ -158,6 +167,7 @@ class MembershipApplicationSerializer(serializers.ModelSerializer):
             "mobile",
             "email",
             "photo",
+            "photo_upload",
             "dob",
             "age",
             "nationality",
@@ -194,25 +204,11 @@ class MembershipApplicationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["proposal_no", "age", "created_at", "updated_at", "status"]
 
-    def validate_membership_type(self, value):
-        """Map frontend membership types to backend choices"""
-        mapping = {
-            "silver": "individual",
-            "bronze": "individual",
-            "gold": "family",
-            "executive": "corporate",
-        }
-        return mapping.get(value.lower(), value)
-
-    def validate_marital_status(self, value):
-        """Map frontend marital status to backend choices"""
-        mapping = {
-            "unmarried": "single",
-            "married": "married",
-            "divorced": "divorced",
-            "others": "widowed",
-        }
-        return mapping.get(value.lower(), value)
+    def validate_photo(self, value):
+        """Check the photo header before it is stored"""
+        if value:
+            validate_image_upload(value)
+        return value
 
     def validate(self, data):
         """
@@ -252,13 +248,24 @@ class MembershipApplicationSerializer(serializers.ModelSerializer):
         # Create application
         application = MembershipApplication.objects.create(**validated_data)
 
-        # Create nominees
-        for nominee_data in nominees_data:
-            Nominee.objects.create(application=application, **nominee_data)
-
-        # Create medical records
-        for file in medical_records:
-            MedicalRecord.objects.create(application=application, file=file)
+        # Create nominees and medical records with one INSERT each.
+        # bulk_create skips Model.save(), so apply the share sync here;
+        # file fields are still written to storage via Field.pre_save().
+        nominees = [
+            Nominee(application=application, **nominee_data)
+            for nominee_data in nominees_data
+        ]
+        for nominee in nominees:
+            nominee.sync_share_percentage()
+        Nominee.objects.bulk_create(nominees)
+        # bulk_create sends no post_save, so queue nominee photos here
+        for nominee in nominees:
+            queue_image_processing(nominee, "photo")
+
+        MedicalRecord.objects.bulk_create(
+            MedicalRecord(application=application, file=file)
+            for file in medical_records
+        )
 
         return application
 
@@ -266,6 +273,8 @@ class MembershipApplicationSerializer(serializers.ModelSerializer):
 class MembershipApplicationListSerializer(serializers.ModelSerializer):
     """Simplified serializer for list view"""
 
+    photo_thumbnail = RenditionField(source="photo")
+
     class Meta:
         model = MembershipApplication
         fields = [
@@ -277,6 +286,7 @@ class MembershipApplicationListSerializer(serializers.ModelSerializer):
             "email",
             "status",
             "created_at",
+            "photo_thumbnail",
         ]
 
 
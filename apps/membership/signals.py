@@ -0,0 +1,87 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.core.images import image_normalized, queue_image_processing
+
+from .login import LOGIN_KEY_FIELDS, invalidate_login_record
+from .models import MedicalRecord, MembershipApplication, Nominee
+from .statistics import (
+    BUCKET_FIELDS,
+    application_bucket,
+    instance_bucket,
+    move_application,
+)
+
+
+@receiver(post_save, sender=MembershipApplication)
+@receiver(post_delete, sender=MembershipApplication)
+def clear_member_login_cache(sender, instance, **kwargs):
+    """Keep cached login records in step with the application"""
+    invalidate_login_record(instance, instance.__dict__.pop("_login_keys", ()))
+
+
+@receiver(post_save, sender=MembershipApplication)
+def process_photo(sender, instance, created, **kwargs):
+    """Normalize a newly uploaded photo in the background"""
+    if created:
+        queue_image_processing(instance, "photo")
+
+
+@receiver(pre_save, sender=MembershipApplication)
+def remember_stored_state(sender, instance, raw, update_fields, **kwargs):
+    """
+    Note what an update replaces, read in one query: the bucket the
+    application is counted in and the login keys its record is cached under
+    """
+    if raw or instance._state.adding:
+        return
+    fields = set(BUCKET_FIELDS + LOGIN_KEY_FIELDS)
+    if update_fields is not None:
+        fields &= set(update_fields)
+    if not fields:
+        return
+    row = (
+        MembershipApplication._default_manager.filter(pk=instance.pk)
+        .values("created_at", *BUCKET_FIELDS, *LOGIN_KEY_FIELDS)
+        .first()
+    )
+    if fields & set(BUCKET_FIELDS):
+        instance._statistics_bucket = (
+            application_bucket(
+                row["created_at"], *(row[field] for field in BUCKET_FIELDS)
+            )
+            if row
+            else None
+        )
+    if row and fields & set(LOGIN_KEY_FIELDS):
+        instance._login_keys = [row[field] for field in LOGIN_KEY_FIELDS]
+
+
+@receiver(post_save, sender=MembershipApplication)
+def update_statistics(sender, instance, created, raw, **kwargs):
+    """Move the application to its new statistics bucket"""
+    if raw:
+        return
+    if created:
+        move_application(None, instance_bucket(instance))
+    elif "_statistics_bucket" in instance.__dict__:
+        old_bucket = instance.__dict__.pop("_statistics_bucket")
+        move_application(old_bucket, instance_bucket(instance))
+
+
+@receiver(post_delete, sender=MembershipApplication)
+def remove_from_statistics(sender, instance, **kwargs):
+    move_application(instance_bucket(instance), None)
+
+
+@receiver(post_save, sender=Nominee)
+@receiver(post_delete, sender=Nominee)
+@receiver(image_normalized, sender=Nominee)
+@receiver(post_save, sender=MedicalRecord)
+@receiver(post_delete, sender=MedicalRecord)
+def touch_application(sender, instance, **kwargs):
+    """Nominees and records are part of the application detail: bump its ETag"""
+    MembershipApplication.objects.filter(pk=instance.application_id).update(
+        updated_at=timezone.now()
+    )
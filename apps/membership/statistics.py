@@ -0,0 +1,181 @@
+"""
+Membership statistics backed by the ``MembershipStatistic`` rollup table.
+
+Every application is counted in exactly one bucket: the month it was
+created in, its status, membership type and field officer code. Signals
+(see ``signals.py``) move an application between buckets when it is
+created, changes status (or type, or field officer) and is deleted, so the
+statistics endpoint reads a few hundred bucket rows instead of counting
+the applications table. Counts are adjusted after the saving transaction
+commits.
+
+``QuerySet.update()`` bypasses the signals and a process can die between
+commit and the adjustment; run ``manage.py reconcile_membership_statistics``
+after bulk changes, or periodically, to correct any drift.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from .models import MembershipApplication, MembershipStatistic
+
+BUCKET_FIELDS = ("status", "membership_type", "fo_code")
+
+
+def application_bucket(created_at, status, membership_type, fo_code):
+    """Rollup bucket of an application, as MembershipStatistic lookups"""
+    return {
+        "month": timezone.localtime(created_at).date().replace(day=1),
+        "status": status,
+        "membership_type": membership_type,
+        "fo_code": fo_code or "",
+    }
+
+
+def instance_bucket(application):
+    return application_bucket(
+        application.created_at,
+        application.status,
+        application.membership_type,
+        application.fo_code,
+    )
+
+
+def adjust_bucket(bucket, delta):
+    """Add ``delta`` to the count of ``bucket``, creating the row if needed"""
+    statistics = MembershipStatistic.objects.filter(**bucket)
+    if statistics.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            MembershipStatistic.objects.create(count=delta, **bucket)
+    except IntegrityError:
+        # Created concurrently by another request
+        statistics.update(count=F("count") + delta)
+
+
+def move_application(old_bucket, new_bucket):
+    """
+    Count an application in ``new_bucket`` instead of ``old_bucket`` once
+    the current transaction commits. Deferring keeps the hot bucket rows
+    from staying locked for the whole of a (file-writing) submission.
+    """
+    if old_bucket == new_bucket:
+        return
+
+    def apply():
+        if old_bucket is None:
+            adjust_bucket(new_bucket, 1)
+        elif new_bucket is None:
+            adjust_bucket(old_bucket, -1)
+        else:
+            with transaction.atomic():
+                adjust_bucket(old_bucket, -1)
+                adjust_bucket(new_bucket, 1)
+
+    transaction.on_commit(apply)
+
+
+def count_new_applications(applications):
+    """
+    Count bulk-created ``applications`` (bulk_create sends no signals)
+    once the current transaction commits, with one update per bucket
+    """
+    buckets = Counter(
+        tuple(instance_bucket(application).items()) for application in applications
+    )
+
+    def apply():
+        for bucket, count in buckets.items():
+            adjust_bucket(dict(bucket), count)
+
+    transaction.on_commit(apply)
+
+
+def get_statistics():
+    """Application counts in total and by status, type, month and fo_code"""
+    totals = {
+        "by_status": defaultdict(int),
+        "by_membership_type": defaultdict(int),
+        "by_month": defaultdict(int),
+        "by_fo_code": defaultdict(int),
+    }
+    total = 0
+    rows = MembershipStatistic.objects.exclude(count=0).values_list(
+        "month", "status", "membership_type", "fo_code", "count"
+    )
+    for month, status, membership_type, fo_code, count in rows:
+        total += count
+        totals["by_status"][status] += count
+        totals["by_membership_type"][membership_type] += count
+        totals["by_month"][f"{month:%Y-%m}"] += count
+        totals["by_fo_code"][fo_code] += count
+
+    statistics = {"total": total}
+    for key, counts in totals.items():
+        statistics[key] = dict(sorted(counts.items()))
+    return statistics
+
+
+def count_applications():
+    """Bucket counts computed from the applications table"""
+    rows = (
+        MembershipApplication._default_manager.annotate(
+            month=TruncMonth("created_at", output_field=DateField()),
+            bucket_fo_code=Coalesce("fo_code", Value("")),
+        )
+        .values("month", "status", "membership_type", "bucket_fo_code")
+        .annotate(total=Count("pk"))
+        .order_by()
+    )
+    return {
+        (
+            row["month"],
+            row["status"],
+            row["membership_type"],
+            row["bucket_fo_code"],
+        ): row["total"]
+        for row in rows
+    }
+
+
+def reconcile_statistics(dry_run=False):
+    """
+    Bring the rollup table in line with the applications table. Returns
+    ``(bucket, stored, actual)`` for every bucket that was wrong.
+    """
+    with transaction.atomic():
+        actual = count_applications()
+        stored = {
+            (row.month, row.status, row.membership_type, row.fo_code): row
+            for row in MembershipStatistic.objects.select_for_update()
+        }
+
+        changes = []
+        for key in sorted(set(actual) | set(stored), key=str):
+            row = stored.get(key)
+            stored_count = row.count if row else 0
+            actual_count = actual.get(key, 0)
+            if stored_count != actual_count:
+                changes.append((key, stored_count, actual_count))
+            if dry_run:
+                continue
+            if row is None:
+                if actual_count:
+                    MembershipStatistic.objects.create(
+                        month=key[0],
+                        status=key[1],
+                        membership_type=key[2],
+                        fo_code=key[3],
+                        count=actual_count,
+                    )
+            elif not actual_count:
+                row.delete()
+            elif stored_count != actual_count:
+                row.count = actual_count
+                row.save(update_fields=["count"])
+    return changes
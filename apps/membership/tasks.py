@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from apps.core.tasks import task
+
+from .models import MembershipApplication
+
+
+@task
+def send_application_confirmation(application_id):
+    """Confirm receipt of a membership application to the applicant"""
+    application = MembershipApplication.objects.get(pk=application_id)
+    if not application.email:
+        return
+
+    send_mail(
+        f"Membership Application Received - {application.proposal_no}",
+        f"""
+Dear {application.name_english},
+
+Thank you for submitting your membership application to BrightLife Bangladesh.
+
+Your application details:
+- Proposal Number: {application.proposal_no}
+- Membership Type: {application.get_membership_type_display()}
+- Submission Date: {application.created_at.strftime('%d %B %Y, %I:%M %p')}
+
+Your application is currently under review. We will notify you once the review \
+is complete.
+
+For any queries, please contact us at support@brightlife-bd.com
+
+Best regards,
+BrightLife Bangladesh Team
+        """,
+        settings.DEFAULT_FROM_EMAIL,
+        [application.email],
+    )
@@ -1,11 +1,86 @@
+import csv
+import json
+import shutil
+import tempfile
+import tracemalloc
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
 
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
 
-from .models import MembershipApplication
+from PIL import Image
+
+from .models import (
+    MedicalRecord,
+    MembershipApplication,
+    MembershipStatistic,
+    Nominee,
+    ProposalNumberCounter,
+)
+from .proposal_numbers import (
+    ProposalNumberAllocator,
+    current_period,
+    proposal_number_allocator,
+)
+from .serializers import (
+    MemberProfileSerializer,
+    MembershipApplicationListSerializer,
+    MembershipApplicationSerializer,
+)
+from .statistics import get_statistics, reconcile_statistics
+from .views import MemberLoginAsyncView, MembershipApplicationViewSet
+
+
+def create_application(**overrides):
+    """Create a minimal valid application for tests"""
+    fields = {
+        "membership_type": "individual",
+        "name_english": "Test Member",
+        "dob": date(1990, 1, 1),
+        "gender": "male",
+        "marital_status": "single",
+        "mobile": "01712345678",
+        "accept_terms": True,
+    }
+    fields.update(overrides)
+    return MembershipApplication.objects.create(**fields)
+
+
+def build_test_png(name="photo.png"):
+    buffer = BytesIO()
+    Image.new("RGB", (2, 2), color="blue").save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+def build_submission(**extra):
+    """Frontend-style FormData payload for a membership application"""
+    data = {
+        "membershipType": "individual",
+        "nameEnglish": "Test User",
+        "dob": "1995-05-15",
+        "gender": "male",
+        "maritalStatus": "unmarried",
+        "mobile": "01712345678",
+        "acceptTerms": "true",
+    }
+    data.update(extra)
+    return data
 
 
 class MembershipApplicationModelTest(TestCase):
@@ -121,3 +196,645 @@ class MembershipAPITest(APITestCase):
         )
         # Expect validation error because total share != 100
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProposalNumberAllocatorTest(TransactionTestCase):
+    """Test block-based proposal number allocation"""
+
+    def setUp(self):
+        proposal_number_allocator.reset()
+
+    def test_numbers_are_sequential_within_block(self):
+        """Numbers from one worker are handed out in order from its block"""
+        allocator = ProposalNumberAllocator(block_size=5)
+        period = current_period()
+
+        numbers = [allocator.next_number() for _ in range(7)]
+
+        self.assertEqual(numbers, [f"BL-{period}-{n:04d}" for n in range(1, 8)])
+        counter = ProposalNumberCounter.objects.get(period=period)
+        self.assertEqual(counter.last_value, 10)
+
+    def test_counter_seeded_from_existing_applications(self):
+        """A new month's counter starts after numbers issued before it existed"""
+        period = current_period()
+        create_application(
+            proposal_number=f"BL-{period}-0042", proposal_no=f"BL-{period}-0042"
+        )
+
+        number = ProposalNumberAllocator(block_size=1).next_number()
+
+        self.assertEqual(number, f"BL-{period}-0043")
+
+    def test_interleaved_workers_never_collide(self):
+        """Several workers with their own blocks issue unique numbers"""
+        workers = [ProposalNumberAllocator(block_size=10) for _ in range(4)]
+        proposal_numbers = []
+
+        for i in range(200):
+            worker = workers[i % len(workers)]
+            with mock.patch(
+                "apps.membership.proposal_numbers.proposal_number_allocator",
+                worker,
+            ):
+                application = create_application(mobile=f"017{i:08d}")
+            proposal_numbers.append(application.proposal_number)
+
+        self.assertEqual(len(set(proposal_numbers)), 200)
+        counter = ProposalNumberCounter.objects.get(period=current_period())
+        self.assertLessEqual(counter.last_value, 200 + 4 * 10)
+
+    def test_rolled_back_block_is_not_reused(self):
+        """A block reserved in a rolled-back transaction is discarded"""
+        from django.db import transaction
+
+        allocator = ProposalNumberAllocator(block_size=10)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                allocator.next_number()
+                raise RuntimeError("rollback")
+
+        self.assertFalse(ProposalNumberCounter.objects.exists())
+        self.assertTrue(allocator.next_number().endswith("-0001"))
+
+
+@skipUnless(connection.vendor == "postgresql", "Requires concurrent DB writers")
+class ProposalNumberLoadTest(TransactionTestCase):
+    """Concurrent submissions must never hit the proposal number constraint"""
+
+    def setUp(self):
+        proposal_number_allocator.reset()
+
+    def submit(self, index):
+        client = APIClient()
+        try:
+            return client.post(
+                "/api/v1/membership/applications/",
+                {
+                    "membershipType": "individual",
+                    "nameEnglish": f"Load Test {index}",
+                    "dob": "1990-01-01",
+                    "gender": "male",
+                    "maritalStatus": "unmarried",
+                    "mobile": f"017{index:08d}",
+                    "acceptTerms": "true",
+                },
+                format="multipart",
+            ).status_code
+        except IntegrityError:
+            return "integrity-error"
+        finally:
+            connection.close()
+
+    def test_concurrent_creates(self):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(self.submit, range(300)))
+
+        self.assertEqual(results.count(status.HTTP_201_CREATED), 300)
+        self.assertEqual(
+            MembershipApplication.objects.values("proposal_number").distinct().count(),
+            300,
+        )
+
+
+class MembershipUploadStreamingTest(TestCase):
+    """Uploads are spooled to disk so memory does not grow with file count"""
+
+    FILE_SIZE = 512 * 1024
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        proposal_number_allocator.reset()
+
+    def build_request(self):
+        """Photo + age proof + 18 medical records = 20 files"""
+        files = {
+            "photo": build_test_png(),
+            "ageProofDoc": SimpleUploadedFile(
+                "age.pdf", b"a" * self.FILE_SIZE, content_type="application/pdf"
+            ),
+        }
+        for i in range(18):
+            files[f"medicalRecords{i}"] = SimpleUploadedFile(
+                f"record{i}.pdf", b"m" * self.FILE_SIZE, content_type="application/pdf"
+            )
+        return APIRequestFactory().post(
+            "/api/v1/membership/applications/",
+            build_submission(**files),
+            format="multipart",
+        )
+
+    def test_twenty_file_submission_memory(self):
+        """Peak memory stays well below the total upload size"""
+        request = self.build_request()
+        view = MembershipApplicationViewSet.as_view({"post": "create"})
+
+        tracemalloc.start()
+        try:
+            with override_settings(MEDIA_ROOT=self.media_root):
+                response = view(request)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            request.close()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLess(peak, 19 * self.FILE_SIZE / 4)
+        self.assertEqual(MedicalRecord.objects.count(), 18)
+
+    def test_small_submission_is_spooled_to_disk(self):
+        """Files are spooled even when the request fits in memory"""
+        request = APIRequestFactory().post(
+            "/api/v1/membership/applications/",
+            build_submission(photo=build_test_png()),
+            format="multipart",
+        )
+        with override_settings(MEDIA_ROOT=self.media_root):
+            MembershipApplicationViewSet.as_view({"post": "create"})(request)
+        try:
+            self.assertIsInstance(request.FILES["photo"], TemporaryUploadedFile)
+        finally:
+            request.close()
+
+    def test_nominee_files_are_parsed(self):
+        """Nominee fields and files are split out of the flat payload"""
+        data = build_submission(
+            **{
+                "nominees[0]name": "First",
+                "nominees[0]relation": "Son",
+                "nominees[0]share": "60",
+                "nominees[0]age": "10",
+                "nominees[0]photo": build_test_png("nominee.png"),
+                "nomineeIdProof[0]": SimpleUploadedFile(
+                    "id.pdf", b"id", content_type="application/pdf"
+                ),
+                "nominees[1]name": "Second",
+                "nominees[1]relation": "wife",
+                "nominees[1]share": "40",
+                "nominees[1]age": "30",
+            }
+        )
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = self.client.post(
+                "/api/v1/membership/applications/", data, format="multipart"
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        application = MembershipApplication.objects.get()
+        first, second = application.nominees.all()
+        self.assertEqual(first.relationship, "child")
+        self.assertTrue(first.photo)
+        self.assertTrue(first.id_proof)
+        self.assertEqual(second.relationship, "spouse")
+        self.assertFalse(second.photo)
+
+
+class MembershipApplicationBulkCreateTest(TestCase):
+    """Nominees and medical records are written in a constant number of queries"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        proposal_number_allocator.reset()
+        ProposalNumberCounter.objects.create(period=current_period())
+
+    def test_query_count_with_five_nominees_and_ten_files(self):
+        validated_data = {
+            "membership_type": "family",
+            "name_english": "Bulk Member",
+            "dob": date(1990, 1, 1),
+            "gender": "female",
+            "marital_status": "married",
+            "accept_terms": True,
+            "nominees": [
+                {"name": f"Nominee {i}", "relationship": "child", "share": 20}
+                for i in range(5)
+            ],
+            "medical_records": [
+                SimpleUploadedFile(f"record{i}.pdf", b"pdf") for i in range(10)
+            ],
+        }
+
+        # Counter reservation (savepoint, select, update, release), the
+        # application insert, one nominee insert and one medical record insert
+        with override_settings(MEDIA_ROOT=self.media_root):
+            with self.assertNumQueries(7):
+                application = MembershipApplicationSerializer().create(validated_data)
+
+        self.assertEqual(application.nominees.count(), 5)
+        self.assertEqual(application.medical_records_files.count(), 10)
+        self.assertEqual(
+            set(Nominee.objects.values_list("share_percentage", flat=True)), {20}
+        )
+        self.assertTrue(all(r.file.name for r in MedicalRecord.objects.all()))
+
+
+class MembershipApplicationListTest(APITestCase):
+    """Admin listing is cursor paginated and keeps the response envelope"""
+
+    def setUp(self):
+        proposal_number_allocator.reset()
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        self.client.force_authenticate(self.admin)
+        for i in range(25):
+            create_application(mobile=f"017{i:08d}")
+
+    def test_pages_cover_every_application_once(self):
+        url = "/api/v1/membership/applications/?page_size=10"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data["success"])
+            self.assertLessEqual(len(response.data["data"]), 10)
+            seen.extend(row["id"] for row in response.data["data"])
+            url = response.data["next"]
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+
+    def test_page_query_count_is_constant(self):
+        """A page costs one query regardless of table size or depth"""
+        first = self.client.get("/api/v1/membership/applications/?page_size=5")
+        with self.assertNumQueries(1):
+            self.client.get(first.data["next"])
+
+    def test_projection_matches_serializer(self):
+        create_application(mobile="01799999999", photo="members/photos/a.jpg")
+        response = self.client.get("/api/v1/membership/applications/?page_size=100")
+
+        request = APIRequestFactory().get("/")
+        expected = MembershipApplicationListSerializer(
+            MembershipApplication.objects.order_by("-created_at", "id"),
+            many=True,
+            context={"request": request},
+        ).data
+        self.assertEqual(response.data["data"], expected)
+        self.assertTrue(response.data["data"][0]["photo_thumbnail"])
+
+
+class MembershipApplicationConditionalTest(APITestCase):
+    """Application detail is revalidated with ETag/Last-Modified"""
+
+    def setUp(self):
+        proposal_number_allocator.reset()
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        self.client.force_authenticate(self.admin)
+        self.application = create_application()
+        self.url = f"/api/v1/membership/applications/{self.application.pk}/"
+
+    def test_detail_carries_validators(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_current_copy_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertFalse(response.content)
+
+    def test_nominee_change_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        Nominee.objects.create(application=self.application, name="Nominee", share=100)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class MembershipStatisticsTest(APITestCase):
+    """Statistics are served from incrementally maintained rollups"""
+
+    url = "/api/v1/membership/applications/statistics/"
+
+    def setUp(self):
+        proposal_number_allocator.reset()
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        # Rollups are adjusted once the saving transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first = create_application(mobile="01700000001", fo_code="FO1")
+            self.second = create_application(mobile="01700000002", fo_code="FO1")
+            self.third = create_application(
+                mobile="01700000003", membership_type="family"
+            )
+
+    def test_rollups_follow_saves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.status = "approved"
+            self.first.save()
+            self.third.delete()
+
+        statistics = get_statistics()
+        self.assertEqual(statistics["total"], 2)
+        self.assertEqual(statistics["by_status"], {"approved": 1, "pending": 1})
+        self.assertEqual(statistics["by_membership_type"], {"individual": 2})
+        self.assertEqual(statistics["by_fo_code"], {"FO1": 2})
+        self.assertEqual(statistics["by_month"], {f"{self.first.created_at:%Y-%m}": 2})
+
+    def test_endpoint_reads_only_the_rollup_table(self):
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["total"], 3)
+        self.assertEqual(
+            response.data["data"]["by_membership_type"],
+            {"family": 1, "individual": 2},
+        )
+
+    def test_endpoint_requires_admin(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_reconcile_fixes_drift(self):
+        # QuerySet.update() bypasses the signals
+        MembershipApplication.objects.filter(pk=self.second.pk).update(
+            status="rejected"
+        )
+        MembershipStatistic.objects.filter(status="pending", fo_code="FO1").update(
+            count=7
+        )
+
+        self.assertEqual(len(reconcile_statistics(dry_run=True)), 2)
+        self.assertEqual(get_statistics()["by_status"], {"pending": 8})
+
+        out = StringIO()
+        call_command("reconcile_membership_statistics", stdout=out)
+        self.assertIn("Fixed 2 wrong bucket(s)", out.getvalue())
+        self.assertEqual(get_statistics()["by_status"], {"pending": 2, "rejected": 1})
+        self.assertEqual(reconcile_statistics(), [])
+
+
+@override_settings(EXPORT_NOMINEE_COLUMNS=2, EXPORT_CHUNK_SIZE=2)
+class MembershipExportTest(APITestCase):
+    """Applications stream out as CSV/XLSX with nominees flattened"""
+
+    url = "/api/v1/membership/applications/export/"
+
+    def setUp(self):
+        proposal_number_allocator.reset()
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        self.client.force_authenticate(self.admin)
+        self.applications = [
+            create_application(mobile=f"0170000000{i}", name_english=f"Member {i}")
+            for i in range(3)
+        ]
+        Nominee.objects.bulk_create(
+            Nominee(application=self.applications[0], name=name, share=share)
+            for name, share in [("Alpha", 50), ("Beta", 30), ("Gamma", 20)]
+        )
+
+    def test_csv_export(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode("utf-8-sig")
+        rows = list(csv.reader(content.splitlines()))
+        self.assertEqual(len(rows), 4)
+        header, first = rows[0], rows[1]
+        self.assertEqual(header[-1], "other_nominees")
+        self.assertIn("nominee_2_share", header)
+        self.assertEqual(first[header.index("name_english")], "Member 0")
+        self.assertEqual(first[header.index("nominee_1_name")], "Alpha")
+        self.assertEqual(first[header.index("nominee_2_name")], "Beta")
+        self.assertEqual(first[-1], "Gamma (child, 20%)")
+
+    def test_xlsx_export_by_status(self):
+        self.applications[1].status = "approved"
+        self.applications[1].save()
+
+        response = self.client.get(self.url, {"output": "xlsx", "status": "approved"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join(response.streaming_content)
+        with zipfile.ZipFile(BytesIO(content)) as archive:
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 2)
+        self.assertIn("Member 1", sheet)
+
+    def test_unknown_format_is_rejected(self):
+        response = self.client.get(self.url, {"output": "pdf"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir, ignore_errors=True)
+        path = f"{output_dir}/members.csv"
+
+        call_command("export_members", output=path, stderr=StringIO())
+
+        with open(path, encoding="utf-8-sig") as exported:
+            self.assertEqual(len(exported.read().splitlines()), 4)
+
+
+class MemberImportTest(TestCase):
+    """Legacy rosters are validated like submissions and bulk inserted"""
+
+    def setUp(self):
+        proposal_number_allocator.reset()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def write(self, name, content):
+        path = f"{self.directory}/{name}"
+        with open(path, "w", encoding="utf-8") as roster:
+            roster.write(content)
+        return path
+
+    def import_members(self, path, **options):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("import_members", path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_csv_roster(self):
+        nominees = json.dumps([{"name": "Rahim", "relation": "son", "share": 100}])
+        rows = [
+            "membership_type,name_english,dob,gender,marital_status,mobile,email,"
+            "accept_terms,nominees",
+            f'family,Legacy One,1980-05-01,male,married,01711111111,,true,"{nominees.replace(chr(34), chr(34) * 2)}"',
+            "individual,Legacy Two,1975-02-03,female,single,01722222222,,true,",
+            "individual,No Terms,1975-02-03,female,single,01733333333,,false,",
+        ]
+        path = self.write("roster.csv", "\n".join(rows) + "\n")
+
+        output = self.import_members(path, batch_size=2)
+
+        self.assertIn("Imported 2 of 3 row(s)", output)
+        self.assertIn("rows/s", output)
+        imported = MembershipApplication.objects.order_by("name_english")
+        self.assertEqual(
+            [(a.name_english, a.membership_type) for a in imported],
+            [("Legacy One", "family"), ("Legacy Two", "individual")],
+        )
+        self.assertEqual(len({a.proposal_no for a in imported}), 2)
+        self.assertTrue(all(a.proposal_number == a.proposal_no for a in imported))
+        self.assertEqual(
+            imported[0].age,
+            date.today().year - 1980 - (date.today() < date(date.today().year, 5, 1)),
+        )
+        nominee = Nominee.objects.get()
+        self.assertEqual((nominee.relationship, nominee.share), ("child", 100))
+        self.assertEqual(get_statistics()["total"], 2)
+
+        with open(f"{path}.errors.jsonl", encoding="utf-8") as errors:
+            rejected = [json.loads(line) for line in errors]
+        self.assertEqual(len(rejected), 1)
+        self.assertEqual(rejected[0]["line"], 4)
+        self.assertIn("accept_terms", rejected[0]["errors"])
+
+    def test_jsonl_dry_run_writes_nothing(self):
+        valid = {
+            "membership_type": "individual",
+            "name_english": "Dry Run",
+            "dob": "1990-01-01",
+            "gender": "male",
+            "marital_status": "single",
+            "mobile": "01744444444",
+            "accept_terms": True,
+        }
+        path = self.write("roster.jsonl", json.dumps(valid) + "\nnot json\n")
+
+        output = self.import_members(path, dry_run=True)
+
+        self.assertIn("Validated 1 of 2 row(s)", output)
+        self.assertIn("1 row(s) rejected", output)
+        self.assertFalse(MembershipApplication.objects.exists())
+
+
+class MemberLoginTest(APITestCase):
+    """Member login by proposal number + birth year"""
+
+    url = "/api/v1/membership/login/"
+
+    def setUp(self):
+        cache.clear()
+        proposal_number_allocator.reset()
+        self.member = create_application(status="active")
+
+    def login(self, proposal_no=None, birth_year=1990):
+        return self.client.post(
+            self.url,
+            {
+                "proposalNo": proposal_no or self.member.proposal_no,
+                "birthYear": birth_year,
+            },
+            format="json",
+        )
+
+    def test_login_is_case_insensitive(self):
+        response = self.login(self.member.proposal_no.lower())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["data"]["member"]["proposal_no"], self.member.proposal_no
+        )
+
+    def test_repeat_login_is_served_from_cache(self):
+        self.login()
+
+        with self.assertNumQueries(0):
+            response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cache_is_invalidated_on_save(self):
+        self.login()
+        self.member.status = "rejected"
+        self.member.save()
+
+        response = self.login()
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_old_proposal_number_is_invalidated(self):
+        old_number = self.member.proposal_no
+        self.login(old_number)
+        self.member.proposal_no = self.member.proposal_number = "BLS-CHANGED-1"
+        self.member.save(update_fields=["proposal_no", "proposal_number"])
+
+        self.assertNotEqual(self.login(old_number).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.login("BLS-CHANGED-1").status_code, status.HTTP_200_OK)
+
+    def test_birth_year_mismatch(self):
+        response = self.login(birth_year=1991)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_matches_serializer(self):
+        self.member.photo = "members/photos/a.jpg"
+        self.member.save()
+
+        response = self.login()
+
+        self.assertEqual(
+            response.data["data"]["member"],
+            MemberProfileSerializer(self.member).data,
+        )
+
+
+class MemberLoginAsyncTest(TestCase):
+    """Async-native login view served under ASGI"""
+
+    def setUp(self):
+        cache.clear()
+        proposal_number_allocator.reset()
+        self.member = create_application(status="active")
+        self.factory = AsyncRequestFactory()
+
+    async def login(self, proposal_no=None, birth_year=1990):
+        request = self.factory.post(
+            "/api/v1/membership/login/",
+            {
+                "proposalNo": proposal_no or self.member.proposal_no,
+                "birthYear": birth_year,
+            },
+            content_type="application/json",
+        )
+        return await MemberLoginAsyncView.as_view()(request)
+
+    async def test_login(self):
+        response = await self.login(self.member.proposal_no.lower())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.content)
+        self.assertEqual(data["data"]["member"]["proposal_no"], self.member.proposal_no)
+
+    async def test_birth_year_mismatch(self):
+        response = await self.login(birth_year=1991)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(json.loads(response.content)["success"])
+
+    async def test_invalid_payload(self):
+        request = self.factory.post(
+            "/api/v1/membership/login/",
+            "not json",
+            content_type="application/json",
+        )
+        response = await MemberLoginAsyncView.as_view()(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
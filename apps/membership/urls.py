@@ -1,8 +1,13 @@
+from django.conf import settings
 from django.urls import include, path
 
 from rest_framework.routers import DefaultRouter
 
-from .views import MemberLoginView, MembershipApplicationViewSet
+from .views import (
+    MemberLoginAsyncView,
+    MemberLoginView,
+    MembershipApplicationViewSet,
+)
 
 router = DefaultRouter()
 router.register(
@@ -11,9 +16,14 @@ router.register(
 
 app_name = "membership"
 
+# Async-native login when served over ASGI (see ASYNC_PUBLIC_ENDPOINTS)
+member_login_view = (
+    MemberLoginAsyncView if settings.ASYNC_PUBLIC_ENDPOINTS else MemberLoginView
+)
+
 urlpatterns = [
     # Member Login Endpoint
-    path("login/", MemberLoginView.as_view(), name="member-login"),
+    path("login/", member_login_view.as_view(), name="member-login"),
     # Application CRUD routes
     path("", include(router.urls)),
 ]
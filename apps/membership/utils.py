@@ -1,8 +1,7 @@
 import os
 
 from django.core.exceptions import ValidationError
-
-from PIL import Image
+from django.core.files.images import get_image_dimensions
 
 
 def validate_file_size(file, max_size_mb=5):
@@ -13,9 +12,11 @@ def validate_file_size(file, max_size_mb=5):
 
 
 def validate_image_dimensions(image, max_width=2000, max_height=2000):
-    """Validate image dimensions"""
-    img = Image.open(image)
-    if img.width > max_width or img.height > max_height:
+    """Validate image dimensions (reads the image header only)"""
+    width, height = get_image_dimensions(image)
+    if width is None or height is None:
+        raise ValidationError("Upload a valid image.")
+    if width > max_width or height > max_height:
         raise ValidationError(
             f"Image dimensions cannot exceed {max_width}x{max_height}px"
         )
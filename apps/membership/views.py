@@ -1,24 +1,57 @@
 import logging
+import re
 
 from django.db import transaction
-from django.db.models import Q
+from django.http import JsonResponse
 from django.utils import timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 
 from rest_framework import permissions, status, viewsets
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from apps.core.conditional import (
+    add_validators,
+    instance_version,
+    is_conditional,
+    not_modified,
+    stored_version,
+)
+from apps.core.exports import EXPORT_FORMATS, export_response
+from apps.core.http import parse_request_data
+from apps.core.pagination import EnvelopeCursorPagination
+from apps.core.projections import ProjectedListMixin, ReadOnlyProjection
+from apps.core.uploads import SpooledUploadMixin
+
+from .exports import export_header, export_rows
+from .login import aget_login_record, evaluate_login, get_login_record
+from .mappings import APPLICATION_FIELDS, RELATIONSHIPS
 from .models import MembershipApplication
 from .serializers import (
     MemberLoginSerializer,
-    MemberProfileSerializer,
     MembershipApplicationListSerializer,
     MembershipApplicationSerializer,
 )
+from .statistics import get_statistics
+from .tasks import send_application_confirmation
 
 logger = logging.getLogger("membership")
 
+# Admin-only data: browsers may keep it but must revalidate, proxies may not
+DETAIL_CACHE_CONTROL = {"private": True, "no_cache": True}
+
+NOMINEE_FIELD_PATTERN = re.compile(r"^nominees\[(\d+)\](\w+)$")
+NOMINEE_ID_PROOF_PATTERN = re.compile(r"^nomineeIdProof\[(\d+)\]$")
+
+
+class MembershipApplicationPagination(EnvelopeCursorPagination):
+    """Keyset pagination over the (-created_at) index, newest first"""
+
+    ordering = ("-created_at", "id")
+
 
 class MemberLoginView(APIView):
     """
@@ -75,102 +108,101 @@ class MemberLoginView(APIView):
 
             logger.info(f"Member login attempt: {proposal_no}")
 
-            # Find member by proposal number (check both fields)
-            member = MembershipApplication.objects.filter(
-                Q(proposal_no__iexact=proposal_no)
-                | Q(proposal_number__iexact=proposal_no)
-            ).first()
+            # Find member by proposal number (indexed, cached)
+            member = get_login_record(proposal_no)
+            payload, status_code = evaluate_login(proposal_no, birth_year, member)
 
-            if not member:
-                logger.warning(f"Login failed: Member not found - {proposal_no}")
-                return Response(
-                    {
-                        "success": False,
-                        "message": "Invalid credentials. Member not found.",
-                    },
-                    status=status.HTTP_401_UNAUTHORIZED,
-                )
+            return Response(payload, status=status_code)
 
-            # Verify birth year from dob or date_of_birth
-            member_dob = member.dob or member.date_of_birth
-            if not member_dob:
-                logger.warning(f"Login failed: No DOB on record - {proposal_no}")
-                return Response(
-                    {
-                        "success": False,
-                        "message": "Invalid credentials. Birth year mismatch.",
-                    },
-                    status=status.HTTP_401_UNAUTHORIZED,
-                )
+        except Exception as e:
+            logger.error(f"Member login error: {str(e)}")
+            return Response(
+                {"success": False, "message": "Server error. Please try again later."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
 
-            if member_dob.year != birth_year:
-                logger.warning(f"Login failed: Birth year mismatch - {proposal_no}")
-                return Response(
-                    {
-                        "success": False,
-                        "message": "Invalid credentials. Birth year mismatch.",
-                    },
-                    status=status.HTTP_401_UNAUTHORIZED,
+
+class MemberLoginAsyncView(View):
+    """
+    Async-native Member Login API
+    POST /api/v1/membership/login/
+
+    Same contract as MemberLoginView, but awaits the login cache and the
+    async ORM instead of holding a worker thread per request. Routed in
+    place of MemberLoginView when ASYNC_PUBLIC_ENDPOINTS is enabled and the
+    app runs under an ASGI server.
+    """
+
+    http_method_names = ["post", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Public endpoint, CSRF-exempt like the DRF APIView it replaces
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def post(self, request):
+        try:
+            try:
+                data = parse_request_data(request)
+            except ValueError:
+                return JsonResponse(
+                    {"success": False, "message": "Invalid input"},
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Check membership status
-            status_message = None
-            if member.status == "pending":
-                status_message = "Your application is pending review."
-            elif member.status == "under_review":
-                status_message = "Your application is under review."
-            elif member.status == "rejected":
-                return Response(
+            serializer = MemberLoginSerializer(data=data)
+            if not serializer.is_valid():
+                return JsonResponse(
                     {
                         "success": False,
-                        "message": "Your membership application was rejected. Please contact support.",
+                        "message": "Invalid input",
+                        "errors": serializer.errors,
                     },
-                    status=status.HTTP_403_FORBIDDEN,
+                    status=status.HTTP_400_BAD_REQUEST,
                 )
-            elif member.status == "expired":
-                status_message = "Your membership has expired. Please renew."
-
-            # Check validity date
-            if member.valid_until and member.valid_until < timezone.now().date():
-                status_message = "Your membership has expired. Please renew."
 
-            # Serialize member profile
-            profile_serializer = MemberProfileSerializer(member)
+            proposal_no = serializer.validated_data["proposalNo"]
+            birth_year = serializer.validated_data["birthYear"]
 
-            logger.info(
-                f"Member login successful: {proposal_no} - {member.name_english}"
-            )
+            logger.info(f"Member login attempt: {proposal_no}")
 
-            response_data = {
-                "success": True,
-                "message": "Login successful",
-                "data": {
-                    "member": profile_serializer.data,
-                    # Add status message if applicable
-                    "statusMessage": status_message,
-                },
-            }
+            member = await aget_login_record(proposal_no)
+            payload, status_code = evaluate_login(proposal_no, birth_year, member)
 
-            return Response(response_data, status=status.HTTP_200_OK)
+            return JsonResponse(payload, status=status_code)
 
         except Exception as e:
             logger.error(f"Member login error: {str(e)}")
-            return Response(
+            return JsonResponse(
                 {"success": False, "message": "Server error. Please try again later."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
 
-class MembershipApplicationViewSet(viewsets.ModelViewSet):
+class MembershipApplicationViewSet(
+    ProjectedListMixin, SpooledUploadMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for membership application CRUD operations
     Handles multipart/form-data with files and nested data
+    Uploaded files are spooled to disk while parsing, never held in memory
     """
 
     queryset = MembershipApplication.objects.prefetch_related(
         "nominees", "medical_records_files"
     ).all()
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    # JSON (per JSON_BACKEND), multipart and form bodies
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    pagination_class = MembershipApplicationPagination
+    # Cursor pages of the list are read as .values() rows
+    list_projection = ReadOnlyProjection(MembershipApplicationListSerializer)
+    ordering_fields = ["created_at"]
+
+    def get_queryset(self):
+        """The list serializer has no nested data, so skip the prefetches"""
+        if self.action == "list":
+            return MembershipApplication.objects.all()
+        return super().get_queryset()
 
     def get_serializer_class(self):
         """Use different serializers for list and detail views"""
@@ -198,152 +230,21 @@ class MembershipApplicationViewSet(viewsets.ModelViewSet):
             logger.info("Received membership application submission")
             logger.info("Request data keys: %s", list(request.data.keys()))
             logger.info("Request FILES keys: %s", list(request.FILES.keys()))
-            # Parse nominees from FormData array format
-            nominees_data = []
-            i = 0
-            while True:
-                name_key = f"nominees[{i}]name"
-                if name_key not in request.data:
-                    break
-
-                relation = request.data.get(f"nominees[{i}]relation", "")
-
-                # Map relation to relationship (normalize)
-                relation_mapping = {
-                    "son": "child",
-                    "daughter": "child",
-                    "wife": "spouse",
-                    "husband": "spouse",
-                    "father": "father",
-                    "mother": "mother",
-                    "brother": "sibling",
-                    "sister": "sibling",
-                }
-                relationship = relation_mapping.get(relation.lower().strip(), "child")
-
-                nominee = {
-                    "name": request.data.get(f"nominees[{i}]name", ""),
-                    "relation": relation,
-                    "relationship": relationship,
-                    "share": int(request.data.get(f"nominees[{i}]share", 0)),
-                    "age": int(request.data.get(f"nominees[{i}]age", 0)),
-                }
-
-                # Handle nominee photo (only add if file exists)
-                photo_key = f"nominees[{i}]photo"
-                if photo_key in request.FILES:
-                    nominee["photo"] = request.FILES[photo_key]
-
-                # Handle nominee ID proof (only add if file exists)
-                id_proof_key = f"nomineeIdProof[{i}]"
-                if id_proof_key in request.FILES:
-                    nominee["id_proof"] = request.FILES[id_proof_key]
-
-                nominees_data.append(nominee)
-                i += 1
+            # Split FormData into fields, nominees and files in one pass
+            data, nominees_data, medical_records = self._split_submission(
+                request.data, request.FILES
+            )
 
             logger.debug(f"Parsed {len(nominees_data)} nominees")
 
-            # Prepare data for serializer - filter out empty values
-            data = {}
-            for key, value in request.data.items():
-                # Skip nominee-related keys as they're already parsed
-                if key.startswith("nominees[") or key.startswith("nomineeIdProof["):
-                    continue
-                # Skip empty values
-                if value != "" and value is not None:
-                    data[key] = value
-
             # Add parsed nominees
             if nominees_data:
                 data["nominees"] = nominees_data
 
             # Handle medical records (multiple files)
-            medical_records = []
-            for key in request.FILES:
-                if key.startswith("medicalRecords"):
-                    medical_records.append(request.FILES[key])
             if medical_records:
                 data["medical_records"] = medical_records
 
-            # Handle age proof as JSON array
-            import json
-
-            if "ageProof" in data:
-                if isinstance(data["ageProof"], str):
-                    try:
-                        # Try to parse as JSON first
-                        parsed = json.loads(data["ageProof"])
-                        # Ensure it's a list
-                        data["age_proof"] = (
-                            parsed if isinstance(parsed, list) else [parsed]
-                        )
-                    except (json.JSONDecodeError, ValueError):
-                        # If not valid JSON, treat as single string value
-                        data["age_proof"] = [data["ageProof"]]
-                elif isinstance(data["ageProof"], list):
-                    data["age_proof"] = data["ageProof"]
-                else:
-                    data["age_proof"] = [str(data["ageProof"])]
-                # Remove the old key
-                data.pop("ageProof", None)
-
-            # Map frontend field names to backend
-            field_mapping = {
-                "proposalNo": "proposal_no",
-                "foCode": "fo_code",
-                "foName": "fo_name",
-                "membershipType": "membership_type",
-                "nameBangla": "name_bangla",
-                "nameEnglish": "name_english",
-                "fatherName": "father_name",
-                "motherName": "mother_name",
-                "spouseName": "spouse_name",
-                "ageProofDoc": "age_proof_doc",
-                "drivingLicense": "driving_license",
-                "licenseDoc": "license_doc",
-                "maritalStatus": "marital_status",
-                "professionalQualifications": "professional_qualifications",
-                "organizationDetails": "organization_details",
-                "dailyWork": "daily_work",
-                "annualIncome": "annual_income",
-                "monthlyIncome": "monthly_income",
-                "incomeSource": "income_source",
-                "presentAddress": "present_address",
-                "permanentAddress": "permanent_address",
-                "bloodGroup": "blood_group",
-                "surgeryDetails": "surgery_details",
-                "acceptTerms": "accept_terms",
-            }
-
-            for old_key, new_key in field_mapping.items():
-                if old_key in data:
-                    data[new_key] = data.pop(old_key)
-
-            # Map membership_type from frontend to backend choices
-            if "membership_type" in data:
-                membership_mapping = {
-                    "silver": "individual",
-                    "bronze": "individual",
-                    "gold": "family",
-                    "executive": "corporate",
-                }
-                data["membership_type"] = membership_mapping.get(
-                    data["membership_type"].lower(), data["membership_type"]
-                )
-
-            # Map marital_status from frontend to backend choices
-            if "marital_status" in data:
-                marital_mapping = {
-                    "unmarried": "single",
-                    "married": "married",
-                    "divorced": "divorced",
-                    "others": "widowed",
-                }
-                data["marital_status"] = marital_mapping.get(
-                    data["marital_status"].lower(), data["marital_status"]
-                )
-
             # Convert annual income to monthly if provided
             if "annual_income" in data:
                 try:
@@ -353,11 +254,6 @@ class MembershipApplicationViewSet(viewsets.ModelViewSet):
                 except (ValueError, TypeError):
                     pass
 
-            # Handle file uploads
-            for file_field in ["photo", "age_proof_doc", "license_doc"]:
-                if file_field in request.FILES:
-                    data[file_field] = request.FILES[file_field]
-
             # Serialize and validate
             serializer = self.get_serializer(data=data)
 
@@ -370,6 +266,10 @@ class MembershipApplicationViewSet(viewsets.ModelViewSet):
 
             if serializer.is_valid():
                 application = serializer.save()
+                send_application_confirmation.enqueue(
+                    str(application.id),
+                    idempotency_key=f"application-confirmation:{application.id}",
+                )
 
                 logger.info(
                     f"New membership application submitted: {application.proposal_no} "
@@ -411,13 +311,78 @@ class MembershipApplicationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    def _split_submission(self, request_data, files):
+        """
+        Walk the flat FormData payload once and split it into application
+        fields (mapped through ``APPLICATION_FIELDS``), nominee rows
+        (``nominees[i]field`` / ``nomineeIdProof[i]``) and medical record
+        files (``medicalRecords*``)
+        """
+        data = {}
+        nominee_fields = {}
+        medical_records = []
+
+        for key, value in request_data.items():
+            if key.startswith("medicalRecords") and key in files:
+                medical_records.append(value)
+                continue
+
+            if key.startswith("nominees["):
+                match = NOMINEE_FIELD_PATTERN.match(key)
+                if match and (match[2] != "photo" or key in files):
+                    nominee_fields.setdefault(int(match[1]), {})[match[2]] = value
+                continue
+
+            if key.startswith("nomineeIdProof["):
+                match = NOMINEE_ID_PROOF_PATTERN.match(key)
+                if match and key in files:
+                    nominee_fields.setdefault(int(match[1]), {})["id_proof"] = value
+                continue
+
+            # Rename, normalize and drop empty values as we go
+            APPLICATION_FIELDS.add(data, key, value, files)
+
+        # Nominees are indexed from 0; stop at the first index without a name
+        nominees = []
+        while "name" in nominee_fields.get(len(nominees), {}):
+            fields = nominee_fields[len(nominees)]
+            relation = fields.get("relation", "")
+            nominee = {
+                "name": fields["name"],
+                "relation": relation,
+                "relationship": RELATIONSHIPS(relation),
+                "share": int(fields.get("share", 0)),
+                "age": int(fields.get("age", 0)),
+            }
+            for file_field in ("photo", "id_proof"):
+                if file_field in fields:
+                    nominee[file_field] = fields[file_field]
+            nominees.append(nominee)
+
+        return data, nominees, medical_records
+
     def retrieve(self, request, *args, **kwargs):
-        """Get application details"""
+        """
+        Get application details
+        Revalidated with ETag/Last-Modified; a current copy gets a 304
+        """
         try:
+            if is_conditional(request):
+                lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+                version = stored_version(
+                    self.get_queryset().filter(**{self.lookup_field: lookup})
+                )
+                if response := not_modified(request, version, **DETAIL_CACHE_CONTROL):
+                    return response
+
             instance = self.get_object()
             serializer = self.get_serializer(instance)
 
-            return Response({"success": True, "data": serializer.data})
+            return add_validators(
+                Response({"success": True, "data": serializer.data}),
+                instance_version(instance),
+                **DETAIL_CACHE_CONTROL,
+            )
         except Exception as e:
             return Response(
                 {
@@ -428,9 +393,35 @@ class MembershipApplicationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-    def list(self, request, *args, **kwargs):
-        """List all applications"""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream all applications (optionally ?status=) as CSV or XLSX
+        GET /api/v1/membership/applications/export/?output=csv|xlsx
+        """
+        export_format = request.query_params.get("output", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"success": False, "message": "Export format must be csv or xlsx"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        return Response({"success": True, "data": serializer.data})
+        queryset = MembershipApplication.objects.all()
+        status_filter = request.query_params.get("status")
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+
+        return export_response(
+            export_format,
+            f"membership-applications-{timezone.localdate():%Y%m%d}",
+            export_header(),
+            export_rows(queryset),
+        )
+
+    @action(detail=False, methods=["get"])
+    def statistics(self, request):
+        """
+        Application counts by status, membership type, month and FO code
+        GET /api/v1/membership/applications/statistics/
+        """
+        return Response({"success": True, "data": get_statistics()})
@@ -1,7 +1,13 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
 from django.utils.html import format_html
 
-from .models import PaymentProof
+from apps.core.renditions import rendition_url
+
+from .events import publish_status
+from .models import PaymentDailySummary, PaymentProof
+from .reports import rebuild_summaries
 
 
 @admin.register(PaymentProof)
@@ -109,21 +115,44 @@ class PaymentProofAdmin(admin.ModelAdmin):
     has_screenshot.short_description = "Screenshot"
 
     def screenshot_preview(self, obj):
-        """Display screenshot preview"""
+        """Display screenshot thumbnail linking to the full file"""
         if obj.screenshot:
+            if thumbnail := rendition_url(obj.screenshot):
+                return format_html(
+                    '<a href="{}" target="_blank"><img src="{}" style="max-width: 300px; max-height: 300px;" /></a>',
+                    obj.screenshot.url,
+                    thumbnail,
+                )
+            # PDFs have no thumbnail
             return format_html(
-                '<a href="{}" target="_blank"><img src="{}" style="max-width: 300px; max-height: 300px;" /></a>',
-                obj.screenshot.url,
-                obj.screenshot.url,
+                '<a href="{}" target="_blank">View screenshot</a>', obj.screenshot.url
             )
         return "-"
 
     screenshot_preview.short_description = "Screenshot Preview"
 
+    def update_payments(self, queryset, **values):
+        """
+        QuerySet.update() skips the signals that maintain the daily report
+        summaries, so rebuild the summaries of the affected days afterwards.
+        ``updated_at`` is set explicitly so status ETags change, and the new
+        statuses are pushed to waiting payers as verify()/reject() would.
+        """
+        rows = list(queryset.values_list("pk", "submitted_at"))
+        days = {timezone.localtime(submitted_at).date() for _, submitted_at in rows}
+        updated = queryset.update(updated_at=timezone.now(), **values)
+        transaction.on_commit(lambda: rebuild_summaries(days))
+        for payment_proof in PaymentProof.objects.filter(pk__in=[pk for pk, _ in rows]):
+            publish_status(payment_proof)
+        return updated
+
     def verify_payments(self, request, queryset):
         """Bulk verify payments"""
-        updated = queryset.filter(status="pending").update(
-            status="verified", verified_by=request.user
+        updated = self.update_payments(
+            queryset.filter(status="pending"),
+            status="verified",
+            verified_by=request.user,
+            verified_at=timezone.now(),
         )
         self.message_user(request, f"{updated} payment(s) verified successfully.")
 
@@ -131,7 +160,7 @@ class PaymentProofAdmin(admin.ModelAdmin):
 
     def mark_pending(self, request, queryset):
         """Mark as pending"""
-        updated = queryset.update(status="pending")
+        updated = self.update_payments(queryset, status="pending")
         self.message_user(request, f"{updated} payment(s) marked as pending.")
 
     mark_pending.short_description = "Mark as pending"
@@ -141,3 +170,20 @@ class PaymentProofAdmin(admin.ModelAdmin):
         if change and obj.status == "verified" and not obj.verified_by:
             obj.verified_by = request.user
         super().save_model(request, obj, form, change)
+        if change and "status" in form.changed_data:
+            publish_status(obj)
+
+
+@admin.register(PaymentDailySummary)
+class PaymentDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ["day", "payment_method", "status", "count", "amount"]
+    list_filter = ["payment_method", "status"]
+    date_hierarchy = "day"
+    readonly_fields = [
+        "day",
+        "payment_method",
+        "status",
+        "count",
+        "amount",
+        "lag_histogram",
+    ]
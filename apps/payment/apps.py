@@ -5,3 +5,6 @@ class PaymentConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.payment"
     verbose_name = "Payment Management"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,86 @@
+"""
+Payment status push.
+
+``PaymentProof.verify``/``reject`` and the admin bulk actions publish the
+public status payload of a payment proof on its channel once the change is
+committed. ``PaymentProofEventsView`` relays the channel to the waiting
+payer as Server-Sent Events, so payers stop polling the status endpoint.
+"""
+
+import asyncio
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.core.http import SSE_KEEPALIVE, sse_message
+from apps.core.pubsub import get_broker
+
+# Statuses after which a proof no longer changes
+FINAL_STATUSES = {"verified", "rejected"}
+
+
+def status_channel(transaction_id):
+    return f"payment-status:{transaction_id}"
+
+
+def build_status_payload(payment_proof):
+    """Public status fields for a payment proof"""
+    return {
+        "id": str(payment_proof.id),
+        "transactionId": payment_proof.transaction_id,
+        "paymentMethod": payment_proof.payment_method,
+        "amount": str(payment_proof.amount),
+        "payerName": payment_proof.payer_name,
+        "status": payment_proof.status,
+        "submittedAt": payment_proof.submitted_at.isoformat(),
+        "verifiedAt": (
+            payment_proof.verified_at.isoformat() if payment_proof.verified_at else None
+        ),
+        "rejectionReason": (
+            payment_proof.rejection_reason
+            if payment_proof.status == "rejected"
+            else None
+        ),
+    }
+
+
+def publish_status(payment_proof):
+    """
+    Publish the current status of ``payment_proof`` once the transaction
+    commits. A broker failure is logged, not raised: payers still get the
+    change on their next (re)connect or poll.
+    """
+    channel = status_channel(payment_proof.transaction_id)
+    payload = build_status_payload(payment_proof)
+    transaction.on_commit(lambda: get_broker().publish(channel, payload), robust=True)
+
+
+async def status_events(payload, subscription):
+    """
+    Server-Sent Events stream of the status ``payload`` followed by the
+    changes arriving on ``subscription``, which it closes when done.
+
+    The stream ends at a final status or after PAYMENT_EVENTS_TIMEOUT
+    seconds (EventSource then reconnects); idle periods are filled with a
+    comment every PAYMENT_EVENTS_KEEPALIVE seconds so proxies keep the
+    connection open. Event ids are the status, sent back as Last-Event-ID
+    on reconnect.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.PAYMENT_EVENTS_TIMEOUT
+    try:
+        yield sse_message(payload, event="status", id=payload["status"])
+        while payload["status"] not in FINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            message = await subscription.get(
+                timeout=min(settings.PAYMENT_EVENTS_KEEPALIVE, remaining)
+            )
+            if message is None:
+                yield SSE_KEEPALIVE
+            elif message != payload:
+                payload = message
+                yield sse_message(payload, event="status", id=payload["status"])
+    finally:
+        await subscription.close()
@@ -0,0 +1,37 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.payment.reports import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Rebuild payment daily summaries from the payment proofs table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--day",
+            action="append",
+            dest="days",
+            help="Only rebuild this day (YYYY-MM-DD); may be repeated",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report wrong rows without fixing them",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            days = [date.fromisoformat(day) for day in options["days"] or []]
+        except ValueError:
+            raise CommandError("Days must be YYYY-MM-DD")
+
+        changes = rebuild_summaries(days or None, dry_run=options["dry_run"])
+        for (day, payment_method, status), stored, actual in changes:
+            self.stdout.write(
+                f"{day} {payment_method}/{status}: "
+                f"{stored[0]} ({stored[1]}) -> {actual[0]} ({actual[1]})"
+            )
+        verb = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(f"{verb} {len(changes)} wrong summary row(s)")
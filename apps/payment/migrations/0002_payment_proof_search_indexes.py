@@ -0,0 +1,39 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TRIGRAM_INDEXES = {
+    "payment_pay_txn_trgm_idx": "transaction_id",
+    "payment_pay_payer_trgm_idx": "payer_name",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """pg_trgm GIN indexes for admin search (PostgreSQL only)"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = apps.get_model("payment", "PaymentProof")._meta.db_table
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {schema_editor.quote_name(name)} "
+            f"ON {schema_editor.quote_name(table)} "
+            f"USING gin ({schema_editor.quote_name(column)} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(name)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0001_initial"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
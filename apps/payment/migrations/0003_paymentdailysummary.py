@@ -0,0 +1,114 @@
+# Generated by Django 5.0.14 on 2026-10-16 23:04
+
+from bisect import bisect_left
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# Frozen copy of apps.payment.reports.LAG_BUCKET_BOUNDS
+LAG_BUCKET_BOUNDS = [
+    60,
+    300,
+    900,
+    1800,
+    3600,
+    7200,
+    14400,
+    28800,
+    43200,
+    86400,
+    172800,
+    259200,
+    604800,
+    1209600,
+    2592000,
+]
+
+
+def build_summaries(apps, schema_editor):
+    """Summarize existing payment proofs into daily rows"""
+    PaymentProof = apps.get_model("payment", "PaymentProof")
+    PaymentDailySummary = apps.get_model("payment", "PaymentDailySummary")
+    summaries = {}
+    rows = (
+        PaymentProof.objects.annotate(day=TruncDate("submitted_at"))
+        .values("day", "payment_method", "status")
+        .annotate(total=Count("pk"), total_amount=Sum("amount"))
+        .order_by()
+    )
+    for row in rows:
+        summaries[(row["day"], row["payment_method"], row["status"])] = (
+            PaymentDailySummary(
+                day=row["day"],
+                payment_method=row["payment_method"],
+                status=row["status"],
+                count=row["total"],
+                amount=row["total_amount"],
+                lag_histogram=[0] * (len(LAG_BUCKET_BOUNDS) + 1),
+            )
+        )
+
+    verified = PaymentProof.objects.filter(
+        status="verified", verified_at__isnull=False
+    ).values_list("submitted_at", "verified_at", "payment_method")
+    for submitted_at, verified_at, payment_method in verified.iterator():
+        key = (timezone.localtime(submitted_at).date(), payment_method, "verified")
+        lag = max((verified_at - submitted_at).total_seconds(), 0)
+        summaries[key].lag_histogram[bisect_left(LAG_BUCKET_BOUNDS, lag)] += 1
+
+    PaymentDailySummary.objects.bulk_create(summaries.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payment", "0002_payment_proof_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PaymentDailySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("payment_method", models.CharField(max_length=20)),
+                ("status", models.CharField(max_length=20)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "lag_histogram",
+                    models.JSONField(
+                        blank=True,
+                        default=list,
+                        help_text="Verified payments per verification lag bucket",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Payment Daily Summary",
+                "verbose_name_plural": "Payment Daily Summaries",
+                "ordering": ["-day", "payment_method", "status"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="paymentdailysummary",
+            constraint=models.UniqueConstraint(
+                fields=("day", "payment_method", "status"),
+                name="payment_daily_summary_bucket",
+            ),
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,8 @@ from django.core.validators import FileExtensionValidator, MinValueValidator
 from django.db import models
 from django.utils import timezone
 
+from .events import publish_status
+
 
 class PaymentProof(models.Model):
     """Model for storing payment proof submissions"""
@@ -109,6 +111,7 @@ class PaymentProof(models.Model):
         self.verified_at = timezone.now()
         self.verified_by = user
         self.save()
+        publish_status(self)
 
     def reject(self, reason, user=None):
         """Mark payment as rejected"""
@@ -117,3 +120,37 @@ class PaymentProof(models.Model):
         self.verified_by = user
         self.verified_at = timezone.now()
         self.save()
+        publish_status(self)
+
+
+class PaymentDailySummary(models.Model):
+    """
+    Count, amount and verification lag histogram of the payment proofs
+    submitted on one day with one payment method and status. Maintained
+    incrementally (see ``reports.py``) so reports never scan payment proofs.
+    """
+
+    day = models.DateField()
+    payment_method = models.CharField(max_length=20)
+    status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    lag_histogram = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Verified payments per verification lag bucket",
+    )
+
+    class Meta:
+        ordering = ["-day", "payment_method", "status"]
+        verbose_name = "Payment Daily Summary"
+        verbose_name_plural = "Payment Daily Summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "payment_method", "status"],
+                name="payment_daily_summary_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.payment_method}/{self.status}: {self.count}"
@@ -0,0 +1,258 @@
+"""
+Payment reporting backed by the ``PaymentDailySummary`` rollup table.
+
+Each payment proof is counted in one summary row: the day it was submitted,
+its payment method and its status. The row holds the count and amount of
+those payments and, for verified ones, a histogram of verification lag
+(``verified_at - submitted_at``) over ``LAG_BUCKET_BOUNDS``. Signals (see
+``signals.py``) move a payment between rows after its transaction commits,
+so finance reports read one row per day, method and status and never scan
+``payment_proof``. Lag percentiles are read off the merged histogram and
+are therefore reported as the upper bound of their bucket.
+
+``rebuild_summaries`` recomputes rows from the payments table, for given
+days after a bulk ``QuerySet.update()`` or for everything from
+``manage.py reconcile_payment_reports``.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PaymentDailySummary, PaymentProof
+
+# Upper bounds (seconds) of the verification lag histogram buckets; one
+# more bucket counts everything slower than the last bound
+LAG_BUCKET_BOUNDS = [
+    60,
+    5 * 60,
+    15 * 60,
+    30 * 60,
+    60 * 60,
+    2 * 3600,
+    4 * 3600,
+    8 * 3600,
+    12 * 3600,
+    24 * 3600,
+    2 * 86400,
+    3 * 86400,
+    7 * 86400,
+    14 * 86400,
+    30 * 86400,
+]
+LAG_PERCENTILES = (50, 90, 99)
+
+CONTRIBUTION_FIELDS = (
+    "submitted_at",
+    "payment_method",
+    "status",
+    "amount",
+    "verified_at",
+)
+
+
+def lag_bucket(submitted_at, verified_at):
+    """Histogram bucket index of a verification lag"""
+    lag = (verified_at - submitted_at).total_seconds()
+    return bisect_left(LAG_BUCKET_BOUNDS, max(lag, 0))
+
+
+def payment_contribution(submitted_at, payment_method, status, amount, verified_at):
+    """``(row key, amount, lag bucket or None)`` a payment adds to the rollups"""
+    key = (timezone.localtime(submitted_at).date(), payment_method, status)
+    lag = None
+    if status == "verified" and verified_at is not None:
+        lag = lag_bucket(submitted_at, verified_at)
+    return key, Decimal(amount), lag
+
+
+def instance_contribution(payment):
+    return payment_contribution(
+        *(getattr(payment, field) for field in CONTRIBUTION_FIELDS)
+    )
+
+
+def stored_contribution(pk):
+    """Contribution of the payment as currently saved, or None"""
+    row = (
+        PaymentProof._default_manager.filter(pk=pk).values(*CONTRIBUTION_FIELDS).first()
+    )
+    return payment_contribution(**row) if row else None
+
+
+def apply_contribution(contribution, sign):
+    """Add (``sign=1``) or remove (``sign=-1``) a payment from its row"""
+    (day, payment_method, status), amount, lag = contribution
+    summary, _ = PaymentDailySummary.objects.select_for_update().get_or_create(
+        day=day, payment_method=payment_method, status=status
+    )
+    summary.count += sign
+    summary.amount += sign * amount
+    if lag is not None:
+        histogram = padded_histogram(summary.lag_histogram)
+        histogram[lag] += sign
+        summary.lag_histogram = histogram
+    summary.save()
+
+
+def move_payment(old, new):
+    """
+    Replace contribution ``old`` with ``new`` once the current transaction
+    commits, keeping rollup rows unlocked during the submission itself.
+    """
+    if old == new:
+        return
+
+    def apply():
+        with transaction.atomic():
+            if old is not None:
+                apply_contribution(old, -1)
+            if new is not None:
+                apply_contribution(new, 1)
+
+    transaction.on_commit(apply)
+
+
+def padded_histogram(histogram):
+    histogram = list(histogram or [])
+    return histogram + [0] * (len(LAG_BUCKET_BOUNDS) + 1 - len(histogram))
+
+
+def lag_percentiles(histogram):
+    """Percentiles (upper bucket bound in seconds, None if slower) of a histogram"""
+    total = sum(histogram)
+    percentiles = {"count": total}
+    for percentile in LAG_PERCENTILES:
+        value = None
+        if total:
+            rank = total * percentile / 100
+            seen = 0
+            for index, count in enumerate(histogram):
+                seen += count
+                if seen >= rank:
+                    if index < len(LAG_BUCKET_BOUNDS):
+                        value = LAG_BUCKET_BOUNDS[index]
+                    break
+        percentiles[f"p{percentile}"] = value
+    return percentiles
+
+
+def payment_report(start, end):
+    """Totals, breakdowns, daily rows and verification lag for ``start..end``"""
+    rows = PaymentDailySummary.objects.filter(day__gte=start, day__lte=end).order_by(
+        "day", "payment_method", "status"
+    )
+
+    def bucket():
+        return {"count": 0, "amount": Decimal("0")}
+
+    totals = bucket()
+    by_method = defaultdict(bucket)
+    by_status = defaultdict(bucket)
+    daily = []
+    histogram = padded_histogram(None)
+    for row in rows:
+        if not row.count:
+            continue
+        for target in (totals, by_method[row.payment_method], by_status[row.status]):
+            target["count"] += row.count
+            target["amount"] += row.amount
+        for index, count in enumerate(padded_histogram(row.lag_histogram)):
+            histogram[index] += count
+        daily.append(
+            {
+                "day": row.day.isoformat(),
+                "paymentMethod": row.payment_method,
+                "status": row.status,
+                "count": row.count,
+                "amount": str(row.amount),
+            }
+        )
+
+    def render(values):
+        return {"count": values["count"], "amount": str(values["amount"])}
+
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "totals": render(totals),
+        "byMethod": {key: render(value) for key, value in sorted(by_method.items())},
+        "byStatus": {key: render(value) for key, value in sorted(by_status.items())},
+        "verificationLag": lag_percentiles(histogram),
+        "daily": daily,
+    }
+
+
+def day_range(day):
+    """``[start, end)`` datetimes of a local calendar day"""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def rebuild_summaries(days=None, dry_run=False):
+    """
+    Recompute summary rows from the payments table, for ``days`` or every
+    day. Returns ``(row key, stored, actual)`` for each row that was wrong,
+    where stored and actual are ``(count, amount, histogram)``.
+    """
+    payments = PaymentProof._default_manager.all()
+    summaries = PaymentDailySummary.objects.all()
+    if days is not None:
+        days = sorted(set(days))
+        if not days:
+            return []
+        submitted = Q()
+        for day in days:
+            start, end = day_range(day)
+            submitted |= Q(submitted_at__gte=start, submitted_at__lt=end)
+        payments = payments.filter(submitted)
+        summaries = summaries.filter(day__in=days)
+
+    with transaction.atomic():
+        stored = {
+            (row.day, row.payment_method, row.status): row
+            for row in summaries.select_for_update()
+        }
+        actual = defaultdict(lambda: [0, Decimal("0"), padded_histogram(None)])
+        for values in payments.values(*CONTRIBUTION_FIELDS).iterator():
+            key, amount, lag = payment_contribution(**values)
+            actual[key][0] += 1
+            actual[key][1] += amount
+            if lag is not None:
+                actual[key][2][lag] += 1
+
+        empty = (0, Decimal("0"), padded_histogram(None))
+        changes = []
+        for key in sorted(set(stored) | set(actual), key=str):
+            row = stored.get(key)
+            was = (
+                (row.count, row.amount, padded_histogram(row.lag_histogram))
+                if row
+                else empty
+            )
+            now = tuple(actual[key]) if key in actual else empty
+            if was == now:
+                continue
+            changes.append((key, was, now))
+            if dry_run:
+                continue
+            if not now[0]:
+                row.delete()
+            elif row is None:
+                PaymentDailySummary.objects.create(
+                    day=key[0],
+                    payment_method=key[1],
+                    status=key[2],
+                    count=now[0],
+                    amount=now[1],
+                    lag_histogram=now[2],
+                )
+            else:
+                row.count, row.amount, row.lag_histogram = now
+                row.save()
+    return changes
@@ -0,0 +1,67 @@
+"""
+Search over payment proofs for the admin verification queue.
+
+On PostgreSQL, ``transaction_id`` and ``payer_name`` carry pg_trgm GIN
+indexes (migration 0002), so substring matches use an index instead of a
+sequential scan, payer names also match with small typos, and results are
+ranked by trigram similarity. Other databases (SQLite test runs) fall back
+to ``icontains`` with a simple exact/prefix/substring rank.
+
+Results are paged by ``search_bucket``, the rank rounded to two decimals
+as an integer, so the cursor compares exact values rather than floats.
+"""
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Cast, Greatest, Round
+
+SEARCH_RANK = "search_rank"
+SEARCH_BUCKET = "search_bucket"
+
+
+def with_bucket(queryset):
+    return queryset.annotate(
+        **{SEARCH_BUCKET: Cast(Round(F(SEARCH_RANK) * 100), IntegerField())}
+    )
+
+
+def search_payment_proofs(queryset, term):
+    """Filter ``queryset`` to proofs matching ``term``, annotated with a rank"""
+    term = term.strip()
+    if not term:
+        return queryset
+
+    matches = Q(transaction_id__icontains=term) | Q(payer_name__icontains=term)
+
+    if connections[queryset.db].vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        ranked = queryset.filter(
+            matches | Q(payer_name__trigram_similar=term)
+        ).annotate(
+            **{
+                SEARCH_RANK: Greatest(
+                    Case(
+                        When(transaction_id__iexact=term, then=Value(1.0)),
+                        default=TrigramSimilarity("transaction_id", term),
+                        output_field=FloatField(),
+                    ),
+                    TrigramSimilarity("payer_name", term),
+                )
+            }
+        )
+        return with_bucket(ranked)
+
+    ranked = queryset.filter(matches).annotate(
+        **{
+            SEARCH_RANK: Case(
+                When(transaction_id__iexact=term, then=Value(1.0)),
+                When(transaction_id__istartswith=term, then=Value(0.75)),
+                When(payer_name__iexact=term, then=Value(0.75)),
+                When(payer_name__istartswith=term, then=Value(0.5)),
+                default=Value(0.25),
+                output_field=FloatField(),
+            )
+        }
+    )
+    return with_bucket(ranked)
@@ -2,12 +2,20 @@ import re
 
 from rest_framework import serializers
 
+from apps.core.images import validate_image_upload
+from apps.core.serializers import DirectUploadField, RenditionField
+
 from .models import PaymentProof
 
 
 class PaymentProofSerializer(serializers.ModelSerializer):
     """Serializer for payment proof submission"""
 
+    # Token from a direct-to-storage upload, accepted in place of the file
+    screenshot_upload = DirectUploadField(
+        "payment-screenshot", source="screenshot", required=False
+    )
+
     class Meta:
         model = PaymentProof
         fields = [
@@ -18,6 +26,7 @@ class PaymentProofSerializer(serializers.ModelSerializer):
             "payer_name",
             "payer_contact",
             "screenshot",
+            "screenshot_upload",
             "notes",
             "status",
             "submitted_at",
@@ -68,6 +77,8 @@ class PaymentProofSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(
                     "Only JPEG, PNG, and PDF files are allowed"
                 )
+            if value.content_type != "application/pdf":
+                validate_image_upload(value)
 
         return value
 
@@ -83,6 +94,8 @@ class PaymentProofSerializer(serializers.ModelSerializer):
 class PaymentProofListSerializer(serializers.ModelSerializer):
     """Simplified serializer for list view"""
 
+    screenshot_thumbnail = RenditionField(source="screenshot")
+
     class Meta:
         model = PaymentProof
         fields = [
@@ -93,6 +106,7 @@ class PaymentProofListSerializer(serializers.ModelSerializer):
             "payer_name",
             "status",
             "submitted_at",
+            "screenshot_thumbnail",
         ]
 
 
@@ -102,6 +116,7 @@ class PaymentProofAdminSerializer(serializers.ModelSerializer):
     verified_by_username = serializers.CharField(
         source="verified_by.username", read_only=True, allow_null=True
     )
+    screenshot_thumbnail = RenditionField(source="screenshot")
 
     class Meta:
         model = PaymentProof
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.core.cache import CacheNamespace
+from apps.core.images import queue_image_processing
+
+from .models import PaymentProof
+from .reports import (
+    CONTRIBUTION_FIELDS,
+    instance_contribution,
+    move_payment,
+    stored_contribution,
+)
+
+# Cached list totals for the admin payment proof list
+payment_proof_counts = CacheNamespace("payment-proof-count")
+
+
+@receiver(post_save, sender=PaymentProof)
+@receiver(post_delete, sender=PaymentProof)
+def invalidate_payment_proof_counts(sender, instance, **kwargs):
+    """Any submission or status change makes cached totals stale"""
+    payment_proof_counts.invalidate()
+
+
+@receiver(post_save, sender=PaymentProof)
+def process_screenshot(sender, instance, created, **kwargs):
+    """Normalize a newly uploaded screenshot in the background"""
+    if created:
+        queue_image_processing(instance, "screenshot")
+
+
+@receiver(pre_save, sender=PaymentProof)
+def remember_report_contribution(sender, instance, raw, update_fields, **kwargs):
+    """Note what the payment adds to the daily summaries before an update"""
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(CONTRIBUTION_FIELDS):
+        return
+    instance._report_contribution = stored_contribution(instance.pk)
+
+
+@receiver(post_save, sender=PaymentProof)
+def update_daily_summaries(sender, instance, created, raw, **kwargs):
+    """Move the payment to its new daily summary row"""
+    if raw:
+        return
+    if created:
+        move_payment(None, instance_contribution(instance))
+    elif "_report_contribution" in instance.__dict__:
+        old = instance.__dict__.pop("_report_contribution")
+        move_payment(old, instance_contribution(instance))
+
+
+@receiver(post_delete, sender=PaymentProof)
+def remove_from_daily_summaries(sender, instance, **kwargs):
+    move_payment(instance_contribution(instance), None)
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.core.mail import send_mail
+
+from apps.core.tasks import task
+
+from .models import PaymentProof
+
+
+def payer_email(payment_proof):
+    """Payers have no email of their own; use the linked application's"""
+    application = payment_proof.membership_application
+    return application.email if application and application.email else None
+
+
+@task
+def notify_payment_submitted(payment_proof_id):
+    """Tell staff about a new payment proof and confirm receipt to the payer"""
+    payment_proof = PaymentProof.objects.select_related("membership_application").get(
+        pk=payment_proof_id
+    )
+
+    if settings.STAFF_NOTIFICATION_EMAILS:
+        send_mail(
+            f"New payment proof - {payment_proof.transaction_id}",
+            f"""
+A new payment proof is waiting for verification.
+
+- Transaction ID: {payment_proof.transaction_id}
+- Payer: {payment_proof.payer_name} ({payment_proof.payer_contact})
+- Amount: {payment_proof.amount}
+- Method: {payment_proof.get_payment_method_display()}
+- Submitted: {payment_proof.submitted_at.strftime('%d %B %Y, %I:%M %p')}
+            """,
+            settings.DEFAULT_FROM_EMAIL,
+            settings.STAFF_NOTIFICATION_EMAILS,
+        )
+
+    if email := payer_email(payment_proof):
+        send_mail(
+            f"Payment Received - {payment_proof.transaction_id}",
+            f"""
+Dear {payment_proof.payer_name},
+
+We have received your payment proof of {payment_proof.amount} \
+(transaction {payment_proof.transaction_id}). It will be verified shortly.
+
+Best regards,
+BrightLife Bangladesh Team
+            """,
+            settings.DEFAULT_FROM_EMAIL,
+            [email],
+        )
+
+
+@task
+def notify_payment_status(payment_proof_id):
+    """Tell the payer their payment proof was verified or rejected"""
+    payment_proof = PaymentProof.objects.select_related("membership_application").get(
+        pk=payment_proof_id
+    )
+
+    email = payer_email(payment_proof)
+    if not email:
+        return
+
+    if payment_proof.status == "verified":
+        outcome = "has been verified. Thank you!"
+    elif payment_proof.status == "rejected":
+        outcome = f"was rejected: {payment_proof.rejection_reason}"
+    else:
+        return
+
+    send_mail(
+        f"Payment {payment_proof.get_status_display()} - "
+        f"{payment_proof.transaction_id}",
+        f"""
+Dear {payment_proof.payer_name},
+
+Your payment of {payment_proof.amount} (transaction \
+{payment_proof.transaction_id}) {outcome}
+
+For any queries, please contact us at support@brightlife-bd.com
+
+Best regards,
+BrightLife Bangladesh Team
+        """,
+        settings.DEFAULT_FROM_EMAIL,
+        [email],
+    )
@@ -1,9 +1,47 @@
+import asyncio
+import json
+import shutil
+import tempfile
+from datetime import timedelta
 from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.utils import timezone
 
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from asgiref.sync import sync_to_async
+from PIL import Image
+
+from apps.core.models import Rendition
+from apps.core.projections import ReadOnlyProjection
+from apps.core.pubsub import get_broker
+from apps.core.renderers import ORJSONRenderer
+from apps.core.tasks import run_pending
 
-from .models import PaymentProof
+from .admin import PaymentProofAdmin
+from .events import status_channel
+from .models import PaymentDailySummary, PaymentProof
+from .reports import payment_report, rebuild_summaries
+from .search import search_payment_proofs
+from .serializers import PaymentProofListSerializer
+from .views import PaymentProofEventsView, PaymentProofStatusAsyncView
 
 
 class PaymentProofModelTest(APITestCase):
@@ -55,6 +93,24 @@ class PaymentProofAPITest(APITestCase):
         self.assertTrue(response.data["success"])
         self.assertIn("transactionId", response.data["data"])
 
+    @override_settings(STAFF_NOTIFICATION_EMAILS=["staff@example.com"])
+    def test_submit_queues_staff_notification(self):
+        """Notification email is sent by the worker, not the request"""
+        data = {
+            "transaction_id": "NOTIFY1",
+            "payment_method": "bkash",
+            "amount": "2000.00",
+            "payer_name": "Notify Test",
+            "payer_contact": "01812345678",
+        }
+
+        self.client.post("/api/v1/payment/proof/", data, format="json")
+        self.assertEqual(len(mail.outbox), 0)
+
+        run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["staff@example.com"])
+
     def test_submit_invalid_payment(self):
         """Test submitting invalid payment proof"""
         data = {
@@ -90,3 +146,539 @@ class PaymentProofAPITest(APITestCase):
         response = self.client.get("/api/v1/payment/proof/NONEXISTENT/")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertFalse(response.data["success"])
+
+
+@override_settings(STATUS_POLL_MAX_AGE=5)
+class PaymentProofStatusConditionalTest(APITestCase):
+    """Status polls are answered with 304 while the proof is unchanged"""
+
+    def setUp(self):
+        self.payment = PaymentProof.objects.create(
+            transaction_id="POLL123",
+            payment_method="bkash",
+            amount=Decimal("5000.00"),
+            payer_name="Poll Test",
+            payer_contact="01912345678",
+        )
+        self.url = f"/api/v1/payment/proof/{self.payment.transaction_id}/"
+
+    def test_status_is_cacheable(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=5", response["Cache-Control"])
+
+    def test_current_copy_is_not_modified(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_status_change_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.payment.verify()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["status"], "verified")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_unknown_proof_with_etag_is_not_found(self):
+        response = self.client.get(
+            "/api/v1/payment/proof/NONEXISTENT/", HTTP_IF_NONE_MATCH='W/"x"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PaymentProofStatusAsyncTest(TestCase):
+    """Async-native status view served under ASGI"""
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    async def get_status(self, transaction_id):
+        request = self.factory.get(f"/api/v1/payment/proof/{transaction_id}/")
+        return await PaymentProofStatusAsyncView.as_view()(
+            request, transaction_id=transaction_id
+        )
+
+    async def test_get_payment_status(self):
+        await PaymentProof.objects.acreate(
+            transaction_id="ASYNC123",
+            payment_method="bkash",
+            amount=Decimal("5000.00"),
+            payer_name="Async Test",
+            payer_contact="01912345678",
+        )
+
+        response = await self.get_status("ASYNC123")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.content)
+        self.assertEqual(data["data"]["transactionId"], "ASYNC123")
+        self.assertEqual(data["data"]["status"], "pending")
+
+        request = self.factory.get(
+            "/api/v1/payment/proof/ASYNC123/",
+            headers={"If-None-Match": response["ETag"]},
+        )
+        response = await PaymentProofStatusAsyncView.as_view()(
+            request, transaction_id="ASYNC123"
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    async def test_get_nonexistent_payment(self):
+        response = await self.get_status("NONEXISTENT")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(json.loads(response.content)["success"])
+
+
+@override_settings(
+    PUBSUB_URL="memory://", PAYMENT_EVENTS_KEEPALIVE=5, PAYMENT_EVENTS_TIMEOUT=5
+)
+class PaymentProofEventsTest(TestCase):
+    """Status changes pushed to waiting payers as Server-Sent Events"""
+
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.payment = PaymentProof.objects.create(
+            transaction_id="SSE123",
+            payment_method="bkash",
+            amount=Decimal("5000.00"),
+            payer_name="Stream Test",
+            payer_contact="01912345678",
+        )
+
+    async def open_stream(self, transaction_id="SSE123", **headers):
+        request = self.factory.get(
+            f"/api/v1/payment/proof/{transaction_id}/events/", headers=headers
+        )
+        return await PaymentProofEventsView.as_view()(
+            request, transaction_id=transaction_id
+        )
+
+    async def next_chunk(self, stream):
+        return await asyncio.wait_for(stream.__anext__(), timeout=5)
+
+    def verify(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payment.verify()
+
+    async def test_pushes_status_change(self):
+        response = await self.open_stream()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        first = await self.next_chunk(stream)
+        self.assertTrue(first.startswith(b"event: status\nid: pending\n"))
+        self.assertIn(b'"status": "pending"', first)
+
+        await sync_to_async(self.verify)()
+
+        pushed = await self.next_chunk(stream)
+        self.assertIn(b"id: verified", pushed)
+        self.assertIn(b'"status": "verified"', pushed)
+        # A final status ends the stream and releases the subscription
+        with self.assertRaises(StopAsyncIteration):
+            await self.next_chunk(stream)
+        self.assertEqual(get_broker().publish(status_channel("SSE123"), {}), 0)
+
+    @override_settings(PAYMENT_EVENTS_KEEPALIVE=0.01, PAYMENT_EVENTS_TIMEOUT=0.05)
+    async def test_idle_stream_sends_keepalives_then_ends(self):
+        response = await self.open_stream()
+
+        chunks = [chunk async for chunk in response.streaming_content]
+
+        self.assertIn(b'"status": "pending"', chunks[0])
+        self.assertIn(b": keepalive\n\n", chunks[1:])
+
+    async def test_final_status_is_sent_once(self):
+        await sync_to_async(self.verify)()
+
+        response = await self.open_stream()
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 1)
+        self.assertIn(b'"status": "verified"', chunks[0])
+
+        # EventSource reconnects; 204 tells it to stop
+        response = await self.open_stream(**{"Last-Event-ID": "verified"})
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    async def test_unknown_proof(self):
+        response = await self.open_stream("NONEXISTENT")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(get_broker().publish(status_channel("NONEXISTENT"), {}), 0)
+
+    def test_admin_bulk_verify_publishes(self):
+        model_admin = PaymentProofAdmin(PaymentProof, admin.site)
+        request = mock.Mock(user=None)
+
+        with mock.patch.object(get_broker(), "publish") as publish:
+            with mock.patch.object(model_admin, "message_user"):
+                with self.captureOnCommitCallbacks(execute=True):
+                    model_admin.verify_payments(request, PaymentProof.objects.all())
+
+        channel, payload = publish.call_args.args
+        self.assertEqual(channel, status_channel("SSE123"))
+        self.assertEqual(payload["status"], "verified")
+
+
+@override_settings(PUBSUB_URL="memory://")
+class PaymentProofEventsConnectionTest(TransactionTestCase):
+    """An open status stream holds no database connection"""
+
+    async def test_connection_released_while_streaming(self):
+        await PaymentProof.objects.acreate(
+            transaction_id="SSE456",
+            payment_method="bkash",
+            amount=Decimal("5000.00"),
+            payer_name="Stream Test",
+            payer_contact="01912345678",
+        )
+        request = AsyncRequestFactory().get("/api/v1/payment/proof/SSE456/events/")
+        wrapper_class = type(connections["default"])
+        with mock.patch.object(
+            wrapper_class, "close", autospec=True, side_effect=wrapper_class.close
+        ) as close:
+            response = await PaymentProofEventsView.as_view()(
+                request, transaction_id="SSE456"
+            )
+            stream = aiter(response.streaming_content)
+            self.assertIn(b'"status": "pending"', await anext(stream))
+
+        close.assert_called_once()
+        if connection.vendor != "sqlite":
+            # In-memory SQLite test databases ignore close(). Checked on the
+            # thread the view's queries ran on.
+            held = await sync_to_async(lambda: connection.connection is not None)()
+            self.assertFalse(held)
+        await stream.aclose()
+
+
+class PaymentProofAdminListTest(APITestCase):
+    """Test cursor pagination of the admin payment proof list"""
+
+    def setUp(self):
+        cache.clear()
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        self.client.force_authenticate(admin)
+        for i in range(12):
+            PaymentProof.objects.create(
+                transaction_id=f"LIST{i:04d}",
+                payment_method="bkash",
+                amount=Decimal("100.00"),
+                payer_name=f"Payer {i}",
+                payer_contact="01712345678",
+                status="pending" if i % 2 else "verified",
+            )
+
+    def test_pages_and_count(self):
+        """Pages follow next links and carry the total count"""
+        url = "/api/v1/payment/admin/payment-proofs/?page_size=5"
+        seen = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data["success"])
+            self.assertEqual(response.data["count"], 12)
+            seen.extend(row["transaction_id"] for row in response.data["data"])
+            url = response.data["next"]
+
+        self.assertEqual(sorted(seen), [f"LIST{i:04d}" for i in range(12)])
+
+    def test_count_is_cached(self):
+        """Repeat page loads do not run COUNT again"""
+        url = "/api/v1/payment/admin/payment-proofs/?status=pending"
+        response = self.client.get(url)
+        self.assertEqual(response.data["count"], 6)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["data"]), 6)
+
+    def test_orjson_renderer_matches_stdlib(self):
+        response = self.client.get("/api/v1/payment/admin/payment-proofs/?page_size=20")
+
+        self.assertEqual(
+            ORJSONRenderer().render(response.data),
+            JSONRenderer().render(response.data),
+        )
+
+    def test_projection_matches_serializer(self):
+        PaymentProof.objects.filter(transaction_id="LIST0000").update(
+            screenshot="payment_screenshots/a.png"
+        )
+        represent_many = ReadOnlyProjection.represent_many
+        with (
+            mock.patch.object(
+                ReadOnlyProjection,
+                "represent_many",
+                autospec=True,
+                side_effect=represent_many,
+            ) as projected,
+            mock.patch.object(
+                PaymentProof, "from_db", side_effect=AssertionError("instance built")
+            ),
+        ):
+            response = self.client.get(
+                "/api/v1/payment/admin/payment-proofs/?page_size=20"
+            )
+        projected.assert_called_once()
+
+        expected = PaymentProofListSerializer(
+            PaymentProof.objects.order_by("-submitted_at", "id"),
+            many=True,
+            context={"request": APIRequestFactory().get("/")},
+        ).data
+        self.assertEqual(response.data["data"], expected)
+
+
+class PaymentProofSearchTest(APITestCase):
+    """Test ranked payment proof search"""
+
+    def setUp(self):
+        cache.clear()
+        for transaction_id, payer_name in [
+            ("TRX-ALPHA-0001", "Karim Ahmed"),
+            ("ALPHA", "Rahim Uddin"),
+            ("TRX-BETA-0002", "Alpha Traders"),
+            ("TRX-GAMMA-0003", "Nusrat Jahan"),
+        ]:
+            PaymentProof.objects.create(
+                transaction_id=transaction_id,
+                payment_method="bkash",
+                amount=Decimal("100.00"),
+                payer_name=payer_name,
+                payer_contact="01712345678",
+            )
+
+    def test_exact_transaction_id_ranks_first(self):
+        results = search_payment_proofs(PaymentProof.objects.all(), "alpha")
+        ordered = results.order_by("-search_rank", "-submitted_at")
+
+        self.assertEqual(
+            [p.transaction_id for p in ordered][0],
+            "ALPHA",
+        )
+        self.assertEqual(results.count(), 3)
+
+    def test_admin_list_search(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        self.client.force_authenticate(admin)
+
+        response = self.client.get(
+            "/api/v1/payment/admin/payment-proofs/?search=alpha&page_size=2"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"][0]["transaction_id"], "ALPHA")
+        self.assertEqual(response.data["count"], 3)
+
+        next_page = self.client.get(response.data["next"])
+        seen = [
+            row["transaction_id"]
+            for row in response.data["data"] + next_page.data["data"]
+        ]
+        self.assertEqual(sorted(seen), ["ALPHA", "TRX-ALPHA-0001", "TRX-BETA-0002"])
+
+    def test_search_pages_with_tied_ranks(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        self.client.force_authenticate(admin)
+        for number in range(7):
+            PaymentProof.objects.create(
+                transaction_id=f"TRX-ALPHA-1{number:03}",
+                payment_method="bkash",
+                amount=Decimal("100.00"),
+                payer_name="Tied Rank",
+                payer_contact="01712345678",
+            )
+        # Ties on the rank and on submitted_at leave only the id to order by
+        PaymentProof.objects.filter(payer_name="Tied Rank").update(
+            submitted_at=timezone.now()
+        )
+        expected = set(
+            search_payment_proofs(PaymentProof.objects.all(), "alpha").values_list(
+                "transaction_id", flat=True
+            )
+        )
+
+        pages = []
+        url = "/api/v1/payment/admin/payment-proofs/?search=alpha&page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([row["transaction_id"] for row in response.data["data"]])
+            url = response.data["next"]
+        seen = [transaction_id for page in pages for transaction_id in page]
+
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(len(seen), len(expected))
+        self.assertEqual(set(seen), expected)
+
+        previous = self.client.get(response.data["previous"])
+        self.assertEqual(
+            [row["transaction_id"] for row in previous.data["data"]], pages[-2]
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "pg_trgm indexes")
+    def test_search_uses_trigram_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+        plan = search_payment_proofs(PaymentProof.objects.all(), "alpha").explain()
+        self.assertIn("trgm_idx", plan)
+
+
+class PaymentProofScreenshotTest(APITestCase):
+    """Uploaded screenshots are normalized by the task worker"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_FORMAT="WEBP",
+            IMAGE_MAX_DIMENSION=1600,
+            IMAGE_THUMBNAIL_SIZE=300,
+        )
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_screenshot_is_normalized(self):
+        buffer = BytesIO()
+        Image.new("RGB", (2400, 1200), color="green").save(buffer, format="PNG")
+        data = {
+            "transaction_id": "SHOT1",
+            "payment_method": "bkash",
+            "amount": "2000.00",
+            "payer_name": "Screenshot Test",
+            "payer_contact": "01812345678",
+            "screenshot": SimpleUploadedFile(
+                "receipt.png", buffer.getvalue(), content_type="image/png"
+            ),
+        }
+        response = self.client.post("/api/v1/payment/proof/", data, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        original = PaymentProof.objects.get(transaction_id="SHOT1").screenshot.name
+
+        run_pending()
+
+        payment = PaymentProof.objects.get(transaction_id="SHOT1")
+        storage = payment.screenshot.storage
+        self.assertTrue(payment.screenshot.name.endswith(".webp"))
+        self.assertFalse(storage.exists(original))
+        with payment.screenshot.open("rb") as stored:
+            self.assertEqual(Image.open(stored).size, (1600, 800))
+        # The admin thumbnail was pre-rendered by the worker
+        self.assertTrue(
+            Rendition.objects.filter(source=payment.screenshot.name).exists()
+        )
+
+
+class PaymentReportTest(APITestCase):
+    """Reports are served from incrementally maintained daily summaries"""
+
+    url = "/api/v1/payment/admin/payment-proofs/report/"
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="admin-pass"
+        )
+        # Summaries are adjusted once the saving transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payments = [
+                PaymentProof.objects.create(
+                    transaction_id=f"REPORT{i}",
+                    payment_method=method,
+                    amount=Decimal(amount),
+                    payer_name="Report Payer",
+                    payer_contact="01712345678",
+                )
+                for i, (method, amount) in enumerate(
+                    [
+                        ("bkash", "100.00"),
+                        ("bkash", "250.50"),
+                        ("bank-transfer", "900.00"),
+                    ]
+                )
+            ]
+        self.today = timezone.localdate()
+
+    def verify(self, payment, after):
+        with mock.patch(
+            "apps.payment.models.timezone.now",
+            return_value=payment.submitted_at + after,
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                payment.verify(self.admin)
+
+    def test_summaries_follow_status_changes(self):
+        self.verify(self.payments[0], timedelta(minutes=90))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payments[2].delete()
+
+        report = payment_report(self.today, self.today)
+        self.assertEqual(report["totals"], {"count": 2, "amount": "350.50"})
+        self.assertEqual(
+            report["byStatus"],
+            {
+                "pending": {"count": 1, "amount": "250.50"},
+                "verified": {"count": 1, "amount": "100.00"},
+            },
+        )
+        self.assertEqual(list(report["byMethod"]), ["bkash"])
+        self.assertEqual(
+            report["verificationLag"],
+            {"count": 1, "p50": 7200, "p90": 7200, "p99": 7200},
+        )
+
+    def test_endpoint_reads_only_the_summary_table(self):
+        self.client.force_authenticate(self.admin)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["totals"]["count"], 3)
+        self.assertEqual(response.data["data"]["to"], self.today.isoformat())
+
+        response = self.client.get(self.url, {"from": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_fixes_bulk_updates(self):
+        PaymentProof.objects.filter(payment_method="bkash").update(
+            status="verified", verified_at=timezone.now()
+        )
+        self.assertEqual(
+            payment_report(self.today, self.today)["byStatus"]["pending"]["count"], 3
+        )
+
+        self.assertEqual(len(rebuild_summaries([self.today], dry_run=True)), 2)
+        out = StringIO()
+        call_command("reconcile_payment_reports", stdout=out)
+        self.assertIn("Fixed 2 wrong summary row(s)", out.getvalue())
+
+        report = payment_report(self.today, self.today)
+        self.assertEqual(report["byStatus"]["verified"]["count"], 2)
+        self.assertEqual(report["verificationLag"]["count"], 2)
+        self.assertEqual(rebuild_summaries(), [])
+        self.assertEqual(PaymentDailySummary.objects.count(), 2)
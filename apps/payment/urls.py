@@ -1,8 +1,15 @@
+from django.conf import settings
 from django.urls import include, path
 
 from rest_framework.routers import DefaultRouter
 
-from .views import PaymentProofStatusView, PaymentProofSubmitView, PaymentProofViewSet
+from .views import (
+    PaymentProofEventsView,
+    PaymentProofStatusAsyncView,
+    PaymentProofStatusView,
+    PaymentProofSubmitView,
+    PaymentProofViewSet,
+)
 
 # Router for admin viewset
 router = DefaultRouter()
@@ -12,14 +19,35 @@ router.register(
 
 app_name = "payment"
 
+# Async-native status polling when served over ASGI (see ASYNC_PUBLIC_ENDPOINTS)
+payment_status_view = (
+    PaymentProofStatusAsyncView
+    if settings.ASYNC_PUBLIC_ENDPOINTS
+    else PaymentProofStatusView
+)
+
+# Server-Sent Events status stream (ASGI only, see PaymentProofEventsView)
+status_event_urls = (
+    [
+        path(
+            "proof/<str:transaction_id>/events/",
+            PaymentProofEventsView.as_view(),
+            name="payment-proof-events",
+        )
+    ]
+    if settings.ASYNC_PUBLIC_ENDPOINTS
+    else []
+)
+
 urlpatterns = [
     # Public endpoints
     path("proof/", PaymentProofSubmitView.as_view(), name="payment-proof-submit"),
     path(
         "proof/<str:transaction_id>/",
-        PaymentProofStatusView.as_view(),
+        payment_status_view.as_view(),
         name="payment-proof-status",
     ),
+    *status_event_urls,
     # Admin endpoints
     path("", include(router.urls)),
 ]
@@ -1,28 +1,75 @@
 import logging
+from datetime import date, timedelta
 
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Q
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views import View
 
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
+from asgiref.sync import sync_to_async
+
+from apps.core.conditional import (
+    add_validators,
+    astored_version,
+    instance_version,
+    is_conditional,
+    not_modified,
+    stored_version,
+)
+from apps.core.http import release_connections
+from apps.core.pagination import KeysetCursorPagination
+from apps.core.projections import ProjectedListMixin, ReadOnlyProjection
+from apps.core.pubsub import get_broker
+
+from .events import FINAL_STATUSES, build_status_payload, status_channel, status_events
 from .models import PaymentProof
+from .reports import payment_report
+from .search import SEARCH_BUCKET, search_payment_proofs
 from .serializers import (
     PaymentProofAdminSerializer,
     PaymentProofListSerializer,
     PaymentProofSerializer,
 )
+from .signals import payment_proof_counts
+from .tasks import notify_payment_status, notify_payment_submitted
 
 logger = logging.getLogger("payment")
 
 
+class PaymentProofPagination(KeysetCursorPagination):
+    """
+    Keyset pagination over the (-submitted_at) index, newest first.
+    The total is an estimate/cached count rather than a COUNT per page load.
+    """
+
+    ordering = ("-submitted_at", "id")
+    include_count = True
+    count_cache = payment_proof_counts
+
+    def get_ordering(self, request, queryset, view):
+        """Search results are ordered by rounded rank, then newest first"""
+        if SEARCH_BUCKET in queryset.query.annotations:
+            return (f"-{SEARCH_BUCKET}", "-submitted_at", "id")
+        return super().get_ordering(request, queryset, view)
+
+
+def status_cache_control():
+    """Status polls may be served by a CDN/proxy for STATUS_POLL_MAX_AGE seconds"""
+    return {"public": True, "max_age": settings.STATUS_POLL_MAX_AGE}
+
+
 class PaymentProofSubmitView(APIView):
     """API view for submitting payment proof"""
 
-    parser_classes = [MultiPartParser, FormParser, JSONParser]
+    # JSON (per JSON_BACKEND), multipart and form bodies
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
     permission_classes = [permissions.AllowAny]  # Public endpoint
 
     def get_client_ip(self, request):
@@ -57,8 +104,11 @@ class PaymentProofSubmitView(APIView):
                     f"by {payment_proof.payer_name} - Amount: {payment_proof.amount}"
                 )
 
-                # TODO: Send notification email to admin
-                # TODO: Send confirmation email to payer
+                # Staff notification and payer confirmation run in the worker
+                notify_payment_submitted.enqueue(
+                    str(payment_proof.id),
+                    idempotency_key=f"payment-submitted:{payment_proof.id}",
+                )
 
                 # Generate money receipt data for frontend
                 receipt_data = {
@@ -141,33 +191,25 @@ class PaymentProofStatusView(APIView):
     def get(self, request, transaction_id):
         """Get payment proof status by transaction ID"""
         try:
-            payment_proof = PaymentProof.objects.get(transaction_id=transaction_id)
+            payment_proofs = PaymentProof.objects.filter(transaction_id=transaction_id)
+            if is_conditional(request):
+                version = stored_version(payment_proofs)
+                if response := not_modified(request, version, **status_cache_control()):
+                    return response
 
-            return Response(
-                {
-                    "success": True,
-                    "message": "Payment proof found",
-                    "data": {
-                        "id": str(payment_proof.id),
-                        "transactionId": payment_proof.transaction_id,
-                        "paymentMethod": payment_proof.payment_method,
-                        "amount": str(payment_proof.amount),
-                        "payerName": payment_proof.payer_name,
-                        "status": payment_proof.status,
-                        "submittedAt": payment_proof.submitted_at.isoformat(),
-                        "verifiedAt": (
-                            payment_proof.verified_at.isoformat()
-                            if payment_proof.verified_at
-                            else None
-                        ),
-                        "rejectionReason": (
-                            payment_proof.rejection_reason
-                            if payment_proof.status == "rejected"
-                            else None
-                        ),
+            payment_proof = payment_proofs.get()
+
+            return add_validators(
+                Response(
+                    {
+                        "success": True,
+                        "message": "Payment proof found",
+                        "data": build_status_payload(payment_proof),
                     },
-                },
-                status=status.HTTP_200_OK,
+                    status=status.HTTP_200_OK,
+                ),
+                instance_version(payment_proof),
+                **status_cache_control(),
             )
 
         except PaymentProof.DoesNotExist:
@@ -188,11 +230,120 @@ class PaymentProofStatusView(APIView):
             )
 
 
-class PaymentProofViewSet(viewsets.ModelViewSet):
+class PaymentProofStatusAsyncView(View):
+    """
+    Async-native payment proof status endpoint
+    GET /api/v1/payment/proof/<transaction_id>/
+
+    Same contract as PaymentProofStatusView, but uses the async ORM so a
+    status-polling client does not hold a worker thread. Routed in place of
+    PaymentProofStatusView when ASYNC_PUBLIC_ENDPOINTS is enabled and the
+    app runs under an ASGI server.
+    """
+
+    http_method_names = ["get", "options"]
+
+    async def get(self, request, transaction_id):
+        try:
+            payment_proofs = PaymentProof.objects.filter(transaction_id=transaction_id)
+            if is_conditional(request):
+                version = await astored_version(payment_proofs)
+                if response := not_modified(request, version, **status_cache_control()):
+                    return response
+
+            payment_proof = await payment_proofs.aget()
+
+            return add_validators(
+                JsonResponse(
+                    {
+                        "success": True,
+                        "message": "Payment proof found",
+                        "data": build_status_payload(payment_proof),
+                    }
+                ),
+                instance_version(payment_proof),
+                **status_cache_control(),
+            )
+
+        except PaymentProof.DoesNotExist:
+            logger.warning(f"Payment proof not found: {transaction_id}")
+            return JsonResponse(
+                {"success": False, "message": "Payment proof not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        except Exception as e:
+            logger.error(f"Error retrieving payment proof: {str(e)}", exc_info=True)
+            return JsonResponse(
+                {
+                    "success": False,
+                    "message": "An error occurred while retrieving payment proof",
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class PaymentProofEventsView(View):
+    """
+    Payment proof status stream
+    GET /api/v1/payment/proof/<transaction_id>/events/
+
+    Server-Sent Events for payers waiting on verification: a ``status``
+    event with the current status (the status endpoint's ``data``), then
+    one per change pushed by verify/reject, ending at verified or rejected.
+    A reconnect whose Last-Event-ID is already the final status gets 204,
+    which stops EventSource. Each connection costs one query instead of a
+    query per poll, and the database connection is released before the
+    stream starts. Routed only with ASYNC_PUBLIC_ENDPOINTS: under WSGI a
+    stream would hold a worker, so clients keep polling there.
+    """
+
+    http_method_names = ["get", "options"]
+
+    async def get(self, request, transaction_id):
+        subscription = await get_broker().subscribe(status_channel(transaction_id))
+        try:
+            payment_proof = await PaymentProof.objects.aget(
+                transaction_id=transaction_id
+            )
+        except PaymentProof.DoesNotExist:
+            await subscription.close()
+            logger.warning(f"Payment proof not found: {transaction_id}")
+            return JsonResponse(
+                {"success": False, "message": "Payment proof not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        except BaseException:
+            await subscription.close()
+            raise
+
+        # The stream itself needs no database connection
+        await sync_to_async(release_connections)()
+
+        if payment_proof.status in FINAL_STATUSES and (
+            request.headers.get("Last-Event-ID") == payment_proof.status
+        ):
+            await subscription.close()
+            return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+        response = StreamingHttpResponse(
+            status_events(build_status_payload(payment_proof), subscription),
+            content_type="text/event-stream",
+        )
+        response.headers["Cache-Control"] = "no-cache"
+        # Stop nginx from buffering the stream
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+
+class PaymentProofViewSet(ProjectedListMixin, viewsets.ModelViewSet):
     """ViewSet for admin management of payment proofs"""
 
     queryset = PaymentProof.objects.all()
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = PaymentProofPagination
+    list_projection = ReadOnlyProjection(PaymentProofListSerializer)
+    ordering_fields = ["submitted_at"]
 
     def get_serializer_class(self):
         """Use different serializers for different actions"""
@@ -214,12 +365,10 @@ class PaymentProofViewSet(viewsets.ModelViewSet):
         if method_filter:
             queryset = queryset.filter(payment_method=method_filter)
 
-        # Search by transaction ID or payer name
+        # Search by transaction ID or payer name (indexed, ranked)
         search = self.request.query_params.get("search", None)
         if search:
-            queryset = queryset.filter(
-                Q(transaction_id__icontains=search) | Q(payer_name__icontains=search)
-            )
+            queryset = search_payment_proofs(queryset, search)
 
         return queryset
 
@@ -235,8 +384,7 @@ class PaymentProofViewSet(viewsets.ModelViewSet):
             )
 
         payment_proof.verify(user=request.user)
-
-        # TODO: Send verification email to payer
+        notify_payment_status.enqueue(str(payment_proof.id))
 
         return Response(
             {
@@ -265,8 +413,7 @@ class PaymentProofViewSet(viewsets.ModelViewSet):
             )
 
         payment_proof.reject(reason=reason, user=request.user)
-
-        # TODO: Send rejection email to payer
+        notify_payment_status.enqueue(str(payment_proof.id))
 
         return Response(
             {
@@ -276,11 +423,31 @@ class PaymentProofViewSet(viewsets.ModelViewSet):
             }
         )
 
-    def list(self, request, *args, **kwargs):
-        """List all payment proofs with custom response format"""
-        queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
+    @action(detail=False, methods=["get"])
+    def report(self, request):
+        """
+        Payment totals, daily breakdown and verification lag percentiles
+        GET /api/v1/payment/admin/payment-proofs/report/?from=YYYY-MM-DD&to=YYYY-MM-DD
+        Defaults to the last 30 days.
+        """
+        today = timezone.localdate()
+        try:
+            end = date.fromisoformat(
+                request.query_params.get("to") or today.isoformat()
+            )
+            start = date.fromisoformat(
+                request.query_params.get("from")
+                or (end - timedelta(days=29)).isoformat()
+            )
+        except ValueError:
+            return Response(
+                {"success": False, "message": "Dates must be YYYY-MM-DD"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if start > end:
+            return Response(
+                {"success": False, "message": "'from' must not be after 'to'"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        return Response(
-            {"success": True, "data": serializer.data, "count": queryset.count()}
-        )
+        return Response({"success": True, "data": payment_report(start, end)})
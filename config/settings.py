@@ -60,6 +60,104 @@ AGENT_ONBOARDING_CAPTCHA_SCORE_THRESHOLD = config(
     default=0.5,
     cast=float,
 )
+# Overrides the provider's siteverify URL (e.g. a local stub in tests)
+AGENT_ONBOARDING_CAPTCHA_VERIFY_URL = config(
+    "AGENT_ONBOARDING_CAPTCHA_VERIFY_URL", default=""
+)
+# Seconds to wait for the provider to accept a connection / to respond
+AGENT_ONBOARDING_CAPTCHA_CONNECT_TIMEOUT = config(
+    "AGENT_ONBOARDING_CAPTCHA_CONNECT_TIMEOUT", default=1.0, cast=float
+)
+AGENT_ONBOARDING_CAPTCHA_READ_TIMEOUT = config(
+    "AGENT_ONBOARDING_CAPTCHA_READ_TIMEOUT", default=2.0, cast=float
+)
+# Consecutive provider failures that open the circuit, and how long it stays open
+AGENT_ONBOARDING_CAPTCHA_FAILURE_THRESHOLD = config(
+    "AGENT_ONBOARDING_CAPTCHA_FAILURE_THRESHOLD", default=5, cast=int
+)
+AGENT_ONBOARDING_CAPTCHA_RESET_TIMEOUT = config(
+    "AGENT_ONBOARDING_CAPTCHA_RESET_TIMEOUT", default=30, cast=int
+)
+# While the provider is unavailable: "closed" rejects submissions, "open" accepts
+AGENT_ONBOARDING_CAPTCHA_FAILURE_POLICY = (
+    config("AGENT_ONBOARDING_CAPTCHA_FAILURE_POLICY", default="closed").strip().lower()
+)
+# Seconds a verified token is remembered so retries are not re-verified
+AGENT_ONBOARDING_CAPTCHA_TOKEN_CACHE_TIMEOUT = config(
+    "AGENT_ONBOARDING_CAPTCHA_TOKEN_CACHE_TIMEOUT", default=120, cast=int
+)
+
+# Proposal numbers are reserved from the database in blocks of this size per
+# worker process. Larger blocks mean fewer counter updates but bigger gaps.
+PROPOSAL_NUMBER_BLOCK_SIZE = config("PROPOSAL_NUMBER_BLOCK_SIZE", default=20, cast=int)
+
+# Seconds a member's login record (dob, status, profile) is cached
+MEMBER_LOGIN_CACHE_TIMEOUT = config("MEMBER_LOGIN_CACHE_TIMEOUT", default=60, cast=int)
+
+# Membership exports (apps.membership.exports): applications read per
+# server-side cursor fetch, and nominee column groups per exported row
+EXPORT_CHUNK_SIZE = config("EXPORT_CHUNK_SIZE", default=2000, cast=int)
+EXPORT_NOMINEE_COLUMNS = config("EXPORT_NOMINEE_COLUMNS", default=4, cast=int)
+
+# Route the public status/login endpoints to their async-native views.
+# Enable when serving config.asgi:application with uvicorn workers.
+ASYNC_PUBLIC_ENDPOINTS = config("ASYNC_PUBLIC_ENDPOINTS", default=False, cast=bool)
+
+# Seconds a CDN/reverse proxy may serve a payment status response before
+# revalidating it (conditional GET, see apps.core.conditional)
+STATUS_POLL_MAX_AGE = config("STATUS_POLL_MAX_AGE", default=5, cast=int)
+
+# Payment status push (Server-Sent Events, apps.payment.events). Broker for
+# the status channels:
+#   memory://              in-process; enough for a single ASGI worker
+#   redis://host:6379/2    shared by every worker and node
+PUBSUB_URL = config("PUBSUB_URL", default="memory://")
+# Seconds between keepalive comments on an idle stream, and before a stream
+# is ended for the client to reconnect
+PAYMENT_EVENTS_KEEPALIVE = config("PAYMENT_EVENTS_KEEPALIVE", default=15, cast=int)
+PAYMENT_EVENTS_TIMEOUT = config("PAYMENT_EVENTS_TIMEOUT", default=300, cast=int)
+
+# Background tasks (apps.core.tasks, run by `manage.py run_tasks`)
+TASKS_MAX_ATTEMPTS = config("TASKS_MAX_ATTEMPTS", default=5, cast=int)
+# Seconds before the first retry; doubles per attempt up to the max
+TASKS_RETRY_BACKOFF = config("TASKS_RETRY_BACKOFF", default=30, cast=int)
+TASKS_RETRY_BACKOFF_MAX = config("TASKS_RETRY_BACKOFF_MAX", default=3600, cast=int)
+# A running job not finished within this many seconds is assumed abandoned
+TASKS_LOCK_TIMEOUT = config("TASKS_LOCK_TIMEOUT", default=600, cast=int)
+TASKS_POLL_INTERVAL = config("TASKS_POLL_INTERVAL", default=2.0, cast=float)
+
+# Uploaded image normalization (apps.core.images)
+# Uploads above this many pixels are rejected before being stored
+IMAGE_MAX_UPLOAD_PIXELS = config(
+    "IMAGE_MAX_UPLOAD_PIXELS", default=40_000_000, cast=int
+)
+# Stored images are downscaled to fit this many pixels on their longest side
+IMAGE_MAX_DIMENSION = config("IMAGE_MAX_DIMENSION", default=1600, cast=int)
+# Re-encoding format ("WEBP" or "JPEG") and quality
+IMAGE_FORMAT = config("IMAGE_FORMAT", default="WEBP").upper()
+IMAGE_QUALITY = config("IMAGE_QUALITY", default=80, cast=int)
+IMAGE_THUMBNAIL_SIZE = config("IMAGE_THUMBNAIL_SIZE", default=300, cast=int)
+# On-demand renditions (apps.core.renditions): allowed sizes, and the total
+# bytes kept on disk before least recently used renditions are evicted
+RENDITION_SIZES = config("RENDITION_SIZES", default="150,300,600", cast=Csv(cast=int))
+RENDITION_CACHE_MAX_BYTES = config(
+    "RENDITION_CACHE_MAX_BYTES", default=512 * 1024 * 1024, cast=int
+)
+# Seconds between last-access updates for a rendition
+RENDITION_TOUCH_INTERVAL = config("RENDITION_TOUCH_INTERVAL", default=300, cast=int)
+
+# Email (sent from background tasks)
+EMAIL_BACKEND = config(
+    "EMAIL_BACKEND", default="django.core.mail.backends.console.EmailBackend"
+)
+EMAIL_HOST = config("EMAIL_HOST", default="localhost")
+EMAIL_PORT = config("EMAIL_PORT", default=25, cast=int)
+EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=False, cast=bool)
+EMAIL_HOST_USER = config("EMAIL_HOST_USER", default="")
+EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD", default="")
+DEFAULT_FROM_EMAIL = config("DEFAULT_FROM_EMAIL", default="noreply@brightlife-bd.com")
+# Staff addresses notified of new submissions
+STAFF_NOTIFICATION_EMAILS = config("STAFF_NOTIFICATION_EMAILS", default="", cast=Csv())
 
 # Custom User Model
 AUTH_USER_MODEL = "users.User"
@@ -74,6 +172,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third-party apps
     "rest_framework",
     "rest_framework_simplejwt",
@@ -151,6 +250,44 @@ else:
         }
     }
 
+# Connection management
+# Keep connections open across requests instead of reconnecting per request,
+# and check them before reuse so a restarted database does not cause errors.
+# Each gunicorn worker thread holds at most one connection, so the peak per
+# node is WEB_CONCURRENCY x GUNICORN_THREADS (see gunicorn.conf.py); keep
+# that below max_connections (or the pgbouncer pool size) across all nodes.
+# Under ASGI (ASYNC_PUBLIC_ENDPOINTS) sync code runs in per-request executor
+# threads, so persistent connections are never reused and linger until they
+# age out (Django ticket #33497): the default there is 0, i.e. close after
+# each request; put pgbouncer in front for pooling instead.
+DATABASES["default"]["CONN_MAX_AGE"] = config(
+    "DB_CONN_MAX_AGE", default=0 if ASYNC_PUBLIC_ENDPOINTS else 60, cast=int
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = config(
+    "DB_CONN_HEALTH_CHECKS", default=True, cast=bool
+)
+if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"].setdefault("OPTIONS", {})["connect_timeout"] = config(
+        "DB_CONNECT_TIMEOUT", default=5, cast=int
+    )
+# pgbouncer in transaction pooling mode cannot keep server-side cursors
+# (used by QuerySet.iterator()) open across transactions.
+if config("DB_PGBOUNCER", default=False, cast=bool):
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+
+# Cache
+# CACHE_URL selects the backend shared by throttles and read caches:
+#   redis://host:6379/1          shared across workers and nodes (production)
+#   filecache:///var/tmp/brightlife_cache or dbcache://brightlife_cache
+#                                single-node fallbacks (dbcache needs
+#                                `python manage.py createcachetable`)
+#   locmemcache://               per-process, local development and tests
+CACHES = {"default": env.cache_url("CACHE_URL", default="locmemcache://")}
+CACHES["default"]["KEY_PREFIX"] = config("CACHE_KEY_PREFIX", default="brightlife")
+CACHE_ALIAS = "default"
+THROTTLE_CACHE_ALIAS = config("THROTTLE_CACHE_ALIAS", default="default")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -188,11 +325,55 @@ USE_TZ = True
 
 STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploaded files: "filesystem" (MEDIA_ROOT) or "s3" (any S3-compatible store,
+# e.g. MinIO via AWS_S3_ENDPOINT_URL; requires django-storages and boto3)
+STORAGE_BACKEND = config("STORAGE_BACKEND", default="filesystem").strip().lower()
+
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    },
+}
+
+if STORAGE_BACKEND == "s3":
+    STORAGES["default"] = {
+        "BACKEND": "storages.backends.s3.S3Storage",
+        "OPTIONS": {
+            "bucket_name": config("AWS_STORAGE_BUCKET_NAME"),
+            "access_key": config("AWS_ACCESS_KEY_ID", default=None),
+            "secret_key": config("AWS_SECRET_ACCESS_KEY", default=None),
+            "region_name": config("AWS_S3_REGION_NAME", default=None),
+            "endpoint_url": config("AWS_S3_ENDPOINT_URL", default=None),
+            "custom_domain": config("AWS_S3_CUSTOM_DOMAIN", default=None),
+            "location": config("AWS_LOCATION", default=""),
+            # Uploads are private; URLs are presigned
+            "default_acl": None,
+            "querystring_auth": True,
+            "file_overwrite": False,
+        },
+    }
+
+# Direct-to-storage uploads (apps.core.storage): seconds a presigned upload
+# URL stays valid, and how long its upload token is accepted afterwards
+DIRECT_UPLOAD_EXPIRY = config("DIRECT_UPLOAD_EXPIRY", default=900, cast=int)
+DIRECT_UPLOAD_TOKEN_MAX_AGE = config(
+    "DIRECT_UPLOAD_TOKEN_MAX_AGE", default=3600, cast=int
+)
+
+# Protected media (apps.core.media): how Django hands off the file transfer
+# after the permission check. "nginx" sends X-Accel-Redirect to the internal
+# PROTECTED_MEDIA_INTERNAL_URL location, "apache" sends X-Sendfile; empty
+# streams the file from Django (development only).
+PROTECTED_MEDIA_SERVER = config("PROTECTED_MEDIA_SERVER", default="").strip().lower()
+PROTECTED_MEDIA_INTERNAL_URL = config(
+    "PROTECTED_MEDIA_INTERNAL_URL", default="/protected-media/"
+)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -232,9 +413,25 @@ REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_RATES": {
         "agent-onboarding": AGENT_ONBOARDING_THROTTLE,
         "agent-onboarding-burst": AGENT_ONBOARDING_THROTTLE_BURST,
+        "direct-upload": config("DIRECT_UPLOAD_THROTTLE", default="60/hour"),
     },
 }
 
+# JSON encoding of API requests and responses: "stdlib" (DRF's JSONRenderer
+# and JSONParser) or "orjson" (apps.core.renderers; same output, faster on
+# large lists; requires orjson)
+JSON_BACKEND = config("JSON_BACKEND", default="stdlib").strip().lower()
+
+if JSON_BACKEND == "orjson":
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+        "apps.core.renderers.ORJSONRenderer",
+    ]
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = [
+        "apps.core.renderers.ORJSONParser",
+        "rest_framework.parsers.MultiPartParser",
+        "rest_framework.parsers.FormParser",
+    ]
+
 # =============================================================================
 # JWT CONFIGURATION
 # =============================================================================
@@ -341,6 +538,16 @@ LOGGING = {
             "level": "INFO",
             "propagate": False,
         },
+        "tasks": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
+        "core": {
+            "handlers": ["console"],
+            "level": "INFO",
+            "propagate": False,
+        },
         "django.request": {
             "handlers": ["console"],
             "level": "DEBUG" if DEBUG else "WARNING",
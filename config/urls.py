@@ -58,6 +58,7 @@ urlpatterns = [
     path("api/v1/membership/", include("apps.membership.urls")),
     path("api/v1/payment/", include("apps.payment.urls")),
     path("api/v1/agents/", include("apps.agents.urls")),
+    path("api/v1/media/", include("apps.core.urls")),
 ]
 
 # Serve media files in development
@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration (picked up automatically from the working directory).
+
+Each worker thread keeps one persistent database connection (CONN_MAX_AGE),
+so WEB_CONCURRENCY x GUNICORN_THREADS is the peak connection count per node.
+
+With uvicorn workers (config.asgi, ASYNC_PUBLIC_ENDPOINTS=True) connections
+are not reused across requests, so DB_CONN_MAX_AGE defaults to 0 there and
+GUNICORN_THREADS does not apply; see the database settings.
+"""
+
+import os
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 3))
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+# Recycle workers periodically so per-process caches and leaks stay bounded
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))